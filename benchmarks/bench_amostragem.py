@@ -0,0 +1,119 @@
+"""
+Benchmark da amostragem adaptativa do NetLogger.
+
+Envia pelo loopback (socket ``AF_PACKET``) uma janela sintética de quadros
+TCP, capturada por um `sniff` real do NetLogger (motor scapy), com taxas
+de amostragem fixas, e reporta para cada taxa:
+- Tempo de processamento da janela (dissecação e agregação, sem a espera
+  da captura).
+- Erro relativo dos bytes estimados em relação ao total enviado (o
+  loopback entrega cada quadro duas vezes, na saída e na entrada, mas a
+  captura descarta a cópia de saída).
+
+Requisitos:
+- Linux e privilégios de administrador/root.
+
+Uso:
+    sudo python benchmarks/bench_amostragem.py [--pacotes 20000] [--ips 50]
+"""
+
+import argparse
+import csv
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from scapy.layers.inet import IP, TCP  # noqa: E402
+from scapy.layers.l2 import Ether  # noqa: E402
+
+from ip import TABELA  # noqa: E402
+from netlog import NetLogger  # noqa: E402
+
+MAC: str = "00:00:00:00:00:01"
+
+
+def gera_janela(pacotes: int, ips: int) -> tuple[list[bytes], list[str]]:
+    """Gera quadros entre `ips` IPs, com tamanhos variados."""
+
+    rng = random.Random(42)
+    enderecos: list[str] = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(ips)]
+    modelos: list[bytes] = [
+        bytes(
+            Ether(src=MAC, dst=MAC)
+            / IP(src=src, dst=dst)
+            / TCP(dport=8000)
+            / (b"x" * rng.randint(0, 1400))
+        )
+        for src, dst in (
+            (rng.choice(enderecos), rng.choice(enderecos)) for _ in range(1000)
+        )
+    ]
+    return [rng.choice(modelos) for _ in range(pacotes)], enderecos
+
+
+def envia(quadros: list[bytes], atraso: float, duracao: float) -> None:
+    """Envia os quadros pelo loopback ao longo de `duracao` segundos."""
+
+    time.sleep(atraso)
+    intervalo: float = duracao / len(quadros)
+    with socket.socket(socket.AF_PACKET, socket.SOCK_RAW) as s:
+        s.bind(("lo", 0))
+        inicio: float = time.monotonic()
+        for i, quadro in enumerate(quadros):
+            if (espera := inicio + i * intervalo - time.monotonic()) > 0:
+                time.sleep(espera)
+            s.send(quadro)
+
+
+def total_csv(caminho: str) -> int:
+    with open(caminho, newline="") as f:
+        return sum(int(linha["bytes_enviados"]) for linha in csv.DictReader(f))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pacotes", type=int, default=20_000)
+    parser.add_argument("--ips", type=int, default=50)
+    parser.add_argument("--duracao", type=float, default=4.0)
+    args = parser.parse_args()
+
+    janela, enderecos = gera_janela(args.pacotes, args.ips)
+    real: int = sum(len(quadro) for quadro in janela)
+
+    with (
+        tempfile.TemporaryDirectory() as diretorio,
+        patch("netlog.get_if_list", return_value=["lo"]),
+        patch("netlog.logging"),
+    ):
+        for taxa in (1, 4, 16, 64):
+            caminho: str = os.path.join(diretorio, f"{taxa}.csv")
+            logger = NetLogger(caminho, amostragem="sistematica")
+            logger.conexoes.update(TABELA.interna(ip) for ip in enderecos)
+            logger.amostragem.taxa = taxa
+            logger.amostragem.carga_alta = float("inf")  # mantém a taxa fixa
+
+            envio = threading.Thread(target=envia, args=(janela, 0.5, args.duracao))
+            envio.start()
+            with patch.object(
+                logger.amostragem, "atualiza", wraps=logger.amostragem.atualiza
+            ) as atualiza:
+                logger.processa_pacotes(timeout=int(args.duracao + 2))
+            envio.join()
+
+            tempo, _, capturados = atualiza.call_args.args
+            erro: float = abs(total_csv(caminho) - real) / real
+            print(
+                f"1 em {taxa:>2}: {capturados:>6} quadros, "
+                f"{tempo * 1000:7.1f} ms por janela, erro dos bytes {erro:.2%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
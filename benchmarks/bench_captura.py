@@ -0,0 +1,112 @@
+"""
+Benchmark dos motores de captura no loopback: ``scapy`` x ``mmap``.
+
+Para cada motor, um subprocesso envia datagramas UDP ao loopback o mais
+rápido possível enquanto a captura roda. No loopback, cada datagrama é
+visto duas vezes (saída e entrada): o `sniff` entrega as duas cópias
+(2 quadros esperados por datagrama) e o motor mmap descarta a de saída
+(1 quadro por datagrama). São reportados:
+- Quadros entregues à aplicação e a vazão (quadros/s).
+- Taxa de perda em relação ao esperado (e descartes do kernel no mmap).
+
+Uso:
+    sudo python benchmarks/bench_captura.py [--duracao 5] [--tamanho 100]
+
+Observação:
+Requer Linux e privilégios de administrador/root.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SRCPATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRCPATH)
+
+CODIGO_EMISSOR: str = """
+import socket, sys, time
+porta, duracao, tamanho = int(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3])
+s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+dados = b"x" * tamanho
+enviados = 0
+fim = time.monotonic() + duracao
+while time.monotonic() < fim:
+    for _ in range(100):
+        s.sendto(dados, ("127.0.0.1", porta))
+    enviados += 100
+print(enviados)
+"""
+
+
+def emite(porta: int, duracao: float, tamanho: int) -> subprocess.Popen:
+    """Inicia o emissor de datagramas UDP."""
+
+    return subprocess.Popen(
+        [sys.executable, "-c", CODIGO_EMISSOR, str(porta), str(duracao), str(tamanho)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def captura_scapy(duracao: float, emissor_args: tuple) -> tuple[int, int, int]:
+    """Captura com `sniff` e retorna (quadros, enviados, descartes do kernel)."""
+
+    from scapy.sendrecv import sniff
+
+    proc = emite(*emissor_args)
+    quadros: int = len(sniff(iface="lo", timeout=duracao))
+    return quadros, int(proc.communicate()[0]), -1
+
+
+def captura_mmap(duracao: float, emissor_args: tuple) -> tuple[int, int, int]:
+    """Captura pelo anel TPACKET_V3 e retorna (quadros, enviados, descartes)."""
+
+    from captura_mmap import CapturaMmap
+
+    captura = CapturaMmap("lo")
+    proc = emite(*emissor_args)
+    for _ in captura.lotes(duracao):
+        pass
+    captura.close()
+    return captura.quadros, int(proc.communicate()[0]), captura.descartados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duracao", type=float, default=5.0)
+    parser.add_argument("--tamanho", type=int, default=100)
+    args = parser.parse_args()
+
+    # Socket de destino: evita respostas ICMP de porta inalcançável
+    destino = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    destino.bind(("127.0.0.1", 0))
+    porta: int = destino.getsockname()[1]
+
+    for nome, funcao, copias in (
+        ("scapy", captura_scapy, 2),
+        ("mmap", captura_mmap, 1),
+    ):
+        inicio: float = time.perf_counter()
+        quadros, enviados, descartes = funcao(
+            args.duracao, (porta, args.duracao - 0.5, args.tamanho)
+        )
+        duracao: float = time.perf_counter() - inicio
+        esperados: int = copias * enviados
+        perda: float = max(esperados - quadros, 0) / max(esperados, 1)
+
+        linha: str = (
+            f"{nome:>6}: {quadros} de {esperados} quadros "
+            f"({quadros / duracao:,.0f} quadros/s), perda {perda:.1%}"
+        )
+        if descartes >= 0:
+            linha += f", {descartes} descartes no kernel"
+        print(linha)
+
+    destino.close()
+
+
+if __name__ == "__main__":
+    main()
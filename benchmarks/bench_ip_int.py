@@ -0,0 +1,127 @@
+"""
+Benchmark da representação de IPs na agregação do NetLogger.
+
+Compara, para o mesmo fluxo sintético de pacotes:
+- ``texto``: IPs em texto (como antes), com ``set[str]`` e contadores
+  ``{"enviado": .., "recebido": ..}`` por chave ``(ip, protocolo)``.
+- ``internado``: IPs em texto vindos do scapy, internados em inteiros por
+  `ip.TabelaIPs`, com ``set[int]`` e contadores ``[enviado, recebido]``.
+- ``bytes``: IPs lidos direto do cabeçalho (4 bytes), convertidos com
+  `ip.bytes_para_int`, como no caminho sem scapy.
+
+Também mede a memória das tabelas de contadores com muitas chaves.
+
+Uso:
+    python benchmarks/bench_ip_int.py [--pacotes 1000000] [--ips 5000]
+"""
+
+import argparse
+import os
+import random
+import socket
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ip import TabelaIPs, bytes_para_int  # noqa: E402
+
+
+def gera_fluxo(pacotes: int, ips: int) -> tuple[list[bytes], list[tuple]]:
+    """Gera o conjunto de IPs e os pares (src, dst) brutos de cada pacote."""
+
+    rng = random.Random(42)
+    pool: list[bytes] = [rng.randbytes(4) for _ in range(ips)]
+    fluxo: list[tuple] = [
+        (rng.choice(pool), rng.choice(pool), 1500) for _ in range(pacotes)
+    ]
+    return pool, fluxo
+
+
+def agrega_texto(pool: list[bytes], fluxo: list[tuple]) -> dict:
+    conexoes: set[str] = {socket.inet_ntoa(b) for b in pool}
+    bytes_ip = defaultdict(lambda: {"enviado": 0, "recebido": 0})
+
+    for src_b, dst_b, tamanho in fluxo:
+        # o scapy cria um texto novo a cada pacote dissecado
+        src, dst = socket.inet_ntoa(src_b), socket.inet_ntoa(dst_b)
+        if src not in conexoes or dst not in conexoes:
+            continue
+        bytes_ip[(src, "HTTP")]["enviado"] += tamanho
+        bytes_ip[(dst, "HTTP")]["recebido"] += tamanho
+
+    return bytes_ip
+
+
+def agrega_internado(pool: list[bytes], fluxo: list[tuple]) -> dict:
+    tabela = TabelaIPs()
+    interna = tabela.interna
+    conexoes: set[int] = {interna(socket.inet_ntoa(b)) for b in pool}
+    bytes_ip = defaultdict(lambda: [0, 0])
+
+    for src_b, dst_b, tamanho in fluxo:
+        src = interna(socket.inet_ntoa(src_b))
+        dst = interna(socket.inet_ntoa(dst_b))
+        if src not in conexoes or dst not in conexoes:
+            continue
+        bytes_ip[(src, "HTTP")][0] += tamanho
+        bytes_ip[(dst, "HTTP")][1] += tamanho
+
+    return bytes_ip
+
+
+def agrega_bytes(pool: list[bytes], fluxo: list[tuple]) -> dict:
+    conexoes: set[int] = {bytes_para_int(b) for b in pool}
+    bytes_ip = defaultdict(lambda: [0, 0])
+
+    for src_b, dst_b, tamanho in fluxo:
+        src = int.from_bytes(src_b, "big")
+        dst = int.from_bytes(dst_b, "big")
+        if src not in conexoes or dst not in conexoes:
+            continue
+        bytes_ip[(src, "HTTP")][0] += tamanho
+        bytes_ip[(dst, "HTTP")][1] += tamanho
+
+    return bytes_ip
+
+
+def memoria(funcao, pool: list[bytes], fluxo: list[tuple]) -> int:
+    """Memória (bytes) alocada e mantida pela tabela de contadores."""
+
+    tracemalloc.start()
+    resultado = funcao(pool, fluxo)  # noqa: F841 (mantém a tabela viva)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return atual
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pacotes", type=int, default=1_000_000)
+    parser.add_argument("--ips", type=int, default=5000)
+    args = parser.parse_args()
+
+    pool, fluxo = gera_fluxo(args.pacotes, args.ips)
+    _, fluxo_memoria = gera_fluxo(200_000, 50_000)
+    pool_memoria = list({b for par in fluxo_memoria for b in par[:2]})
+
+    for nome, funcao in (
+        ("texto", agrega_texto),
+        ("internado", agrega_internado),
+        ("bytes", agrega_bytes),
+    ):
+        inicio: float = time.perf_counter()
+        funcao(pool, fluxo)
+        duracao: float = time.perf_counter() - inicio
+
+        kib: float = memoria(funcao, pool_memoria, fluxo_memoria) / 1024
+        print(
+            f"{nome:>10}: {duracao / args.pacotes * 1e9:6.0f} ns/pacote, "
+            f"{kib:8.0f} KiB para {len(pool_memoria)} IPs"
+        )
+
+
+if __name__ == "__main__":
+    main()
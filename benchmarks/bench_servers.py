@@ -0,0 +1,159 @@
+"""
+Benchmark de concorrência dos servidores HTTP/FTP.
+
+Para cada modo (``threads`` e ``asyncio``), inicia `Server` em um
+subprocesso, abre N conexões ociosas em cada servidor e mede:
+- O aumento de memória (RSS) do servidor por conexão ociosa.
+- A latência de requisições HTTP GET feitas com as conexões abertas.
+
+No modo ``threads``, o `HTTPServer` atende uma conexão por vez, então
+uma única conexão ociosa já bloqueia as demais requisições.
+
+Uso:
+    python benchmarks/bench_servers.py [--conexoes 2000] [--requisicoes 50]
+
+Observação:
+A medição de memória lê ``/proc`` e só funciona no Linux.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SRCPATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+CODIGO_SERVIDOR: str = """
+import sys
+sys.path.insert(0, {src!r})
+import servers
+server = servers.Server(http_port={http}, ftp_port={ftp})
+server.{metodo}()
+"""
+
+
+def porta_livre() -> int:
+    """Retorna uma porta TCP livre no loopback."""
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kib(pid: int) -> int:
+    """Retorna a memória residente (KiB) do processo."""
+
+    with open(f"/proc/{pid}/status") as f:
+        for linha in f:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1])
+    return 0
+
+
+def espera_porta(porta: int, limite: float = 10.0) -> None:
+    """Aguarda até a porta aceitar conexões."""
+
+    fim: float = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            socket.create_connection(("127.0.0.1", porta), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"porta {porta} não abriu")
+
+
+def mede(modo: str, conexoes: int, requisicoes: int) -> None:
+    """Executa o benchmark para um modo e imprime os resultados."""
+
+    http, ftp = porta_livre(), porta_livre()
+    metodo: str = "start_async" if modo == "asyncio" else "start"
+
+    with tempfile.TemporaryDirectory() as raiz:
+        with open(os.path.join(raiz, "arquivo.bin"), "wb") as f:
+            f.write(os.urandom(16 * 1024))
+
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                CODIGO_SERVIDOR.format(src=SRCPATH, http=http, ftp=ftp, metodo=metodo),
+            ],
+            cwd=raiz,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        try:
+            espera_porta(http)
+            espera_porta(ftp)
+            time.sleep(0.2)
+            rss_inicial: int = rss_kib(proc.pid)
+
+            # Três conexões seguidas sem completar (fila de aceite cheia)
+            # encerram a abertura naquele servidor
+            ociosas: list[socket.socket] = []
+            for porta in (http, ftp):
+                falhas_seguidas: int = 0
+                for _ in range(conexoes):
+                    try:
+                        ociosas.append(
+                            socket.create_connection(("127.0.0.1", porta), timeout=3)
+                        )
+                        falhas_seguidas = 0
+                    except OSError:
+                        falhas_seguidas += 1
+                        if falhas_seguidas == 3:
+                            break
+            time.sleep(1)
+            rss_final: int = rss_kib(proc.pid)
+
+            latencias: list[float] = []
+            falhas: int = 0
+            for _ in range(requisicoes):
+                inicio: float = time.perf_counter()
+                try:
+                    url: str = f"http://127.0.0.1:{http}/arquivo.bin"
+                    with urllib.request.urlopen(url, timeout=2) as resposta:
+                        resposta.read()
+                    latencias.append(time.perf_counter() - inicio)
+                except OSError:
+                    falhas += 1
+
+            for s in ociosas:
+                s.close()
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    por_conexao: float = (rss_final - rss_inicial) / max(len(ociosas), 1)
+    print(f"[{modo}] {len(ociosas)} de {2 * conexoes} conexões ociosas abertas")
+    print(f"  memória: +{rss_final - rss_inicial} KiB ({por_conexao:.2f} KiB/conexão)")
+    if latencias:
+        print(
+            f"  GET: mediana {statistics.median(latencias) * 1000:.2f} ms, "
+            f"máx {max(latencias) * 1000:.2f} ms, {falhas} falhas"
+        )
+    else:
+        print(f"  GET: todas as {falhas} requisições falharam (timeout)")
+
+
+def main() -> None:
+    """Executa o benchmark nos dois modos."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conexoes", type=int, default=2000)
+    parser.add_argument("--requisicoes", type=int, default=50)
+    args = parser.parse_args()
+
+    for modo in ("threads", "asyncio"):
+        mede(modo, args.conexoes, args.requisicoes)
+
+
+if __name__ == "__main__":
+    main()
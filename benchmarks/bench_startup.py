@@ -0,0 +1,134 @@
+"""
+Benchmark de inicialização do NetLogger.
+
+Mede, em processos Python novos:
+- O tempo de importação de `netlog` e `main`.
+- O tempo até o primeiro pacote capturado (da criação do processo até
+  `sniff` retornar um pacote na interface de loopback).
+
+Se algum tempo passar do limite configurado, o script termina com
+código 1, servindo de proteção contra regressões.
+
+Uso:
+    sudo python benchmarks/bench_startup.py [--repeticoes 5]
+        [--limite-import 1.5] [--limite-primeiro-pacote 3.0]
+
+Observação:
+A medição do primeiro pacote exige privilégios de administrador
+e é ignorada caso contrário.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+SRCPATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+CODIGO_IMPORT: str = """
+import sys, time
+t = time.perf_counter()
+import {modulo}
+print(time.perf_counter() - t)
+print(sum(m.startswith("scapy.layers.") for m in sys.modules))
+"""
+
+CODIGO_PRIMEIRO_PACOTE: str = """
+import time
+import netlog
+netlog.sniff(count=1, iface="lo", timeout=10)
+print(time.time())
+"""
+
+
+def executa(codigo: str) -> tuple[subprocess.Popen, float]:
+    """Executa `codigo` em um novo interpretador com `src/` no PATH."""
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = SRCPATH
+    inicio: float = time.time()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", codigo],
+        env=env,
+        cwd=SRCPATH,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return proc, inicio
+
+
+def mede_import(modulo: str, repeticoes: int) -> tuple[float, int]:
+    """Retorna a mediana do tempo de importação e o nº de camadas scapy."""
+
+    tempos: list[float] = []
+    camadas: int = 0
+
+    for _ in range(repeticoes):
+        proc, _ = executa(CODIGO_IMPORT.format(modulo=modulo))
+        saida, _ = proc.communicate()
+        tempo, camadas_str = saida.split()
+        tempos.append(float(tempo))
+        camadas = int(camadas_str)
+
+    return statistics.median(tempos), camadas
+
+
+def mede_primeiro_pacote(repeticoes: int) -> float:
+    """
+    Retorna a mediana do tempo entre criar o processo e capturar o
+    primeiro pacote, enviando datagramas UDP ao loopback enquanto espera.
+    """
+
+    tempos: list[float] = []
+    sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    for _ in range(repeticoes):
+        proc, inicio = executa(CODIGO_PRIMEIRO_PACOTE)
+
+        while proc.poll() is None:
+            sock.sendto(b"bench", ("127.0.0.1", 9))
+            time.sleep(0.005)
+
+        saida, _ = proc.communicate()
+        tempos.append(float(saida) - inicio)
+
+    sock.close()
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    """Executa as medições e verifica os limites."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite-import", type=float, default=1.5)
+    parser.add_argument("--limite-primeiro-pacote", type=float, default=3.0)
+    args = parser.parse_args()
+
+    estourou: bool = False
+
+    for modulo in ("netlog", "main"):
+        tempo, camadas = mede_import(modulo, args.repeticoes)
+        print(
+            f"import {modulo}: {tempo * 1000:.0f} ms "
+            f"({camadas} camadas scapy carregadas)"
+        )
+        estourou |= tempo > args.limite_import
+
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        tempo = mede_primeiro_pacote(args.repeticoes)
+        print(f"tempo até o primeiro pacote: {tempo * 1000:.0f} ms")
+        estourou |= tempo > args.limite_primeiro_pacote
+    else:
+        print("tempo até o primeiro pacote: ignorado (requer root)")
+
+    if estourou:
+        print("REGRESSÃO: tempo de inicialização acima do limite", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Amostragem adaptativa de pacotes para proteger o NetLogger de sobrecarga.
+
+Funcionalidades principais:
+- Enquanto a carga é baixa, todos os pacotes são contados (taxa 1).
+- Quando o processamento de uma janela ocupa uma fração grande do tempo
+  de captura, ou há pacotes demais pendentes, a taxa dobra (1 em 2,
+  1 em 4, ...), até `taxa_maxima`.
+- Com folga (limites bem abaixo dos de entrada), a taxa cai pela metade
+  até voltar à contagem exata. A distância entre os limites de subida e
+  de descida (histerese) evita oscilar entre duas taxas.
+- Dois modos de seleção:
+    * ``sistematica``: 1 em N, a partir de uma posição inicial sorteada
+      em cada lote (ou a cada mudança de taxa, na seleção pacote a
+      pacote);
+    * ``probabilistica``: cada pacote é mantido com probabilidade 1/N.
+- A seleção pode ser feita por lote (`Amostragem.seleciona`) ou pacote a
+  pacote, à medida que chegam (`Amostragem.mantem`), sem guardar os
+  descartados.
+  Nos dois, cada pacote tem exatamente 1/N de chance de ser contado, então
+  multiplicar bytes e pacotes contados por N dá estimativas não enviesadas.
+
+Uso típico:
+    amostragem = Amostragem("sistematica")
+    for pacote in amostragem.seleciona(pacotes):
+        ...
+    amostragem.atualiza(tempo_processamento, duracao_janela, len(pacotes))
+"""
+
+import logging
+import random
+from typing import Sequence, TypeVar
+
+MODOS: tuple[str, ...] = ("sistematica", "probabilistica")
+
+T = TypeVar("T")
+
+
+class Amostragem:
+    """
+    Controla a taxa de amostragem a partir da carga de cada janela.
+
+    Attributes:
+        modo (str): ``"sistematica"`` ou ``"probabilistica"``.
+        taxa (int): Um pacote contado a cada `taxa` (1: contagem exata).
+        taxa_maxima (int): Maior taxa permitida.
+        carga_alta (float): Fração da janela gasta processando a partir da
+            qual a taxa aumenta.
+        carga_baixa (float): Fração abaixo da qual a taxa pode diminuir.
+        limite_pendentes (int): Pacotes a processar por janela a partir
+            dos quais a taxa aumenta.
+    """
+
+    def __init__(
+        self,
+        modo: str = "sistematica",
+        taxa_maxima: int = 1024,
+        carga_alta: float = 0.5,
+        carga_baixa: float = 0.1,
+        limite_pendentes: int = 200_000,
+        semente: int | None = None,
+    ):
+        """
+        Args:
+            modo (str): Modo de seleção dos pacotes (ver `MODOS`).
+            taxa_maxima (int): Maior taxa permitida (potência de 2).
+            carga_alta (float): Limite de subida da taxa (0 a 1).
+            carga_baixa (float): Limite de descida; deve ser menor que a
+                metade de `carga_alta`, já que dividir a taxa por 2 dobra
+                a carga.
+            limite_pendentes (int): Pacotes processados por janela
+                a partir dos quais a taxa aumenta.
+            semente (int | None): Semente do sorteio (para testes).
+
+        Raises:
+            ValueError: Se o modo for desconhecido ou os limites não
+                deixarem margem de histerese.
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Modo de amostragem desconhecido: {modo}")
+        if not 0 < carga_baixa < carga_alta / 2:
+            raise ValueError("carga_baixa deve ficar abaixo de carga_alta / 2")
+
+        self.modo = modo
+        self.taxa: int = 1
+        self.taxa_maxima = taxa_maxima
+        self.carga_alta = carga_alta
+        self.carga_baixa = carga_baixa
+        self.limite_pendentes = limite_pendentes
+        self._rng: random.Random = random.Random(semente)
+        self._salto: int = 0
+
+    def seleciona(self, pacotes: Sequence[T]) -> Sequence[T]:
+        """
+        Retorna os pacotes a contar, conforme a taxa atual.
+
+        Args:
+            pacotes (Sequence): Lote de pacotes (lista ou `PacketList`).
+        """
+        taxa: int = self.taxa
+        if taxa == 1:
+            return pacotes
+
+        if self.modo == "sistematica":
+            return pacotes[self._rng.randrange(taxa) :: taxa]
+
+        probabilidade: float = 1 / taxa
+        sorteio = self._rng.random
+        return [pacote for pacote in pacotes if sorteio() < probabilidade]
+
+    def mantem(self) -> bool:
+        """
+        Decide se o próximo pacote da captura é contado, com a mesma chance
+        (1/`taxa`) de `seleciona`, mas sem precisar do lote inteiro.
+        """
+        taxa: int = self.taxa
+        if taxa == 1:
+            return True
+
+        if self.modo == "probabilistica":
+            return self._rng.random() < 1 / taxa
+
+        if self._salto:
+            self._salto -= 1
+            return False
+        self._salto = taxa - 1
+        return True
+
+    def atualiza(self, tempo: float, duracao: float, pendentes: int) -> int:
+        """
+        Ajusta a taxa para a próxima janela.
+
+        Args:
+            tempo (float): Tempo (s) gasto processando a janela.
+            duracao (float): Duração (s) da janela de captura.
+            pendentes (int): Pacotes capturados na janela (antes da
+                amostragem).
+
+        Returns:
+            int: A nova taxa.
+        """
+        carga: float = tempo / duracao
+        processados: float = pendentes / self.taxa
+        anterior: int = self.taxa
+
+        if carga > self.carga_alta or processados > self.limite_pendentes:
+            self.taxa = min(self.taxa * 2, self.taxa_maxima)
+        elif (
+            self.taxa > 1
+            and carga < self.carga_baixa
+            and processados < self.limite_pendentes / 4
+        ):
+            self.taxa //= 2
+
+        if self.taxa != anterior:
+            # nova posição inicial sorteada para a seleção pacote a pacote
+            self._salto = self._rng.randrange(self.taxa)
+
+        if self.taxa > anterior:
+            logging.warning(
+                f"Sobrecarga ({carga:.0%} da janela, {pendentes} pacotes): "
+                f"amostrando 1 em {self.taxa}"
+            )
+        elif self.taxa < anterior:
+            logging.info(
+                "Carga normalizada: contagem exata"
+                if self.taxa == 1
+                else f"Carga reduzida: amostrando 1 em {self.taxa}"
+            )
+
+        return self.taxa
@@ -0,0 +1,400 @@
+"""
+Anel de tamanho fixo com os quadros brutos mais recentes e exportação em pcap.
+
+Funcionalidades principais:
+- Toda a memória é alocada na criação (um `mmap`, anônimo ou em arquivo):
+  cabeçalho, índice com um registro por quadro e área de dados circular.
+  Guardar um quadro é só copiar bytes e gravar campos fixos, sem criar
+  objetos por pacote; os mais antigos são sobrescritos.
+- Escrita sem travas por um único escritor (a captura). Leitores, na
+  mesma ou em outra thread/processo (anel em arquivo), copiam os quadros
+  e só aceitam os que não foram sobrescritos durante a cópia: o número
+  de sequência do registro no índice é conferido antes e depois, e a
+  posição do quadro é comparada com o fim lógico já reservado pelo
+  escritor. A captura nunca espera por uma exportação.
+- `despeja` grava em pcap os quadros dos últimos N segundos, com filtro
+  opcional por IP e porta (TCP/UDP); `despeja_em_segundo_plano` faz o
+  mesmo em outra thread.
+
+Layout do `mmap` (ordem de bytes nativa):
+- Cabeçalho (64 bytes): ``b"NLAN"``, versão, capacidade da área de dados,
+  quantidade de registros do índice, tipo de enlace (pcap), snaplen,
+  quadros escritos e fim lógico da área de dados.
+- Índice: por quadro, sequência, instante, posição lógica, bytes
+  guardados e tamanho original.
+- Dados: quadros contíguos; um quadro que não cabe no fim da área começa
+  de novo no início.
+
+Uso típico:
+    sudo python src/main.py --motor mmap --anel /dev/shm/netlog.anel
+    python src/anel.py /dev/shm/netlog.anel picos.pcap --segundos 30 --ip 10.0.0.7
+"""
+
+import argparse
+import ipaddress
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterator
+
+MAGICO: bytes = b"NLAN"
+VERSAO: int = 1
+LINKTYPE_ETHERNET: int = 1
+
+CABECALHO: struct.Struct = struct.Struct("=4sIQQII")
+CONTADOR: struct.Struct = struct.Struct("=Q")
+POS_ESCRITOS: int = 32
+POS_FIM: int = 40
+TAMANHO_CABECALHO: int = 64
+
+SEQUENCIA: struct.Struct = struct.Struct("=Q")
+CAMPOS: struct.Struct = struct.Struct("=dQII")  # instante, posição, bytes, original
+REGISTRO: struct.Struct = struct.Struct("=QdQII")  # sequência + `CAMPOS`
+TAMANHO_REGISTRO: int = REGISTRO.size
+
+# Marca um registro do índice em escrita
+EM_ESCRITA: int = (1 << 64) - 1
+
+PCAP_GLOBAL: struct.Struct = struct.Struct("=IHHiIII")
+PCAP_REGISTRO: struct.Struct = struct.Struct("=IIII")
+PCAP_MAGICO: int = 0xA1B2C3D4
+
+ETHERTYPE: struct.Struct = struct.Struct("!H")
+IPV4: struct.Struct = struct.Struct("!B8xB2x4s4s")  # versão/IHL, proto, src, dst
+IPV6: struct.Struct = struct.Struct("!6xB1x16s16s")  # próximo cabeçalho, src, dst
+PORTAS: struct.Struct = struct.Struct("!HH")
+
+# (instante, tamanho original, quadro)
+Quadro = tuple[float, int, bytes]
+
+
+def enderecos_e_portas(
+    quadro: bytes,
+) -> tuple[bytes, bytes, int | None, int | None] | None:
+    """
+    Extrai os IPs (brutos) e, em TCP/UDP, as portas de um quadro Ethernet.
+
+    Returns:
+        tuple | None: (src, dst, porta de origem, porta de destino), ou
+        ``None`` se o quadro não for IP.
+    """
+    try:
+        rede: int = 14
+        (tipo,) = ETHERTYPE.unpack_from(quadro, 12)
+        if tipo == 0x8100:  # VLAN
+            rede = 18
+            (tipo,) = ETHERTYPE.unpack_from(quadro, 16)
+
+        if tipo == 0x0800:
+            versao_ihl, protocolo, src, dst = IPV4.unpack_from(quadro, rede)
+            fragmento: int = (quadro[rede + 6] & 0x1F) << 8 | quadro[rede + 7]
+            transporte: int = rede + (versao_ihl & 0x0F) * 4
+            if fragmento:
+                protocolo = 0
+        elif tipo == 0x86DD:
+            protocolo, src, dst = IPV6.unpack_from(quadro, rede)
+            transporte = rede + 40
+        else:
+            return None
+
+        if protocolo in (6, 17):
+            sport, dport = PORTAS.unpack_from(quadro, transporte)
+            return src, dst, sport, dport
+        return src, dst, None, None
+    except (struct.error, IndexError):
+        return None
+
+
+def capacidade_para(tamanho_total: int) -> int:
+    """
+    Retorna a capacidade da área de dados para que o anel inteiro
+    (cabeçalho, índice e dados) ocupe no máximo `tamanho_total` bytes.
+
+    Com o índice padrão (um registro de `TAMANHO_REGISTRO` bytes a cada 64
+    bytes de dados), o índice ocupa metade do tamanho dos dados: os dados
+    ficam com cerca de 2/3 do total.
+    """
+    return max((tamanho_total - TAMANHO_CABECALHO) * 64 // (64 + TAMANHO_REGISTRO), 64)
+
+
+class AnelQuadros:
+    """
+    Anel de quadros brutos em memória pré-alocada.
+
+    Attributes:
+        caminho (str | None): Arquivo do anel (``None``: memória anônima).
+        capacidade (int): Bytes da área de dados.
+        max_quadros (int): Quadros que o índice comporta.
+        linktype (int): Tipo de enlace dos quadros (cabeçalho pcap).
+        snaplen (int): Bytes guardados de cada quadro, no máximo.
+    """
+
+    def __init__(
+        self,
+        capacidade: int = 64 << 20,
+        caminho: str | None = None,
+        max_quadros: int | None = None,
+        snaplen: int = 65535,
+        linktype: int = LINKTYPE_ETHERNET,
+    ):
+        """
+        Cria (ou recria, se `caminho` existir) o anel para escrita.
+
+        Args:
+            capacidade (int): Bytes para os quadros (padrão: 64 MiB).
+            caminho (str | None): Arquivo onde mapear o anel, para que
+                outros processos possam lê-lo (ex.: em ``/dev/shm``).
+            max_quadros (int | None): Tamanho do índice (padrão: um
+                registro a cada 64 bytes de dados, o que soma metade de
+                `capacidade`; ver `capacidade_para`).
+            snaplen (int): Bytes guardados de cada quadro, no máximo.
+            linktype (int): Tipo de enlace dos quadros (padrão: Ethernet).
+        """
+        max_quadros = max_quadros or max(capacidade // 64, 1)
+        tamanho: int = TAMANHO_CABECALHO + max_quadros * TAMANHO_REGISTRO + capacidade
+
+        if caminho is None:
+            self._mmap: mmap.mmap = mmap.mmap(-1, tamanho)
+        else:
+            with open(caminho, "w+b") as f:
+                f.truncate(tamanho)
+                self._mmap = mmap.mmap(f.fileno(), tamanho)
+
+        CABECALHO.pack_into(
+            self._mmap, 0, MAGICO, VERSAO, capacidade, max_quadros, linktype, snaplen
+        )
+        self._inicializa(caminho)
+
+    @classmethod
+    def abre(cls, caminho: str) -> "AnelQuadros":
+        """
+        Abre, para leitura, um anel em arquivo criado por outro processo.
+
+        Raises:
+            ValueError: Se o arquivo não for um anel desta versão.
+        """
+        anel: AnelQuadros = cls.__new__(cls)
+        with open(caminho, "rb") as f:
+            anel._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magico, versao, *_ = CABECALHO.unpack_from(anel._mmap)
+        if magico != MAGICO or versao != VERSAO:
+            anel._mmap.close()
+            raise ValueError(f"{caminho} não é um anel de quadros")
+
+        anel._inicializa(caminho)
+        return anel
+
+    def _inicializa(self, caminho: str | None) -> None:
+        """Lê os parâmetros do cabeçalho e prepara as posições."""
+
+        _, _, capacidade, max_quadros, linktype, snaplen = CABECALHO.unpack_from(
+            self._mmap
+        )
+        self.caminho = caminho
+        self.capacidade: int = capacidade
+        self.max_quadros: int = max_quadros
+        self.linktype: int = linktype
+        self.snaplen: int = snaplen
+        self._visao: memoryview = memoryview(self._mmap)
+        self._dados: int = TAMANHO_CABECALHO + max_quadros * TAMANHO_REGISTRO
+        self._maior_quadro: int = min(snaplen, capacidade)
+
+        # Cópias locais dos contadores (apenas o escritor as atualiza)
+        self._escritos: int = CONTADOR.unpack_from(self._mmap, POS_ESCRITOS)[0]
+        self._fim: int = CONTADOR.unpack_from(self._mmap, POS_FIM)[0]
+
+    @property
+    def escritos(self) -> int:
+        """Quadros escritos desde a criação do anel."""
+
+        return CONTADOR.unpack_from(self._mmap, POS_ESCRITOS)[0]
+
+    def adiciona(
+        self, quadro: bytes | memoryview, instante: float, original: int
+    ) -> None:
+        """
+        Guarda um quadro, sobrescrevendo os mais antigos se preciso.
+
+        Args:
+            quadro (bytes | memoryview): Bytes do quadro (truncados em
+                `snaplen`).
+            instante (float): Horário da captura (segundos desde a época).
+            original (int): Tamanho original do quadro.
+        """
+        capacidade: int = self.capacidade
+        mapa: mmap.mmap = self._mmap
+        tamanho: int = len(quadro)
+        if tamanho > self._maior_quadro:
+            tamanho = self._maior_quadro
+            quadro = quadro[:tamanho]
+
+        inicio: int = self._fim
+        fisico: int = inicio % capacidade
+        if fisico + tamanho > capacidade:
+            inicio += capacidade - fisico
+            fisico = 0
+
+        # Reserva a região antes de escrevê-la, para os leitores descartarem
+        # quadros que estejam sendo sobrescritos
+        self._fim = inicio + tamanho
+        CONTADOR.pack_into(mapa, POS_FIM, self._fim)
+
+        posicao: int = self._dados + fisico
+        mapa[posicao : posicao + tamanho] = quadro
+
+        # Registro marcado como em escrita até a sequência final ser gravada
+        sequencia: int = self._escritos
+        registro: int = (
+            TAMANHO_CABECALHO + (sequencia % self.max_quadros) * TAMANHO_REGISTRO
+        )
+        REGISTRO.pack_into(
+            mapa, registro, EM_ESCRITA, instante, inicio, tamanho, original
+        )
+        SEQUENCIA.pack_into(mapa, registro, sequencia)
+
+        self._escritos = sequencia + 1
+        CONTADOR.pack_into(mapa, POS_ESCRITOS, self._escritos)
+
+    def quadros(self, desde: float = 0.0) -> Iterator[Quadro]:
+        """
+        Gera cópias dos quadros guardados a partir do instante `desde`,
+        do mais antigo para o mais recente, pulando os sobrescritos.
+        """
+        escritos: int = self.escritos
+
+        for sequencia in range(max(0, escritos - self.max_quadros), escritos):
+            registro: int = (
+                TAMANHO_CABECALHO + (sequencia % self.max_quadros) * TAMANHO_REGISTRO
+            )
+            if SEQUENCIA.unpack_from(self._mmap, registro)[0] != sequencia:
+                continue
+
+            instante, inicio, tamanho, original = CAMPOS.unpack_from(
+                self._mmap, registro + SEQUENCIA.size
+            )
+            if instante < desde:
+                continue
+
+            posicao: int = self._dados + inicio % self.capacidade
+            quadro: bytes = bytes(self._visao[posicao : posicao + tamanho])
+
+            # Válido se o registro não foi reaproveitado e a região não foi
+            # reservada de novo pelo escritor durante a cópia
+            if (
+                SEQUENCIA.unpack_from(self._mmap, registro)[0] != sequencia
+                or inicio
+                < CONTADOR.unpack_from(self._mmap, POS_FIM)[0] - self.capacidade
+            ):
+                continue
+
+            yield instante, original, quadro
+
+    def seleciona(
+        self,
+        segundos: float | None = None,
+        ip: str | None = None,
+        porta: int | None = None,
+    ) -> list[Quadro]:
+        """
+        Copia os quadros dos últimos `segundos` que envolvam `ip` e `porta`
+        (como origem ou destino).
+        """
+        desde: float = 0.0 if segundos is None else time.time() - segundos
+        bruto: bytes | None = None if ip is None else ipaddress.ip_address(ip).packed
+
+        selecionados: list[Quadro] = []
+        for instante, original, quadro in self.quadros(desde):
+            if bruto is not None or porta is not None:
+                campos = enderecos_e_portas(quadro)
+                if campos is None:
+                    continue
+                src, dst, sport, dport = campos
+                if bruto is not None and bruto not in (src, dst):
+                    continue
+                if porta is not None and porta not in (sport, dport):
+                    continue
+            selecionados.append((instante, original, quadro))
+
+        return selecionados
+
+    def despeja(
+        self,
+        caminho: str,
+        segundos: float | None = None,
+        ip: str | None = None,
+        porta: int | None = None,
+    ) -> int:
+        """
+        Grava em pcap os quadros selecionados (ver `seleciona`).
+
+        Returns:
+            int: Quantidade de quadros gravados.
+        """
+        selecionados: list[Quadro] = self.seleciona(segundos, ip, porta)
+        escreve_pcap(caminho, selecionados, self.linktype, self.snaplen)
+        return len(selecionados)
+
+    def despeja_em_segundo_plano(
+        self,
+        caminho: str,
+        segundos: float | None = None,
+        ip: str | None = None,
+        porta: int | None = None,
+    ) -> threading.Thread:
+        """
+        Executa `despeja` em outra thread e a retorna (já iniciada).
+        """
+        thread: threading.Thread = threading.Thread(
+            target=self.despeja, args=(caminho, segundos, ip, porta), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """Libera o mapeamento (o arquivo, se houver, é mantido)."""
+
+        self._visao.release()
+        self._mmap.close()
+
+
+def escreve_pcap(
+    caminho: str, quadros: list[Quadro], linktype: int, snaplen: int
+) -> None:
+    """Grava os quadros em um arquivo pcap (microssegundos)."""
+
+    with open(caminho, "wb") as f:
+        f.write(PCAP_GLOBAL.pack(PCAP_MAGICO, 2, 4, 0, 0, snaplen, linktype))
+        for instante, original, quadro in quadros:
+            segundos, fracao = divmod(instante, 1)
+            f.write(
+                PCAP_REGISTRO.pack(
+                    int(segundos), int(fracao * 1_000_000), len(quadro), original
+                )
+            )
+            f.write(quadro)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Grava em pcap os quadros recentes do anel da captura"
+    )
+    parser.add_argument("anel", help="arquivo do anel (opção --anel da captura)")
+    parser.add_argument("saida", help="arquivo pcap de saída")
+    parser.add_argument("--segundos", type=float, help="apenas os últimos N segundos")
+    parser.add_argument("--ip", help="apenas quadros com este IP (origem ou destino)")
+    parser.add_argument("--porta", type=int, help="apenas quadros com esta porta")
+    args = parser.parse_args()
+
+    anel: AnelQuadros = AnelQuadros.abre(args.anel)
+    try:
+        gravados: int = anel.despeja(args.saida, args.segundos, args.ip, args.porta)
+    finally:
+        anel.close()
+    print(f"{gravados} quadro(s) gravado(s) em {os.path.abspath(args.saida)}")
+
+
+if __name__ == "__main__":
+    main()
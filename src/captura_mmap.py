@@ -0,0 +1,291 @@
+"""
+Motor de captura para Linux com anel de memória compartilhada
+(``PACKET_MMAP``, versão ``TPACKET_V3``).
+
+Funcionalidades principais:
+- Abre um socket ``AF_PACKET`` e mapeia o anel de recepção do kernel.
+- Lê blocos inteiros de quadros sem cópia, via `memoryview`, e extrai
+  apenas os campos usados na agregação (IPs e portas TCP).
+- Entrega os pacotes em lotes (um por bloco), já com os IPs na
+  representação inteira de `ip.TABELA`.
+- Expõe as estatísticas do kernel (pacotes recebidos e descartados).
+- No loopback, cada quadro aparece duas vezes (na saída e na entrada);
+  a cópia de saída é descartada para não contar o tráfego em dobro.
+- Opcionalmente, copia cada quadro Ethernet (inclusive do loopback) para
+  um `anel.AnelQuadros`.
+- Opcionalmente, alimenta um `tcp_metricas.MetricasTCP` com os
+  cabeçalhos TCP de todos os quadros.
+
+Requisitos:
+- Linux e privilégios de administrador/root.
+"""
+
+import mmap
+import select
+import socket
+import struct
+import time
+from typing import Iterator
+
+from anel import AnelQuadros
+from ip import BIT_IPV6
+from tcp_metricas import MetricasTCP, campos_tcp
+
+SOL_PACKET: int = 263
+PACKET_RX_RING: int = 5
+PACKET_STATISTICS: int = 6
+PACKET_VERSION: int = 10
+TPACKET_V3: int = 2
+ETH_P_ALL: int = 0x0003
+
+TP_STATUS_KERNEL: int = 0
+TP_STATUS_USER: int = 1
+
+# struct tpacket_block_desc (campos usados de tpacket_hdr_v1)
+BLOCO_STATUS: int = 8
+BLOCO_NUM_PACOTES: int = 12  # seguido de offset_to_first_pkt
+
+# struct tpacket3_hdr: tp_next_offset, tp_sec, tp_nsec, tp_snaplen,
+# tp_len, tp_status, tp_mac, tp_net
+CABECALHO_TPACKET3: struct.Struct = struct.Struct("=6I2H")
+
+# struct sockaddr_ll, logo após o tpacket3_hdr (TPACKET_ALIGN(48)):
+# sll_protocol (ordem de rede), sll_hatype e sll_pkttype
+SOCKADDR_LL: int = 48
+ENDERECO_LL: struct.Struct = struct.Struct("=2x2s4xHB")
+ETHERTYPES_IP: tuple[bytes, bytes] = (b"\x08\x00", b"\x86\xdd")
+ARPHRD_ETHER: int = 1
+ARPHRD_LOOPBACK: int = 772
+# Enlaces cujos quadros têm cabeçalho Ethernet (o pcap do anel é Ethernet);
+# os demais (túneis, PPP, ...) começam direto no IP e não vão para o anel
+ENLACES_ETHERNET: tuple[int, int] = (ARPHRD_ETHER, ARPHRD_LOOPBACK)
+PACKET_OUTGOING: int = 4
+
+IPV4: struct.Struct = struct.Struct("!B8xB2xII")  # versão/IHL, proto, src, dst
+IPV6: struct.Struct = struct.Struct("!6xB1xQQQQ")  # próximo cabeçalho, src, dst
+PORTAS: struct.Struct = struct.Struct("!HH")
+
+# (src, dst, porta de origem, porta de destino, tamanho)
+PacoteTCP = tuple[int, int, int, int, int]
+
+
+def extrai_tcp(quadro: memoryview, rede: int, tamanho: int) -> PacoteTCP | None:
+    """
+    Extrai IPs e portas de um pacote TCP a partir do cabeçalho de rede.
+
+    Args:
+        quadro (memoryview): Buffer que contém o pacote.
+        rede (int): Posição do cabeçalho IP em `quadro`.
+        tamanho (int): Tamanho original do quadro.
+
+    Returns:
+        PacoteTCP | None: Os campos do pacote, ou ``None`` se não for TCP
+        (ou for um fragmento sem o cabeçalho TCP).
+    """
+    versao: int = quadro[rede] >> 4
+
+    if versao == 4:
+        versao_ihl, protocolo, src, dst = IPV4.unpack_from(quadro, rede)
+        fragmento: int = (quadro[rede + 6] & 0x1F) << 8 | quadro[rede + 7]
+        if protocolo != 6 or fragmento:
+            return None
+        sport, dport = PORTAS.unpack_from(quadro, rede + (versao_ihl & 0x0F) * 4)
+        return src, dst, sport, dport, tamanho
+
+    if versao == 6:
+        proximo, src_a, src_b, dst_a, dst_b = IPV6.unpack_from(quadro, rede)
+        if proximo != 6:
+            return None
+        sport, dport = PORTAS.unpack_from(quadro, rede + 40)
+        return (
+            (src_a << 64 | src_b) | BIT_IPV6,
+            (dst_a << 64 | dst_b) | BIT_IPV6,
+            sport,
+            dport,
+            tamanho,
+        )
+
+    return None
+
+
+class CapturaMmap:
+    """
+    Captura pacotes pelo anel ``TPACKET_V3`` de um socket ``AF_PACKET``.
+
+    Attributes:
+        interface (str | None): Interface capturada (``None``: todas).
+        tamanho_bloco (int): Tamanho (bytes) de cada bloco do anel.
+        num_blocos (int): Quantidade de blocos do anel.
+        quadros (int): Quadros lidos do anel (TCP ou não), sem as cópias
+            de saída do loopback.
+        pacotes (int): Pacotes recebidos pelo kernel desde a abertura.
+        descartados (int): Pacotes descartados pelo kernel (anel cheio).
+        anel (AnelQuadros | None): Se definido, recebe uma cópia de cada
+            quadro Ethernet lido (TCP ou não).
+        tcp (MetricasTCP | None): Se definido, recebe os campos de cada
+            segmento TCP lido.
+    """
+
+    def __init__(
+        self,
+        interface: str | None = None,
+        tamanho_bloco: int = 1 << 20,
+        num_blocos: int = 64,
+        tamanho_quadro: int = 2048,
+        espera_bloco_ms: int = 100,
+    ):
+        """
+        Abre o socket e mapeia o anel de recepção.
+
+        Args:
+            interface (str | None): Interface a capturar (padrão: todas).
+            tamanho_bloco (int): Tamanho de cada bloco (múltiplo da página).
+            num_blocos (int): Quantidade de blocos.
+            tamanho_quadro (int): Tamanho nominal de quadro exigido pelo
+                kernel (no V3 os quadros têm tamanho variável).
+            espera_bloco_ms (int): Tempo máximo até o kernel entregar um
+                bloco parcialmente cheio.
+
+        Raises:
+            OSError: Se o sistema não suportar ``AF_PACKET``/``TPACKET_V3``
+                ou faltarem privilégios.
+        """
+        self.interface = interface
+        self.tamanho_bloco = tamanho_bloco
+        self.num_blocos = num_blocos
+        self.quadros: int = 0
+        self.pacotes: int = 0
+        self.descartados: int = 0
+        self.anel: AnelQuadros | None = None
+        self.tcp: MetricasTCP | None = None
+        self._atual: int = 0
+
+        self._sock: socket.socket = socket.socket(
+            socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL)
+        )
+        try:
+            self._sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            requisicao: bytes = struct.pack(
+                "=7I",
+                tamanho_bloco,
+                num_blocos,
+                tamanho_quadro,
+                tamanho_bloco * num_blocos // tamanho_quadro,
+                espera_bloco_ms,
+                0,  # tp_sizeof_priv
+                0,  # tp_feature_req_word
+            )
+            self._sock.setsockopt(SOL_PACKET, PACKET_RX_RING, requisicao)
+
+            if interface is not None:
+                self._sock.bind((interface, ETH_P_ALL))
+
+            self._anel: mmap.mmap = mmap.mmap(
+                self._sock.fileno(),
+                tamanho_bloco * num_blocos,
+                mmap.MAP_SHARED,
+                mmap.PROT_READ | mmap.PROT_WRITE,
+            )
+        except OSError:
+            self._sock.close()
+            raise
+
+        self._visao: memoryview = memoryview(self._anel)
+        self._poll: select.poll = select.poll()
+        self._poll.register(self._sock, select.POLLIN | select.POLLERR)
+
+    def _bloco_pronto(self) -> bool:
+        """Indica se o bloco atual já foi entregue pelo kernel."""
+
+        base: int = self._atual * self.tamanho_bloco
+        return bool(self._visao[base + BLOCO_STATUS] & TP_STATUS_USER)
+
+    def _le_bloco(self) -> list[PacoteTCP]:
+        """
+        Extrai os pacotes TCP do bloco atual e o devolve ao kernel. Só os
+        quadros IPv4 e IPv6 (pelo ``sll_protocol``) são lidos como IP.
+        """
+        visao: memoryview = self._visao
+        base: int = self._atual * self.tamanho_bloco
+        num_pacotes, deslocamento = struct.unpack_from(
+            "=II", visao, base + BLOCO_NUM_PACOTES
+        )
+
+        anel: AnelQuadros | None = self.anel
+        tcp: MetricasTCP | None = self.tcp
+        lote: list[PacoteTCP] = []
+        duplicatas: int = 0
+        posicao: int = base + deslocamento
+        for _ in range(num_pacotes):
+            proximo, seg, nseg, capturado, tamanho, _, mac, rede = (
+                CABECALHO_TPACKET3.unpack_from(visao, posicao)
+            )
+            protocolo, enlace, sentido = ENDERECO_LL.unpack_from(
+                visao, posicao + SOCKADDR_LL
+            )
+            if enlace == ARPHRD_LOOPBACK and sentido == PACKET_OUTGOING:
+                # Duplicata do loopback: o mesmo quadro volta como entrada
+                duplicatas += 1
+                posicao += proximo
+                continue
+            if anel is not None and enlace in ENLACES_ETHERNET:
+                inicio: int = posicao + mac
+                anel.adiciona(
+                    visao[inicio : inicio + capturado], seg + nseg * 1e-9, tamanho
+                )
+            if protocolo not in ETHERTYPES_IP:
+                # ARP, MPLS, LLDP...: o cabeçalho de rede não é IP
+                posicao += proximo
+                continue
+            pacote: PacoteTCP | None = extrai_tcp(visao, posicao + rede, tamanho)
+            if pacote is not None:
+                lote.append(pacote)
+                if tcp is not None:
+                    campos = campos_tcp(visao, posicao + rede)
+                    if campos is not None:
+                        tcp.processa(seg + nseg * 1e-9, *campos)
+            posicao += proximo
+
+        self.quadros += num_pacotes - duplicatas
+        struct.pack_into("=I", visao, base + BLOCO_STATUS, TP_STATUS_KERNEL)
+        self._atual = (self._atual + 1) % self.num_blocos
+        return lote
+
+    def lotes(self, timeout: float) -> Iterator[list[PacoteTCP]]:
+        """
+        Gera lotes de pacotes TCP (um por bloco) durante `timeout` segundos.
+
+        Args:
+            timeout (float): Duração da captura, em segundos.
+        """
+        fim: float = time.monotonic() + timeout
+
+        while (restante := fim - time.monotonic()) > 0:
+            if not self._bloco_pronto():
+                self._poll.poll(restante * 1000)
+                continue
+            yield self._le_bloco()
+
+        self.atualiza_estatisticas()
+
+    def atualiza_estatisticas(self) -> tuple[int, int]:
+        """
+        Lê (e zera, no kernel) os contadores do socket, acumulando em
+        `pacotes` e `descartados`.
+
+        Returns:
+            tuple[int, int]: Totais de pacotes recebidos e descartados.
+        """
+        recebidos, descartados, _ = struct.unpack(
+            "=3I", self._sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 12)
+        )
+        self.pacotes += recebidos
+        self.descartados += descartados
+        return self.pacotes, self.descartados
+
+    def close(self) -> None:
+        """Libera o anel e fecha o socket."""
+
+        self._visao.release()
+        self._anel.close()
+        self._sock.close()
@@ -0,0 +1,533 @@
+"""
+Gerador de carga local para os servidores HTTP/FTP e a captura.
+
+Funcionalidades principais:
+- Inicia `Server` (em outro processo) servindo arquivos de teste e o
+  `NetLogger` (em outro processo), capturando o loopback.
+- Para cada nível de carga (concorrência x tamanho de arquivo), clientes
+  asyncio baixam os arquivos por HTTP e FTP durante alguns segundos, com
+  taxa de requisições opcionalmente limitada.
+- Os clientes usam o IP de origem ``127.0.0.2``, então o tráfego gerado é
+  separado de qualquer outro pelo IP.
+- Compara os bytes de aplicação transferidos com os contados pela captura
+  (recebidos pelo `NetLogger.adiciona_destino`), por protocolo, e relata
+  vazão e precisão da captura em cada nível.
+
+Contabilidade:
+- A captura conta quadros inteiros; a carga útil estimada desconta
+  `CABECALHOS_QUADRO` bytes por pacote (Ethernet + IPv4 + TCP com
+  timestamps, como no loopback do Linux).
+- As conexões de dados do FTP passivo usam portas efêmeras e são
+  classificadas como ``"Outro"`` por `netlog.http_ftp`; aqui elas contam
+  como FTP.
+
+Uso:
+    sudo python src/carga.py [--concorrencias 1,8,32] \
+        [--tamanhos 16384,1048576] [--taxa 0] [--duracao 5] [--motor mmap]
+
+Requisitos:
+- Privilégios de administrador/root (captura) e as portas 8000 e 2121
+  livres (são as portas que a captura classifica como HTTP e FTP).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import queue
+import re
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from multiprocessing import Event, Process, Queue
+from multiprocessing.synchronize import Event as EventoProcesso
+
+SERVIDOR: str = "127.0.0.1"
+CLIENTE: str = "127.0.0.2"
+PORTA_HTTP: int = 8000
+PORTA_FTP: int = 2121
+PROTOCOLOS: tuple[str, ...] = ("HTTP", "FTP")
+
+CABECALHOS_QUADRO: int = 14 + 20 + 32
+TAMANHO_BLOCO: int = 64 * 1024
+# Tempo para os últimos quadros (FIN/ACK) chegarem à captura após a carga
+MARGEM_ENTREGA: float = 0.2
+
+# Protocolo da captura -> protocolo da carga (dados do FTP passivo: "Outro")
+PROTOCOLO_CAPTURA: dict[str, str] = {"HTTP": "HTTP", "FTP": "FTP", "Outro": "FTP"}
+
+# Por protocolo: bytes enviados, bytes recebidos, requisições, falhas
+Transferidos = defaultdict[str, list[int]]
+
+# Por protocolo: bytes enviados, bytes recebidos, pacotes enviados,
+# pacotes recebidos (do ponto de vista do cliente)
+Capturados = defaultdict[str, list[int]]
+
+
+@dataclass
+class Nivel:
+    """
+    Um nível de carga.
+
+    Attributes:
+        concorrencia (int): Clientes simultâneos por protocolo.
+        tamanho (int): Tamanho (bytes) do arquivo baixado.
+        taxa (float): Requisições por segundo por protocolo (0: sem limite).
+    """
+
+    concorrencia: int
+    tamanho: int
+    taxa: float = 0.0
+
+
+def nome_arquivo(tamanho: int) -> str:
+    """Nome do arquivo de teste com `tamanho` bytes."""
+
+    return f"carga_{tamanho}.bin"
+
+
+async def requisicao_http(arquivo: str) -> tuple[int, int]:
+    """
+    Baixa `arquivo` por HTTP em uma conexão nova.
+
+    Returns:
+        tuple[int, int]: Bytes enviados e recebidos (pedido e resposta,
+        com cabeçalhos HTTP).
+
+    Raises:
+        ValueError: Se a resposta não for ``200``.
+    """
+    reader, writer = await asyncio.open_connection(
+        SERVIDOR, PORTA_HTTP, local_addr=(CLIENTE, 0)
+    )
+    pedido: bytes = (
+        f"GET /{arquivo} HTTP/1.1\r\nHost: {SERVIDOR}\r\nConnection: close\r\n\r\n"
+    ).encode("ascii")
+
+    try:
+        writer.write(pedido)
+        await writer.drain()
+        status: bytes = await reader.readline()
+        recebidos: int = len(status)
+        while bloco := await reader.read(TAMANHO_BLOCO):
+            recebidos += len(bloco)
+    finally:
+        writer.close()
+
+    if status.split()[1:2] != [b"200"]:
+        raise ValueError(f"Resposta HTTP inesperada: {status!r}")
+    return len(pedido), recebidos
+
+
+async def requisicao_ftp(arquivo: str) -> tuple[int, int]:
+    """
+    Baixa `arquivo` por FTP (login anônimo, modo passivo) em uma sessão
+    nova.
+
+    Returns:
+        tuple[int, int]: Bytes enviados e recebidos (comandos, respostas
+        e dados).
+
+    Raises:
+        ValueError: Se o servidor responder com erro.
+    """
+    reader, writer = await asyncio.open_connection(
+        SERVIDOR, PORTA_FTP, local_addr=(CLIENTE, 0)
+    )
+    enviados: int = 0
+    recebidos: int = 0
+
+    async def resposta() -> str:
+        nonlocal recebidos
+        linha: bytes = await reader.readline()
+        recebidos += len(linha)
+        if not linha[:1].isdigit() or linha[:1] in b"45":
+            raise ValueError(f"Resposta FTP inesperada: {linha!r}")
+        return linha.decode("utf-8", "replace")
+
+    async def comando(texto: str) -> str:
+        nonlocal enviados
+        linha: bytes = f"{texto}\r\n".encode("utf-8")
+        writer.write(linha)
+        enviados += len(linha)
+        return await resposta()
+
+    try:
+        await resposta()
+        await comando("USER anonymous")
+        await comando("PASS carga@")
+        await comando("TYPE I")
+        passivo = re.search(r"\((\d+(?:,\d+){5})\)", await comando("PASV"))
+        if passivo is None:
+            raise ValueError("Resposta PASV sem endereço")
+        numeros: list[int] = [int(n) for n in passivo.group(1).split(",")]
+
+        dados_r, dados_w = await asyncio.open_connection(
+            SERVIDOR, numeros[4] << 8 | numeros[5], local_addr=(CLIENTE, 0)
+        )
+        try:
+            await comando(f"RETR {arquivo}")
+            while bloco := await dados_r.read(TAMANHO_BLOCO):
+                recebidos += len(bloco)
+        finally:
+            dados_w.close()
+
+        await resposta()
+        await comando("QUIT")
+    finally:
+        writer.close()
+
+    return enviados, recebidos
+
+
+REQUISICOES = {"HTTP": requisicao_http, "FTP": requisicao_ftp}
+
+
+async def _cliente(
+    protocolo: str,
+    arquivo: str,
+    fim: float,
+    intervalo: float,
+    transferidos: Transferidos,
+) -> None:
+    """Repete requisições até `fim`, uma a cada `intervalo` s (0: sem pausa)."""
+
+    contadores: list[int] = transferidos[protocolo]
+    proxima: float = time.monotonic()
+
+    while (agora := time.monotonic()) < fim:
+        if intervalo:
+            if agora < proxima:
+                await asyncio.sleep(min(proxima, fim) - agora)
+                continue
+            proxima += intervalo
+
+        try:
+            enviados, recebidos = await REQUISICOES[protocolo](arquivo)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as erro:
+            logging.debug(f"Falha {protocolo}: {erro}")
+            contadores[3] += 1
+            continue
+
+        contadores[0] += enviados
+        contadores[1] += recebidos
+        contadores[2] += 1
+
+
+async def gera_carga(nivel: Nivel, duracao: float) -> Transferidos:
+    """
+    Executa um nível de carga por `duracao` segundos.
+
+    Returns:
+        Transferidos: Bytes de aplicação, requisições e falhas por protocolo.
+    """
+    transferidos: Transferidos = defaultdict(lambda: [0, 0, 0, 0])
+    fim: float = time.monotonic() + duracao
+    intervalo: float = nivel.concorrencia / nivel.taxa if nivel.taxa else 0.0
+    arquivo: str = nome_arquivo(nivel.tamanho)
+
+    await asyncio.gather(
+        *(
+            _cliente(protocolo, arquivo, fim, intervalo, transferidos)
+            for protocolo in PROTOCOLOS
+            for _ in range(nivel.concorrencia)
+        )
+    )
+    return transferidos
+
+
+def _processo_servidores(raiz: str, assincrono: bool) -> None:
+    """Alvo do processo dos servidores."""
+
+    from servers import Server
+
+    servidor = Server(PORTA_HTTP, PORTA_FTP, raiz=raiz)
+    if assincrono:
+        servidor.start_async()
+    else:
+        servidor.start()
+
+
+def _processo_captura(
+    csv_path: str,
+    motor: str,
+    janela: int,
+    fila: Queue,
+    pronto: EventoProcesso,
+    parar: EventoProcesso,
+) -> None:
+    """
+    Alvo do processo de captura: envia a `fila`, a cada janela, o horário
+    em que ela começou e os contadores do IP dos clientes por protocolo.
+    """
+    from ip import TABELA
+    from netlog import NetLogger
+
+    logger = NetLogger(csv_path, motor=motor)
+    logger.conexoes.update(TABELA.interna(ip) for ip in (SERVIDOR, CLIENTE))
+    cliente: int = TABELA.interna(CLIENTE)
+    inicio_janela: float = time.time()
+
+    def destino(hora: str, linhas: list) -> None:
+        do_cliente: list[tuple] = [
+            (protocolo, enviado, recebido, pac_env, pac_rec)
+            for ip, protocolo, enviado, recebido, _, pac_env, pac_rec, _ in linhas
+            if ip == cliente
+        ]
+        fila.put((inicio_janela, do_cliente))
+
+    logger.adiciona_destino(destino)
+    pronto.set()
+    while not parar.is_set():
+        inicio_janela = time.time()
+        logger.processa_pacotes(timeout=janela)
+
+
+def espera_porta(porta: int, limite: float = 10.0) -> None:
+    """
+    Aguarda até a porta do servidor aceitar conexões.
+
+    Raises:
+        TimeoutError: Se a porta não abrir em `limite` segundos.
+    """
+    fim: float = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            socket.create_connection((SERVIDOR, porta), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"porta {porta} não abriu")
+
+
+class GeradorCarga:
+    """
+    Executa níveis de carga com os servidores e a captura em processos
+    separados.
+
+    Attributes:
+        raiz (str): Diretório temporário com os arquivos servidos.
+        janela (int): Duração (s) das janelas da captura.
+        tolerancia (float): Erro relativo máximo aceito entre a carga útil
+            capturada e os bytes transferidos.
+    """
+
+    def __init__(
+        self,
+        tamanhos: list[int],
+        motor: str = "mmap",
+        servidores_async: bool = True,
+        janela: int = 1,
+        tolerancia: float = 0.02,
+    ):
+        """
+        Cria os arquivos de teste e inicia servidores e captura.
+
+        Args:
+            tamanhos (list[int]): Tamanhos (bytes) dos arquivos de teste.
+            motor (str): Motor de captura do `NetLogger`.
+            servidores_async (bool): Servidores no modo asyncio.
+            janela (int): Duração (s) das janelas da captura.
+            tolerancia (float): Erro relativo máximo aceito.
+
+        Raises:
+            TimeoutError: Se os servidores ou a captura não iniciarem.
+        """
+        self._temporario = tempfile.TemporaryDirectory()
+        self.raiz: str = self._temporario.name
+        self.janela = janela
+        self.tolerancia = tolerancia
+
+        for tamanho in tamanhos:
+            with open(os.path.join(self.raiz, nome_arquivo(tamanho)), "wb") as f:
+                f.write(os.urandom(tamanho))
+
+        self._fila: Queue = Queue()
+        self._parar: EventoProcesso = Event()
+        pronto: EventoProcesso = Event()
+
+        self._servidores = Process(
+            target=_processo_servidores,
+            args=(self.raiz, servidores_async),
+            daemon=True,
+        )
+        self._captura = Process(
+            target=_processo_captura,
+            args=(
+                os.path.join(self.raiz, "netlog.csv"),
+                motor,
+                janela,
+                self._fila,
+                pronto,
+                self._parar,
+            ),
+            daemon=True,
+        )
+        self._servidores.start()
+        self._captura.start()
+
+        espera_porta(PORTA_HTTP)
+        espera_porta(PORTA_FTP)
+        if not pronto.wait(10):
+            self.close()
+            raise TimeoutError("captura não iniciou")
+
+    def _descarta_janelas(self) -> None:
+        """Descarta as janelas já entregues (de antes do nível)."""
+
+        while True:
+            try:
+                self._fila.get_nowait()
+            except queue.Empty:
+                return
+
+    def _coleta_janelas(self, fim: float) -> Capturados:
+        """
+        Soma as janelas entregues até a primeira que começou depois de
+        `fim` (horário em que a carga terminou). Essa janela ainda é
+        somada: pacotes que chegaram durante o processamento da anterior
+        só são lidos nela.
+        """
+        capturados: Capturados = defaultdict(lambda: [0, 0, 0, 0])
+
+        while True:
+            instante, linhas = self._fila.get(timeout=self.janela * 3 + 10)
+            for protocolo, *valores in linhas:
+                contadores = capturados[PROTOCOLO_CAPTURA[protocolo]]
+                for i, valor in enumerate(valores):
+                    contadores[i] += valor
+            if instante > fim + MARGEM_ENTREGA:
+                return capturados
+
+    def executa(self, nivel: Nivel, duracao: float) -> list[dict]:
+        """
+        Executa um nível e compara transferência e captura.
+
+        Returns:
+            list[dict]: Uma linha de relatório por protocolo.
+        """
+        self._descarta_janelas()
+        transferidos: Transferidos = asyncio.run(gera_carga(nivel, duracao))
+        capturados: Capturados = self._coleta_janelas(time.time())
+
+        relatorio: list[dict] = []
+        for protocolo in PROTOCOLOS:
+            enviados, recebidos, requisicoes, falhas = transferidos[protocolo]
+            cap_env, cap_rec, pac_env, pac_rec = capturados[protocolo]
+            aplicacao: int = enviados + recebidos
+            carga_util: int = (
+                cap_env + cap_rec - (pac_env + pac_rec) * CABECALHOS_QUADRO
+            )
+            precisao: float = carga_util / aplicacao if aplicacao else 0.0
+
+            relatorio.append(
+                {
+                    "concorrencia": nivel.concorrencia,
+                    "tamanho": nivel.tamanho,
+                    "protocolo": protocolo,
+                    "requisicoes": requisicoes,
+                    "falhas": falhas,
+                    "req_s": requisicoes / duracao,
+                    "mib_s": aplicacao / duracao / (1 << 20),
+                    "bytes_aplicacao": aplicacao,
+                    "bytes_capturados": cap_env + cap_rec,
+                    "pacotes": pac_env + pac_rec,
+                    "precisao": precisao,
+                    "ok": aplicacao > 0 and abs(precisao - 1) <= self.tolerancia,
+                }
+            )
+
+        return relatorio
+
+    def close(self) -> None:
+        """Encerra a captura e os servidores e apaga os arquivos de teste."""
+
+        self._parar.set()
+        self._captura.join(self.janela + 5)
+        for processo in (self._captura, self._servidores):
+            if processo.is_alive():
+                processo.terminate()
+                processo.join()
+        self._temporario.cleanup()
+
+
+def imprime(relatorio: list[dict]) -> None:
+    """Imprime o relatório de um nível."""
+
+    for linha in relatorio:
+        print(
+            f"{linha['concorrencia']:>5} {linha['tamanho']:>10} "
+            f"{linha['protocolo']:<5} {linha['requisicoes']:>7} "
+            f"{linha['falhas']:>6} {linha['req_s']:>9.1f} {linha['mib_s']:>9.2f} "
+            f"{linha['bytes_aplicacao']:>13} {linha['bytes_capturados']:>13} "
+            f"{linha['precisao']:>9.2%} {'ok' if linha['ok'] else 'DIVERGE'}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Gera carga HTTP/FTP no loopback e confere a captura"
+    )
+    parser.add_argument(
+        "--concorrencias",
+        default="1,8,32",
+        help="clientes simultâneos por protocolo, separados por vírgula",
+    )
+    parser.add_argument(
+        "--tamanhos",
+        default="16384,1048576",
+        help="tamanhos de arquivo (bytes), separados por vírgula",
+    )
+    parser.add_argument(
+        "--taxa",
+        type=float,
+        default=0.0,
+        help="requisições por segundo por protocolo (padrão: sem limite)",
+    )
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos por nível")
+    parser.add_argument("--motor", choices=("scapy", "mmap"), default="mmap")
+    parser.add_argument(
+        "--servidores", choices=("threads", "asyncio"), default="asyncio"
+    )
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=0.02,
+        help="erro relativo aceito entre captura e transferência (padrão: 0.02)",
+    )
+    args = parser.parse_args()
+
+    concorrencias: list[int] = [int(c) for c in args.concorrencias.split(",")]
+    tamanhos: list[int] = [int(t) for t in args.tamanhos.split(",")]
+
+    gerador = GeradorCarga(
+        tamanhos,
+        motor=args.motor,
+        servidores_async=args.servidores == "asyncio",
+        tolerancia=args.tolerancia,
+    )
+    divergencias: int = 0
+    try:
+        print(
+            f"{'conc':>5} {'tamanho':>10} {'proto':<5} {'req':>7} {'falhas':>6} "
+            f"{'req/s':>9} {'MiB/s':>9} {'aplicação':>13} {'capturado':>13} "
+            f"{'precisão':>9}"
+        )
+        for concorrencia in concorrencias:
+            for tamanho in tamanhos:
+                relatorio = gerador.executa(
+                    Nivel(concorrencia, tamanho, args.taxa), args.duracao
+                )
+                imprime(relatorio)
+                divergencias += sum(not linha["ok"] for linha in relatorio)
+    finally:
+        gerador.close()
+
+    sys.exit(1 if divergencias else 0)
+
+
+if __name__ == "__main__":
+    main()
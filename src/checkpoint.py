@@ -0,0 +1,167 @@
+"""
+Checkpoint binário dos contadores do NetLogger, para retomar após reinícios.
+
+Formato (inteiros em big-endian):
+- Cabeçalho: ``b"NLCK"``, versão (1 byte), número da iteração, posição do
+  CSV após a última janela gravada, quantidade de registros e a data/hora
+  da última janela (texto UTF-8 prefixado pelo tamanho).
+- Registros: família (4/6), IP em 16 bytes, código do protocolo e os
+  totais de bytes enviados e recebidos.
+- CRC32 de todo o conteúdo anterior.
+
+O arquivo é gravado em um temporário, sincronizado com `os.fsync` e
+renomeado sobre o anterior (`os.replace`), de modo que uma queda no meio
+da gravação nunca deixa um checkpoint parcial. O tamanho depende apenas
+da quantidade de pares (IP, protocolo), não do histórico, então a
+retomada leva tempo constante.
+"""
+
+import logging
+import os
+import struct
+import zlib
+from dataclasses import dataclass, field
+
+from ip import BIT_IPV6
+
+MAGICO: bytes = b"NLCK"
+VERSAO: int = 1
+
+CABECALHO: struct.Struct = struct.Struct("!4sBQQQH")
+REGISTRO: struct.Struct = struct.Struct("!B16sBQQ")
+CRC: struct.Struct = struct.Struct("!I")
+
+# Códigos dos protocolos gravados no checkpoint (ver `netlog.http_ftp`)
+PROTOCOLOS_CONEXAO: tuple[str, ...] = ("HTTP", "FTP", "Outro")
+
+
+@dataclass
+class Checkpoint:
+    """
+    Estado persistido do NetLogger.
+
+    Attributes:
+        numero_iteracao (int): Última iteração concluída.
+        ultima_janela (str): Data/hora da última janela gravada no CSV.
+        csv_offset (int): Tamanho do CSV logo após a última janela.
+        totais (dict): Totais ``[enviado, recebido]`` por (IP, protocolo),
+            com o IP na representação inteira de `ip`.
+    """
+
+    numero_iteracao: int = 0
+    ultima_janela: str = ""
+    csv_offset: int = 0
+    totais: dict[tuple[int, str], list[int]] = field(default_factory=dict)
+
+
+def serializa(checkpoint: Checkpoint) -> bytes:
+    """Converte o checkpoint para o formato binário."""
+
+    janela: bytes = checkpoint.ultima_janela.encode("utf-8")
+    partes: list[bytes] = [
+        CABECALHO.pack(
+            MAGICO,
+            VERSAO,
+            checkpoint.numero_iteracao,
+            checkpoint.csv_offset,
+            len(checkpoint.totais),
+            len(janela),
+        ),
+        janela,
+    ]
+
+    for (ip, protocolo), (enviado, recebido) in checkpoint.totais.items():
+        familia: int = 6 if ip & BIT_IPV6 else 4
+        partes.append(
+            REGISTRO.pack(
+                familia,
+                (ip & ~BIT_IPV6).to_bytes(16, "big"),
+                PROTOCOLOS_CONEXAO.index(protocolo),
+                enviado,
+                recebido,
+            )
+        )
+
+    conteudo: bytes = b"".join(partes)
+    return conteudo + CRC.pack(zlib.crc32(conteudo))
+
+
+def desserializa(dados: bytes) -> Checkpoint:
+    """
+    Lê um checkpoint do formato binário.
+
+    Raises:
+        ValueError: Se os dados estiverem corrompidos ou em outro formato.
+    """
+    if len(dados) < CABECALHO.size + CRC.size:
+        raise ValueError("checkpoint truncado")
+
+    conteudo, (crc,) = dados[: -CRC.size], CRC.unpack(dados[-CRC.size :])
+    if zlib.crc32(conteudo) != crc:
+        raise ValueError("CRC do checkpoint não confere")
+
+    magico, versao, iteracao, offset, quantidade, tam_janela = CABECALHO.unpack_from(
+        conteudo
+    )
+    if magico != MAGICO or versao != VERSAO:
+        raise ValueError("formato de checkpoint desconhecido")
+
+    posicao: int = CABECALHO.size
+    janela: str = conteudo[posicao : posicao + tam_janela].decode("utf-8")
+    posicao += tam_janela
+
+    totais: dict[tuple[int, str], list[int]] = {}
+    for familia, bruto, codigo, enviado, recebido in REGISTRO.iter_unpack(
+        conteudo[posicao : posicao + quantidade * REGISTRO.size]
+    ):
+        ip: int = int.from_bytes(bruto, "big")
+        if familia == 6:
+            ip |= BIT_IPV6
+        totais[(ip, PROTOCOLOS_CONEXAO[codigo])] = [enviado, recebido]
+
+    if len(totais) != quantidade:
+        raise ValueError("checkpoint truncado")
+
+    return Checkpoint(iteracao, janela, offset, totais)
+
+
+def salva(caminho: str, checkpoint: Checkpoint) -> None:
+    """
+    Grava o checkpoint de forma atômica (temporário + fsync + rename).
+    """
+    temporario: str = caminho + ".tmp"
+
+    with open(temporario, "wb") as f:
+        f.write(serializa(checkpoint))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temporario, caminho)
+
+    # Garante que a renomeação em si chegou ao disco (POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        diretorio: int = os.open(
+            os.path.dirname(os.path.abspath(caminho)), os.O_DIRECTORY
+        )
+        try:
+            os.fsync(diretorio)
+        finally:
+            os.close(diretorio)
+
+
+def carrega(caminho: str) -> Checkpoint | None:
+    """
+    Carrega o checkpoint, se existir e estiver íntegro.
+
+    Returns:
+        Checkpoint | None: O checkpoint, ou ``None`` se não houver um
+        válido (o motivo é registrado no log).
+    """
+    try:
+        with open(caminho, "rb") as f:
+            return desserializa(f.read())
+    except FileNotFoundError:
+        return None
+    except ValueError as erro:
+        logging.warning(f"Checkpoint {caminho} ignorado: {erro}")
+        return None
@@ -0,0 +1,500 @@
+"""
+Coleta central das janelas agregadas por vários NetLoggers (agentes).
+
+Funcionalidades principais:
+- `Agente`: destino do `NetLogger` que envia as linhas de cada janela ao
+  coletor por TCP, em lotes de uma ou mais janelas. Janelas não
+  confirmadas ficam pendentes (até um limite) e são reenviadas na próxima
+  tentativa, então uma queda do coletor não perde dados. O envio é feito
+  por uma thread própria, fora da thread da captura.
+- `Coletor`: servidor asyncio que recebe os lotes de todos os agentes e
+  os grava em um único CSV com a coluna ``host``, lido pela interface
+  (variável de ambiente ``NETLOG_CSV``). Janelas repetidas de um mesmo
+  agente (reenvio após falha na confirmação) são descartadas pelo número
+  de sequência, inclusive depois de reiniciar o coletor (lido do fim do
+  CSV existente).
+
+Protocolo (inteiros em big-endian):
+- Cada lote é um quadro: tamanho (4 bytes) seguido do conteúdo
+  comprimido com zlib. O coletor responde ``ACK`` (1 byte) a cada quadro
+  gravado.
+- Conteúdo: ``b"NLAG"``, versão, tamanho do nome do host, quantidade de
+  janelas, sessão do agente (aleatória, escolhida ao iniciá-lo) e o nome
+  do host; para cada janela, número de sequência (crescente na sessão),
+  tamanho da data/hora, quantidade de linhas e a data/hora; e, para cada
+  linha, família (4/6), IP em 16 bytes, códigos do protocolo e do tipo,
+  bytes e pacotes enviados/recebidos e a taxa de amostragem.
+
+Uso típico:
+    python src/coletor.py --porta 9100                # coletor
+    sudo python src/main.py --coletor 10.0.0.5:9100   # em cada host
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import socket
+import struct
+import threading
+import zlib
+from collections import deque
+from typing import TextIO
+
+from checkpoint import PROTOCOLOS_CONEXAO
+from colunas import COLUNAS_CSV, Linha
+from ip import BIT_IPV6, TABELA
+
+MAGICO: bytes = b"NLAG"
+VERSAO: int = 2
+ACK: bytes = b"\x06"
+PORTA_PADRAO: int = 9100
+MAX_QUADRO: int = 64 << 20
+LEITURA_CAUDA: int = 1 << 20
+
+TAMANHO: struct.Struct = struct.Struct("!I")
+CABECALHO: struct.Struct = struct.Struct("!4sBBHQ")
+JANELA: struct.Struct = struct.Struct("!QBI")
+LINHA: struct.Struct = struct.Struct("!B16sBB4QI")
+
+TIPOS: tuple[str, ...] = ("remetente", "destino")
+
+# (número de sequência, data/hora, linhas)
+Janela = tuple[int, str, list[Linha]]
+
+
+def codifica(host: str, sessao: int, janelas: list[Janela]) -> bytes:
+    """
+    Monta o quadro (tamanho + conteúdo comprimido) de um lote de janelas.
+
+    Args:
+        host (str): Nome do host do agente.
+        sessao (int): Sessão do agente (64 bits).
+        janelas (list[Janela]): Janelas numeradas na sessão.
+    """
+    nome: bytes = host.encode("utf-8")
+    partes: list[bytes] = [
+        CABECALHO.pack(MAGICO, VERSAO, len(nome), len(janelas), sessao),
+        nome,
+    ]
+
+    for seq, data_hora, linhas in janelas:
+        texto: bytes = data_hora.encode("utf-8")
+        partes.append(JANELA.pack(seq, len(texto), len(linhas)))
+        partes.append(texto)
+
+        for ip, protocolo, enviado, recebido, tipo, pac_env, pac_rec, taxa in linhas:
+            partes.append(
+                LINHA.pack(
+                    6 if ip & BIT_IPV6 else 4,
+                    (ip & ~BIT_IPV6).to_bytes(16, "big"),
+                    PROTOCOLOS_CONEXAO.index(protocolo),
+                    TIPOS.index(tipo),
+                    enviado,
+                    recebido,
+                    pac_env,
+                    pac_rec,
+                    taxa,
+                )
+            )
+
+    conteudo: bytes = zlib.compress(b"".join(partes))
+    return TAMANHO.pack(len(conteudo)) + conteudo
+
+
+def decodifica(conteudo: bytes) -> tuple[str, int, list[Janela]]:
+    """
+    Lê o conteúdo (sem o tamanho) de um quadro.
+
+    Returns:
+        tuple: Nome do host, sessão do agente e lista de janelas.
+
+    Raises:
+        ValueError: Se o conteúdo estiver corrompido ou em outro formato.
+    """
+    try:
+        dados: bytes = zlib.decompress(conteudo)
+        magico, versao, tam_host, num_janelas, sessao = CABECALHO.unpack_from(dados)
+        if magico != MAGICO or versao != VERSAO:
+            raise ValueError("formato de lote desconhecido")
+
+        posicao: int = CABECALHO.size
+        host: str = dados[posicao : posicao + tam_host].decode("utf-8")
+        posicao += tam_host
+
+        janelas: list[Janela] = []
+        for _ in range(num_janelas):
+            seq, tam_hora, num_linhas = JANELA.unpack_from(dados, posicao)
+            posicao += JANELA.size
+            data_hora: str = dados[posicao : posicao + tam_hora].decode("utf-8")
+            posicao += tam_hora
+
+            linhas: list[Linha] = []
+            for _ in range(num_linhas):
+                familia, bruto, protocolo, tipo, *contadores, taxa = LINHA.unpack_from(
+                    dados, posicao
+                )
+                posicao += LINHA.size
+                ip: int = int.from_bytes(bruto, "big")
+                if familia == 6:
+                    ip |= BIT_IPV6
+                enviado, recebido, pac_env, pac_rec = contadores
+                linhas.append(
+                    (
+                        ip,
+                        PROTOCOLOS_CONEXAO[protocolo],
+                        enviado,
+                        recebido,
+                        TIPOS[tipo],
+                        pac_env,
+                        pac_rec,
+                        taxa,
+                    )
+                )
+            janelas.append((seq, data_hora, linhas))
+    except (zlib.error, struct.error, IndexError, UnicodeDecodeError) as erro:
+        raise ValueError(f"lote inválido: {erro}") from erro
+
+    return host, sessao, janelas
+
+
+class Agente:
+    """
+    Destino do `NetLogger` que envia as janelas a um `Coletor`.
+
+    A thread da captura só enfileira cada janela; o envio é feito por uma
+    thread própria, que esvazia a fila de pendentes, então um coletor
+    lento ou inacessível (cada tentativa limitada por `timeout`) não
+    atrasa a captura.
+
+    Attributes:
+        endereco (tuple[str, int]): Endereço do coletor.
+        host (str): Nome com que este agente se identifica.
+        sessao (int): Identifica esta instância do agente; junto com o
+            número de sequência de cada janela, permite ao coletor
+            descartar reenvios sem depender do relógio.
+        janelas_por_lote (int): Janelas acumuladas antes de cada envio.
+        pendentes (deque[Janela]): Janelas ainda não confirmadas; com mais
+            de `max_pendentes`, as mais antigas são descartadas.
+        enviadas (int): Janelas confirmadas pelo coletor.
+        falhas (int): Tentativas de envio que falharam.
+    """
+
+    def __init__(
+        self,
+        endereco: str,
+        host: str | None = None,
+        janelas_por_lote: int = 1,
+        max_pendentes: int = 720,
+        timeout: float = 2.0,
+    ):
+        """
+        Args:
+            endereco (str): ``host:porta`` do coletor.
+            host (str | None): Nome deste agente (padrão: nome da máquina).
+            janelas_por_lote (int): Janelas por lote enviado.
+            max_pendentes (int): Máximo de janelas guardadas enquanto o
+                coletor estiver inacessível (padrão: 1 hora de janelas de 5s).
+            timeout (float): Tempo máximo (s) de conexão e de envio.
+        """
+        nome, porta = endereco.rsplit(":", 1)
+        self.endereco: tuple[str, int] = (nome.strip("[]"), int(porta))
+        self.host: str = host or socket.gethostname()
+        self.sessao: int = int.from_bytes(os.urandom(8), "big")
+        self.janelas_por_lote = janelas_por_lote
+        self.timeout = timeout
+        self.pendentes: deque[Janela] = deque(maxlen=max_pendentes)
+        self.enviadas: int = 0
+        self.falhas: int = 0
+        self._seq: int = 0
+        self._sock: socket.socket | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._sinal: threading.Event = threading.Event()
+        self._encerrando: bool = False
+        self._thread: threading.Thread = threading.Thread(
+            target=self._envia_sempre, name="agente", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, data_hora: str, linhas: list[Linha]) -> None:
+        """
+        Enfileira uma janela do `NetLogger` e, com o lote completo, acorda
+        a thread de envio.
+        """
+        with self._lock:
+            self._seq += 1
+            self.pendentes.append((self._seq, data_hora, linhas))
+            completo: bool = len(self.pendentes) >= self.janelas_por_lote
+
+        if completo:
+            self._sinal.set()
+
+    def _envia_sempre(self) -> None:
+        """Laço da thread de envio: envia os pendentes a cada sinal."""
+
+        while True:
+            self._sinal.wait()
+            self._sinal.clear()
+            if self._encerrando:
+                return
+            self.envia()
+
+    def envia(self) -> bool:
+        """
+        Envia todas as janelas pendentes em um lote. Chamado pela thread de
+        envio (e por `close`, depois de encerrá-la).
+
+        Returns:
+            bool: Se o coletor confirmou o lote (ou não havia pendentes).
+        """
+        with self._lock:
+            lote: list[Janela] = list(self.pendentes)
+        if not lote:
+            return True
+
+        quadro: bytes = codifica(self.host, self.sessao, lote)
+        try:
+            if self._sock is None:
+                self._sock = socket.create_connection(
+                    self.endereco, timeout=self.timeout
+                )
+            self._sock.sendall(quadro)
+            if self._sock.recv(1) != ACK:
+                raise ConnectionError("coletor encerrou a conexão")
+        except OSError as erro:
+            self.falhas += 1
+            logging.warning(
+                f"Coletor {self.endereco[0]}:{self.endereco[1]} indisponível "
+                f"({erro}); {len(lote)} janela(s) pendente(s)"
+            )
+            self._fecha_socket()
+            return False
+
+        with self._lock:
+            # Janelas enfileiradas durante o envio continuam pendentes; as
+            # do lote descartadas pelo limite já não estão na fila
+            for janela in lote:
+                if self.pendentes and self.pendentes[0] is janela:
+                    self.pendentes.popleft()
+        self.enviadas += len(lote)
+        return True
+
+    def _fecha_socket(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def close(self) -> None:
+        """
+        Encerra a thread de envio, tenta enviar as janelas pendentes e
+        fecha a conexão.
+        """
+        self._encerrando = True
+        self._sinal.set()
+        self._thread.join()
+
+        self.envia()
+        self._fecha_socket()
+
+
+class Coletor:
+    """
+    Servidor que recebe os lotes dos agentes e grava um CSV unificado.
+
+    Attributes:
+        csv_path (str): CSV de saída (colunas do `NetLogger` mais ``host``,
+            ``sessao`` e ``seq`` do agente).
+        endereco (str): Endereço de escuta.
+        porta (int): Porta de escuta (com ``0``, a porta escolhida é
+            gravada aqui ao iniciar).
+        ultimas (dict[tuple[str, int], int]): Número de sequência da última
+            janela gravada de cada (host, sessão).
+        janelas (int): Janelas gravadas desde o início.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        porta: int = PORTA_PADRAO,
+        endereco: str = "0.0.0.0",
+    ):
+        """
+        Abre o CSV de saída; um CSV existente com o mesmo cabeçalho é
+        continuado, e as últimas janelas de cada agente são lidas dele.
+        """
+        self.csv_path = csv_path
+        self.porta = porta
+        self.endereco = endereco
+        self.colunas: list[str] = ["host", "sessao", "seq", *COLUNAS_CSV]
+        self.ultimas: dict[tuple[str, int], int] = {}
+        self.janelas: int = 0
+
+        continua: bool = False
+        if os.path.exists(csv_path):
+            with open(csv_path, newline="") as f:
+                continua = next(csv.reader(f), None) == self.colunas
+        if continua:
+            self.ultimas = self._ultimas_do_csv()
+
+        self._arquivo: TextIO = open(csv_path, "a" if continua else "w", newline="")
+        self._writer = csv.writer(self._arquivo)
+        if not continua:
+            self._writer.writerow(self.colunas)
+            self._arquivo.flush()
+
+    def _ultimas_do_csv(self) -> dict[tuple[str, int], int]:
+        """
+        Lê, do fim do CSV continuado (até `LEITURA_CAUDA` bytes), a última
+        janela gravada de cada agente, para que reenvios de janelas
+        gravadas antes de reiniciar o coletor também sejam descartados. Uma
+        linha final incompleta (queda durante a escrita) é removida do
+        arquivo.
+
+        Returns:
+            dict[tuple[str, int], int]: Número de sequência da última
+            janela de cada (host, sessão).
+        """
+        with open(self.csv_path, "rb+") as f:
+            tamanho: int = f.seek(0, os.SEEK_END)
+            inicio: int = f.seek(max(0, tamanho - LEITURA_CAUDA))
+            cauda: bytes = f.read()
+
+            if not cauda.endswith(b"\n"):
+                completa: int = cauda.rfind(b"\n") + 1
+                f.truncate(inicio + completa)
+                cauda = cauda[:completa]
+                logging.warning("Linha incompleta no fim do CSV descartada")
+
+        ultimas: dict[tuple[str, int], int] = {}
+        # A primeira linha é o cabeçalho ou pode estar cortada pela leitura
+        linhas: list[str] = cauda.decode("utf-8", "replace").splitlines()[1:]
+        for campos in csv.reader(linhas):
+            try:
+                agente: tuple[str, int] = (campos[0], int(campos[1]))
+                seq: int = int(campos[2])
+            except (IndexError, ValueError):
+                continue
+            if seq > ultimas.get(agente, 0):
+                ultimas[agente] = seq
+        return ultimas
+
+    def registra(self, host: str, sessao: int, janelas: list[Janela]) -> int:
+        """
+        Grava as janelas de um agente, ignorando as já recebidas.
+
+        Returns:
+            int: Quantidade de janelas gravadas.
+        """
+        gravadas: int = 0
+        agente: tuple[str, int] = (host, sessao)
+
+        for seq, data_hora, linhas in janelas:
+            # As janelas de um agente chegam em ordem; uma repetida é reenvio
+            if seq <= self.ultimas.get(agente, 0):
+                continue
+
+            for ip, protocolo, *valores in linhas:
+                self._writer.writerow(
+                    [
+                        host,
+                        sessao,
+                        seq,
+                        data_hora,
+                        TABELA.texto(ip),
+                        protocolo,
+                        *valores,
+                    ]
+                )
+            self.ultimas[agente] = seq
+            gravadas += 1
+
+        self._arquivo.flush()
+        self.janelas += gravadas
+        return gravadas
+
+    async def atende(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Recebe os quadros de um agente até a conexão ser encerrada."""
+
+        agente: str = writer.get_extra_info("peername")[0]
+        try:
+            while True:
+                (tamanho,) = TAMANHO.unpack(await reader.readexactly(TAMANHO.size))
+                if tamanho > MAX_QUADRO:
+                    raise ValueError(f"quadro de {tamanho} bytes")
+
+                host, sessao, janelas = decodifica(await reader.readexactly(tamanho))
+                gravadas: int = self.registra(host, sessao, janelas)
+                logging.info(f"{gravadas} janela(s) de {host} ({agente})")
+
+                writer.write(ACK)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as erro:
+            logging.warning(f"Lote inválido de {agente}: {erro}")
+        finally:
+            writer.close()
+
+    async def serve(self, pronto: asyncio.Event | None = None) -> None:
+        """
+        Atende os agentes no event loop atual, até ser cancelado.
+
+        Args:
+            pronto (asyncio.Event | None): Sinalizado quando o coletor
+                estiver aceitando conexões.
+        """
+        servidor: asyncio.Server = await asyncio.start_server(
+            self.atende, self.endereco, self.porta
+        )
+        self.porta = servidor.sockets[0].getsockname()[1]
+
+        logging.info(f"Coletor escutando na porta {self.porta}")
+        if pronto is not None:
+            pronto.set()
+
+        async with servidor:
+            await servidor.serve_forever()
+
+    def start(self) -> None:
+        """Executa o coletor indefinidamente."""
+
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Fecha o CSV de saída."""
+
+        self._arquivo.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coletor central do NetLogger")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument(
+        "--csv",
+        default=os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), "netlog_coletor.csv"
+        ),
+        help="CSV unificado (leia com NETLOG_CSV=<arquivo> na interface)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="([{levelname}] - {asctime}): {message}",
+        style="{",
+    )
+
+    try:
+        Coletor(args.csv, args.porta).start()
+    except KeyboardInterrupt:
+        logging.info("Coletor encerrado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Formato dos dados gravados pelo NetLogger: colunas dos CSVs e a linha de
+cada janela entregue aos destinos.
+
+Fica separado de `netlog` para que os módulos que só leem ou repassam
+esses dados (como o `coletor`) não precisem importar o scapy.
+"""
+
+COLUNAS_CSV: list[str] = [
+    "data_hora",
+    "ip",
+    "protocolo",
+    "bytes_enviados",
+    "bytes_recebidos",
+    "tipo",
+    "pacotes_enviados",
+    "pacotes_recebidos",
+    "taxa_amostragem",
+]
+
+COLUNAS_CSV_TCP: list[str] = [
+    "data_hora",
+    "ip_cliente",
+    "porta_cliente",
+    "ip_servidor",
+    "porta_servidor",
+    "protocolo",
+    "rtt_handshake_ms",
+    "rtt_min_ms",
+    "rtt_mediano_ms",
+    "rtt_max_ms",
+    "amostras_rtt",
+    "retransmissoes",
+    "fora_de_ordem",
+    "janelas_zero",
+]
+
+# Linha de uma janela entregue aos destinos: IP (inteiro), protocolo, bytes
+# enviados, bytes recebidos, tipo, pacotes enviados, pacotes recebidos e
+# taxa de amostragem (mesma ordem do CSV)
+Linha = tuple[int, str, int, int, str, int, int, int]
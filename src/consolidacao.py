@@ -0,0 +1,192 @@
+"""
+Séries temporais consolidadas incrementalmente, durante a captura.
+
+Funcionalidades:
+- Destino do `NetLogger` que soma os bytes de cada janela, por IP e
+  protocolo, em baldes de 5 s, 1 min e 1 h (`RESOLUCOES`).
+- Cada balde encerrado é acrescentado ao CSV da sua resolução
+  (``<csv>_5s.csv``, ``<csv>_1min.csv`` e ``<csv>_1h.csv``), sempre em
+  ordem de horário; os baldes ainda abertos são regravados atomicamente
+  a cada janela em ``<csv>_abertas.json``.
+- O custo por janela depende apenas das linhas da janela, não do
+  histórico, e a interface lê só o trecho exibido (ver `series.le_series`).
+- Como o CSV, os arquivos são continuados (retomando os baldes abertos)
+  no modo durável ou quando o supervisor reinicia a captura; caso
+  contrário, são recriados.
+
+Não depende do pandas, para não atrasar o início da captura.
+
+Uso típico:
+    logger.adiciona_destino(Consolidacao("netlog.csv"))
+"""
+
+import calendar
+import contextlib
+import csv
+import json
+import os
+import time
+
+from ip import TABELA
+
+# Resoluções disponíveis, da mais fina para a mais grossa (em segundos)
+RESOLUCOES: dict[str, int] = {
+    "5s": 5,
+    "1min": 60,
+    "1h": 3600,
+}
+
+# Mesmo formato da coluna ``data_hora`` do CSV do NetLogger
+FORMATO: str = "%Y-%m-%d %H:%M:%S"
+
+COLUNAS_SERIE: list[str] = [
+    "data_hora",
+    "ip",
+    "protocolo",
+    "bytes_enviados",
+    "bytes_recebidos",
+]
+
+
+def caminho_serie(csv_path: str, resolucao: str) -> str:
+    """Retorna o CSV consolidado de `csv_path` na `resolucao`."""
+
+    return f"{os.path.splitext(csv_path)[0]}_{resolucao}.csv"
+
+
+def caminho_abertas(csv_path: str) -> str:
+    """Retorna o JSON com os baldes ainda abertos de `csv_path`."""
+
+    return os.path.splitext(csv_path)[0] + "_abertas.json"
+
+
+def inicio_balde(data_hora: str, segundos: int) -> str:
+    """
+    Retorna o início do balde de `segundos` que contém `data_hora`
+    (alinhado como `pandas.Timestamp.floor`, sem fuso horário).
+    """
+
+    instante: int = calendar.timegm(time.strptime(data_hora, FORMATO))
+    return time.strftime(FORMATO, time.gmtime(instante - instante % segundos))
+
+
+class Consolidacao:
+    """
+    Destino do `NetLogger` que mantém as séries consolidadas em disco.
+
+    Attributes:
+        csv_path (str): CSV principal (base dos nomes dos arquivos).
+        continua (bool): Se os arquivos existentes são continuados.
+        abertos (dict[str, list]): Por resolução, ``[início do balde,
+            {(ip, protocolo): [enviado, recebido]}]``, com os IPs em texto.
+    """
+
+    def __init__(self, csv_path: str, continua: bool = False):
+        """
+        Args:
+            csv_path (str): CSV principal do NetLogger.
+            continua (bool): Continua os arquivos existentes (com o mesmo
+                cabeçalho) e retoma os baldes abertos da execução anterior.
+        """
+        self.csv_path = csv_path
+        self.continua = continua
+        self.abertos: dict[str, list] = {}
+
+        for resolucao in RESOLUCOES:
+            self._setup_csv(caminho_serie(csv_path, resolucao))
+
+        if continua:
+            self._retoma()
+        else:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(caminho_abertas(csv_path))
+
+    def _setup_csv(self, caminho: str) -> None:
+        """Cria o CSV com cabeçalho (com `continua`, mantém um compatível)."""
+
+        if self.continua:
+            try:
+                with open(caminho, newline="") as f:
+                    if next(csv.reader(f), None) == COLUNAS_SERIE:
+                        return
+            except FileNotFoundError:
+                pass
+
+        with open(caminho, "w", newline="") as f:
+            csv.writer(f).writerow(COLUNAS_SERIE)
+
+    def _retoma(self) -> None:
+        """Recupera os baldes abertos gravados pela execução anterior."""
+
+        try:
+            with open(caminho_abertas(self.csv_path)) as f:
+                abertas: dict = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for resolucao, balde in abertas.items():
+            if resolucao in RESOLUCOES:
+                self.abertos[resolucao] = [
+                    balde["data_hora"],
+                    {
+                        (ip, protocolo): [env, rec]
+                        for ip, protocolo, env, rec in balde["linhas"]
+                    },
+                ]
+
+    def __call__(self, data_hora: str, linhas: list) -> None:
+        """
+        Destino do `NetLogger`: soma a janela aos baldes abertos, gravando
+        os que se encerraram.
+        """
+        janela: dict[tuple[str, str], list[int]] = {}
+        for ip_end, protocolo, enviado, recebido, *_ in linhas:
+            total: list[int] = janela.setdefault(
+                (TABELA.texto(ip_end), protocolo), [0, 0]
+            )
+            total[0] += enviado
+            total[1] += recebido
+
+        for resolucao, segundos in RESOLUCOES.items():
+            inicio: str = inicio_balde(data_hora, segundos)
+            aberto: list | None = self.abertos.get(resolucao)
+            if aberto is not None and aberto[0] != inicio:
+                self._grava_balde(resolucao, *aberto)
+                aberto = None
+            if aberto is None:
+                aberto = self.abertos[resolucao] = [inicio, {}]
+
+            for chave, (enviado, recebido) in janela.items():
+                total = aberto[1].setdefault(chave, [0, 0])
+                total[0] += enviado
+                total[1] += recebido
+
+        self._grava_abertos()
+
+    def _grava_balde(self, resolucao: str, inicio: str, somas: dict) -> None:
+        """Acrescenta um balde encerrado ao CSV da resolução."""
+
+        if not somas:
+            return
+
+        with open(caminho_serie(self.csv_path, resolucao), "a", newline="") as f:
+            writer = csv.writer(f)
+            for (ip_end, protocolo), (enviado, recebido) in somas.items():
+                writer.writerow([inicio, ip_end, protocolo, enviado, recebido])
+
+    def _grava_abertos(self) -> None:
+        """
+        Grava os baldes abertos de forma atômica (temporário + rename),
+        para que a interface nunca leia um arquivo pela metade.
+        """
+        abertas: dict = {
+            resolucao: {
+                "data_hora": inicio,
+                "linhas": [[*chave, *total] for chave, total in somas.items()],
+            }
+            for resolucao, (inicio, somas) in self.abertos.items()
+        }
+        caminho: str = caminho_abertas(self.csv_path)
+        with open(caminho + ".tmp", "w") as f:
+            json.dump(abertas, f)
+        os.replace(caminho + ".tmp", caminho)
@@ -5,9 +5,23 @@ Funcionalidades:
 - Atualização automática a cada 5 segundos.
 - Seleção de IP para filtrar dados.
 - Exibição de tabelas e gráficos (Altair) de bytes enviados/recebidos.
-- Baseado no CSV gerado pelo NetLogger.
+- Gráfico de bytes ao longo do tempo, com resolução escolhida
+  automaticamente conforme o intervalo selecionado (ver `series`), lido
+  das séries consolidadas pela captura (``netlog_5s.csv``, etc.) apenas
+  no intervalo exibido.
+- Baseado no CSV gerado pelo NetLogger, ou no CSV unificado do coletor
+  central (variável de ambiente ``NETLOG_CSV``), com filtro por host.
+- Com o CSV do NetLogger, os totais por IP e protocolo vêm da série
+  consolidada de 1 h e o aviso de amostragem, do fim do CSV: o custo de
+  cada atualização não cresce com o histórico. O CSV do coletor, sem
+  séries consolidadas, é lido inteiro.
+- Percentis de latência TCP por IP, quando a captura grava as métricas
+  TCP (``netlog_tcp.csv``, ao lado do CSV principal).
+- Maiores taxas recentes e alertas ativos, lidos do resumo JSON gravado
+  pela captura a cada janela (``netlog_taxas.json``), sem reler o CSV.
 """
 
+import json
 import os
 
 import altair as alt
@@ -16,6 +30,21 @@ import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 
 from ip import get_local_ip
+from series import (
+    agrega_series,
+    intervalo_series,
+    latencias_por_ip,
+    le_cauda,
+    le_series,
+    serie_para_grafico,
+    totais_consolidados,
+)
+
+# CSV do NetLogger (ou do coletor); os demais arquivos lidos ficam ao lado
+CAMINHO_CSV: str = os.environ.get("NETLOG_CSV") or os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "netlog.csv")
+)
+BASE_CSV: str = os.path.splitext(CAMINHO_CSV)[0]
 
 st.set_page_config(page_title="Relatório de Pacotes", layout="wide")
 
@@ -39,21 +68,99 @@ except Exception as e:
 @st.cache_data(ttl=5)
 def carregar_dados() -> pd.DataFrame:
     """Carrega o CSV de pacotes e retorna como DataFrame."""
-    caminho_csv: str = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "..", "netlog.csv")
-    )
     try:
-        df: pd.DataFrame = pd.read_csv(caminho_csv)
+        df: pd.DataFrame = pd.read_csv(CAMINHO_CSV)
     except Exception:
         return pd.DataFrame()
     return df
 
 
+@st.cache_data(ttl=5)
+def carregar_recentes() -> pd.DataFrame:
+    """Carrega só as últimas janelas do CSV de pacotes (ver `le_cauda`)."""
+    return le_cauda(CAMINHO_CSV)
+
+
+@st.cache_data(ttl=5)
+def carregar_totais() -> pd.DataFrame:
+    """Totais por IP e protocolo das séries consolidadas pela captura."""
+    return totais_consolidados(CAMINHO_CSV)
+
+
+def carregar_taxas() -> dict:
+    """Lê o resumo das taxas recentes (vazio se a captura não o grava)."""
+    try:
+        with open(BASE_CSV + "_taxas.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@st.cache_data(ttl=5)
+def carregar_latencias() -> pd.DataFrame:
+    """Carrega o CSV de métricas TCP e resume as latências por IP."""
+    try:
+        df: pd.DataFrame = pd.read_csv(BASE_CSV + "_tcp.csv")
+    except Exception:
+        return pd.DataFrame()
+    if df.empty:
+        return df
+    return latencias_por_ip(df)
+
+
+@st.cache_data(ttl=5)
+def carregar_series(host: str = "(Todos)") -> dict[str, pd.DataFrame]:
+    """
+    Agrega o CSV (apenas as linhas de `host`, no CSV do coletor) em séries
+    temporais de múltiplas resoluções. Usado quando a captura não grava
+    as séries consolidadas.
+    """
+    df: pd.DataFrame = carregar_dados()
+    if host != "(Todos)":
+        df = df[df["host"].astype(str) == host]
+    if df.empty:
+        return {}
+    return agrega_series(df)
+
+
+@st.cache_data(ttl=5)
+def carregar_series_consolidadas(
+    inicio: pd.Timestamp, fim: pd.Timestamp
+) -> dict[str, pd.DataFrame]:
+    """Lê das séries consolidadas pela captura só o intervalo exibido."""
+    return le_series(CAMINHO_CSV, inicio, fim)
+
+
+def intervalo_consolidado(host: str = "(Todos)") -> tuple | None:
+    """
+    Primeiro e último horário das séries consolidadas, ou ``None`` se a
+    captura não as grava (ou se um host do coletor foi escolhido).
+    """
+    if host != "(Todos)":
+        return None
+    return intervalo_series(CAMINHO_CSV)
+
+
 # Estado para guardar IP selecionado
 if "ip_escolhido" not in st.session_state:
     st.session_state.ip_escolhido = "(Todos)"
 
-df: pd.DataFrame = carregar_dados()
+# CSV unificado do coletor: uma linha por host e janela, sem séries
+# consolidadas, então é lido inteiro; o do NetLogger é resumido pelas séries
+recentes: pd.DataFrame = carregar_recentes()
+do_coletor: bool = "host" in recentes.columns
+df: pd.DataFrame = carregar_dados() if do_coletor else carregar_totais()
+
+host_escolhido: str = "(Todos)"
+if do_coletor:
+    host_escolhido = st.selectbox(
+        "🖥️ Host:",
+        ["(Todos)"] + sorted(df["host"].astype(str).unique().tolist()),
+        key="select_host",
+    )
+    if host_escolhido != "(Todos)":
+        df = df[df["host"].astype(str) == host_escolhido].copy()
+    recentes = df
 
 if df.empty:
     st.warning("Arquivo CSV está vazio. Nenhum dado para exibir.")
@@ -65,6 +172,19 @@ else:
         df["bytes_recebidos"], errors="coerce"
     ).fillna(0)
 
+    # Linhas gravadas sob sobrecarga trazem estimativas por amostragem
+    if (
+        "taxa_amostragem" in recentes.columns
+        and (recentes["taxa_amostragem"] > 1).any()
+    ):
+        amostradas: pd.DataFrame = recentes[recentes["taxa_amostragem"] > 1]
+        st.info(
+            f"{amostradas['data_hora'].nunique()} janela(s) "
+            f"{'' if do_coletor else 'recente(s) '}com captura "
+            f"amostrada (até 1 em {amostradas['taxa_amostragem'].max()} "
+            "pacotes): os bytes dessas janelas são estimativas."
+        )
+
     resumo_ip: pd.DataFrame = (
         df.groupby("ip")
         .agg({"bytes_enviados": "sum", "bytes_recebidos": "sum"})
@@ -72,7 +192,10 @@ else:
     )
     resumo_ip.columns = ["IP", "Total Bytes Enviados", "Total Bytes Recebidos"]
 
-    # Seletor de IP
+    # Seletor de IP (o IP escolhido pode não existir no host selecionado)
+    if st.session_state.ip_escolhido not in resumo_ip["IP"].values:
+        st.session_state.ip_escolhido = "(Todos)"
+
     ip_escolhido: str = st.selectbox(
         "🔍 Escolha um IP (ou deixe vazio para ver todos):",
         ["(Todos)"] + resumo_ip["IP"].unique().tolist(),
@@ -173,3 +296,102 @@ else:
             )
         )
         st.altair_chart(grafico)
+
+    # Taxas recentes (EWMA) e alertas ativos
+    taxas: dict = carregar_taxas()
+    for alerta in taxas.get("alertas", []):
+        st.error(
+            f"Alerta: {alerta['metrica']} de {alerta['chave']} "
+            f"({alerta['valor']:.1f}/s) acima de {alerta['limite']:g}/s"
+        )
+    if taxas.get("ips"):
+        st.markdown(
+            f"##### 🔥 Maiores taxas recentes ({taxas['data_hora']}, "
+            f"meia-vida de {taxas['meia_vida']:g} s)"
+        )
+        coluna_ip, coluna_protocolo = st.columns(2)
+        coluna_ip.dataframe(pd.DataFrame(taxas["ips"]))
+        coluna_protocolo.dataframe(pd.DataFrame(taxas["protocolos"]))
+
+    # Latência TCP por IP (se a captura gravou as métricas TCP)
+    latencias: pd.DataFrame = carregar_latencias()
+    if not latencias.empty:
+        st.markdown("##### ⏱️ Latência TCP por IP (ms)")
+        if ip_escolhido != "(Todos)":
+            latencias = latencias[latencias["ip"] == ip_escolhido]
+        st.dataframe(latencias)
+
+    # Gráfico ao longo do tempo: das séries consolidadas pela captura
+    # (lendo só o intervalo exibido) ou, na falta delas, agregando o CSV
+    series: dict[str, pd.DataFrame] = {}
+    intervalo: tuple | None = intervalo_consolidado(host_escolhido)
+    if intervalo is None:
+        series = carregar_series(host_escolhido)
+        if series:
+            intervalo = (
+                series["5s"]["data_hora"].min(),
+                series["5s"]["data_hora"].max(),
+            )
+
+    if intervalo is not None:
+        st.markdown("##### 📈 Bytes ao longo do tempo")
+
+        inicio_dados = intervalo[0].to_pydatetime()
+        fim_dados = intervalo[1].to_pydatetime()
+
+        protocolos: list[str] = ["(Todos)"] + sorted(
+            df["protocolo"].dropna().unique().tolist()
+        )
+        protocolo_escolhido: str = st.selectbox(
+            "Protocolo:", protocolos, key="select_protocolo"
+        )
+
+        if inicio_dados < fim_dados:
+            inicio, fim = st.slider(
+                "Intervalo:",
+                min_value=inicio_dados,
+                max_value=fim_dados,
+                value=(inicio_dados, fim_dados),
+                format="DD/MM HH:mm:ss",
+                key="intervalo",
+            )
+        else:
+            inicio, fim = inicio_dados, fim_dados
+
+        if not series:
+            series = carregar_series_consolidadas(
+                pd.Timestamp(inicio), pd.Timestamp(fim)
+            )
+
+        resolucao, dados_tempo = serie_para_grafico(
+            series,
+            pd.Timestamp(inicio),
+            pd.Timestamp(fim),
+            ip=None if ip_escolhido == "(Todos)" else ip_escolhido,
+            protocolo=(
+                None if protocolo_escolhido == "(Todos)" else protocolo_escolhido
+            ),
+        )
+
+        grafico_tempo: alt.Chart = (
+            alt.Chart(dados_tempo)
+            .mark_line()
+            .encode(
+                x=alt.X("data_hora:T", title="Horário"),
+                y="Bytes:Q",
+                color=alt.Color(
+                    "Tipo:N",
+                    title="Tipo",
+                    scale=alt.Scale(
+                        domain=["Bytes Recebidos", "Bytes Enviados"],
+                        range=["skyblue", "dodgerblue"],
+                    ),
+                ),
+                tooltip=["data_hora:T", "Tipo", "Bytes"],
+            )
+            .properties(
+                height=300,
+                title=f"Bytes por janela de {resolucao}",
+            )
+        )
+        st.altair_chart(grafico_tempo)
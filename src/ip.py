@@ -8,10 +8,133 @@ Observação:
 Esse método pode retornar `127.0.0.1` em algumas configurações
 onde o hostname está associado ao loopback. É adequado para cenários
 simples, mas pode não refletir o IP real usado para acessar a internet.
+
+Também define a representação interna de endereços usada na agregação:
+IPv4 como inteiro de 32 bits e IPv6 como inteiro de 128 bits, marcado com
+`BIT_IPV6` para não colidir com IPv4. A `TABELA` compartilhada interna
+cada endereço, convertendo de/para texto apenas uma vez (até um limite
+de endereços guardados).
 """
 
 import socket
 import sys
+from typing import Callable
+
+BIT_IPV6: int = 1 << 128
+
+
+def ip_para_int(texto: str) -> int:
+    """
+    Converte um endereço IPv4/IPv6 em texto para a representação inteira.
+
+    Raises:
+        ValueError: Se o texto não for um endereço IP válido.
+    """
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, texto), "big")
+    except OSError:
+        pass
+
+    try:
+        bruto: bytes = socket.inet_pton(socket.AF_INET6, texto)
+    except OSError as erro:
+        raise ValueError(f"Endereço IP inválido: {texto!r}") from erro
+    return int.from_bytes(bruto, "big") | BIT_IPV6
+
+
+def bytes_para_int(bruto: bytes) -> int:
+    """
+    Converte um endereço em bytes (4 para IPv4, 16 para IPv6), como vem
+    do cabeçalho IP, para a representação inteira.
+    """
+    valor: int = int.from_bytes(bruto, "big")
+    return valor | BIT_IPV6 if len(bruto) == 16 else valor
+
+
+def int_para_ip(valor: int) -> str:
+    """Converte a representação inteira de volta para texto."""
+
+    if valor & BIT_IPV6:
+        bruto: bytes = (valor ^ BIT_IPV6).to_bytes(16, "big")
+        return socket.inet_ntop(socket.AF_INET6, bruto)
+    return socket.inet_ntop(socket.AF_INET, valor.to_bytes(4, "big"))
+
+
+def _abre_espaco(
+    para_int: dict[str, int], para_texto: dict[int, str], limite: int
+) -> None:
+    """Esvazia as duas direções da tabela se alguma tiver atingido o limite."""
+
+    if len(para_int) >= limite or len(para_texto) >= limite:
+        para_int.clear()
+        para_texto.clear()
+
+
+class _Internados(dict):
+    """
+    Dicionário texto -> inteiro que converte (e guarda) no primeiro acesso,
+    registrando também a direção inteiro -> texto.
+    """
+
+    def __init__(self, para_texto: dict[int, str], limite: int):
+        super().__init__()
+        self.para_texto = para_texto
+        self.limite = limite
+
+    def __missing__(self, texto: str) -> int:
+        valor: int = ip_para_int(texto)
+        _abre_espaco(self, self.para_texto, self.limite)
+        self[texto] = valor
+        self.para_texto.setdefault(valor, texto)
+        return valor
+
+
+class TabelaIPs:
+    """
+    Tabela de internação de endereços IP.
+
+    Cada endereço em texto é convertido para inteiro uma única vez; as
+    chamadas seguintes custam uma consulta a dicionário feita em C
+    (`interna` é o ``__getitem__`` do dicionário, sem chamada Python no
+    acerto). A conversão de volta para texto (usada apenas na escrita do
+    CSV) também é mantida.
+
+    A tabela é limitada a `limite` endereços: a captura vê todos os IPs da
+    rede, não só os permitidos, e uma varredura ou tráfego com origens
+    forjadas não deve crescê-la sem fim. Ao atingir o limite, ela é
+    esvaziada; como os inteiros não dependem da tabela, só se perde o
+    cache (os permitidos voltam a ser internados no próximo pacote).
+
+    Attributes:
+        interna (Callable[[str], int]): Retorna o inteiro correspondente
+            ao texto, internando-o.
+        limite (int): Quantidade máxima de endereços guardados.
+    """
+
+    def __init__(self, limite: int = 1 << 16):
+        self._para_texto: dict[int, str] = {}
+        self._para_int: _Internados = _Internados(self._para_texto, limite)
+        self.interna: Callable[[str], int] = self._para_int.__getitem__
+
+    def __len__(self) -> int:
+        return len(self._para_texto)
+
+    @property
+    def limite(self) -> int:
+        return self._para_int.limite
+
+    def texto(self, valor: int) -> str:
+        """Retorna o texto correspondente ao inteiro `valor`."""
+
+        texto: str | None = self._para_texto.get(valor)
+        if texto is None:
+            texto = int_para_ip(valor)
+            _abre_espaco(self._para_int, self._para_texto, self.limite)
+            self._para_texto[valor] = texto
+        return texto
+
+
+TABELA: TabelaIPs = TabelaIPs()
 
 
 def get_local_ip() -> str:
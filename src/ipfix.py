@@ -0,0 +1,409 @@
+"""
+Exportação das janelas agregadas do NetLogger em IPFIX (RFC 7011) via UDP.
+
+Funcionalidades principais:
+- `ExportadorIPFIX`: destino do `NetLogger` que converte cada linha da
+  janela em um registro de fluxo bidirecional (RFC 5103): os bytes e
+  pacotes enviados pelo IP vão em ``octetDeltaCount``/``packetDeltaCount``
+  e os recebidos nos elementos reversos correspondentes.
+- Um modelo (template) para IPv4 e outro para IPv6, enviados no primeiro
+  datagrama e reenviados periodicamente, como exige o IPFIX sobre UDP
+  (o coletor pode reiniciar ou perder datagramas).
+- Registros agrupados em datagramas de até uma MTU, sem fragmentação IP.
+- `ColetorIPFIX`: coletor UDP mínimo, com cache de modelos, que decodifica
+  os datagramas (usado nos testes e para depuração).
+
+Campos de cada registro:
+- flowStartSeconds / flowEndSeconds: início e fim da janela.
+- sourceIPv4Address ou sourceIPv6Address: o IP da linha.
+- destinationTransportPort: porta do serviço (HTTP, FTP ou 0 para outros).
+- octetDeltaCount, packetDeltaCount: enviados pelo IP.
+- reverseOctetDeltaCount, reversePacketDeltaCount: recebidos pelo IP.
+- samplingPacketInterval: taxa de amostragem (1: contagem exata); as
+  contagens já vêm corrigidas pela taxa.
+
+Uso típico:
+    python src/ipfix.py --porta 4739                # coletor de depuração
+    sudo python src/main.py --ipfix 127.0.0.1:4739  # exportação
+"""
+
+import argparse
+import ipaddress
+import socket
+import struct
+import time
+from datetime import datetime
+
+from ip import BIT_IPV6
+
+VERSAO: int = 10
+PORTA_PADRAO: int = 4739
+ID_CONJUNTO_MODELOS: int = 2
+MODELO_IPV4: int = 256
+MODELO_IPV6: int = 257
+
+# Enterprise number dos elementos reversos (RFC 5103)
+PEN_REVERSO: int = 29305
+BIT_ENTERPRISE: int = 0x8000
+
+CABECALHO: struct.Struct = struct.Struct("!HHIII")
+CONJUNTO: struct.Struct = struct.Struct("!HH")
+
+# Cabeçalhos IP (IPv4, sem opções) e UDP, descontados da MTU
+CABECALHOS_IP_UDP: int = 28
+
+# Portas de serviço exportadas para cada protocolo do NetLogger
+PORTAS_SERVICO: dict[str, int] = {"HTTP": 8000, "FTP": 2121, "Outro": 0}
+
+# (enterprise, id) -> nome do elemento de informação
+ELEMENTOS: dict[tuple[int, int], str] = {
+    (0, 1): "octetDeltaCount",
+    (0, 2): "packetDeltaCount",
+    (0, 8): "sourceIPv4Address",
+    (0, 11): "destinationTransportPort",
+    (0, 27): "sourceIPv6Address",
+    (0, 150): "flowStartSeconds",
+    (0, 151): "flowEndSeconds",
+    (0, 305): "samplingPacketInterval",
+    (PEN_REVERSO, 1): "reverseOctetDeltaCount",
+    (PEN_REVERSO, 2): "reversePacketDeltaCount",
+}
+ENDERECOS: set[str] = {"sourceIPv4Address", "sourceIPv6Address"}
+
+# Campos (enterprise, id, tamanho) de cada modelo, na ordem do registro
+Campo = tuple[int, int, int]
+
+
+def _campos(id_endereco: int, tamanho_endereco: int) -> list[Campo]:
+    return [
+        (0, 150, 4),
+        (0, 151, 4),
+        (0, id_endereco, tamanho_endereco),
+        (0, 11, 2),
+        (0, 1, 8),
+        (0, 2, 4),  # reduced-size encoding (RFC 7011, 6.2)
+        (PEN_REVERSO, 1, 8),
+        (PEN_REVERSO, 2, 4),
+        (0, 305, 4),
+    ]
+
+
+MODELOS: dict[int, list[Campo]] = {
+    MODELO_IPV4: _campos(8, 4),
+    MODELO_IPV6: _campos(27, 16),
+}
+REGISTROS: dict[int, struct.Struct] = {
+    MODELO_IPV4: struct.Struct("!II4sHQIQII"),
+    MODELO_IPV6: struct.Struct("!II16sHQIQII"),
+}
+
+
+def conjunto_modelos() -> bytes:
+    """Monta o conjunto de modelos (IPv4 e IPv6)."""
+
+    corpo: list[bytes] = []
+    for id_modelo, campos in MODELOS.items():
+        corpo.append(struct.pack("!HH", id_modelo, len(campos)))
+        for enterprise, id_elemento, tamanho in campos:
+            if enterprise:
+                corpo.append(
+                    struct.pack(
+                        "!HHI", id_elemento | BIT_ENTERPRISE, tamanho, enterprise
+                    )
+                )
+            else:
+                corpo.append(struct.pack("!HH", id_elemento, tamanho))
+
+    dados: bytes = b"".join(corpo)
+    return CONJUNTO.pack(ID_CONJUNTO_MODELOS, CONJUNTO.size + len(dados)) + dados
+
+
+class ExportadorIPFIX:
+    """
+    Destino do `NetLogger` que exporta cada janela em datagramas IPFIX.
+
+    Attributes:
+        endereco (tuple[str, int]): Endereço do coletor IPFIX.
+        dominio (int): Observation Domain ID.
+        tamanho_maximo (int): Tamanho máximo (bytes) de cada mensagem.
+        reenvio_modelos (float): Intervalo (s) entre reenvios dos modelos.
+        duracao_janela (int): Duração (s) das janelas do `NetLogger`.
+        sequencia (int): Registros de dados já exportados (campo
+            ``sequenceNumber`` do cabeçalho).
+        datagramas (int): Datagramas enviados.
+    """
+
+    def __init__(
+        self,
+        endereco: str,
+        dominio: int = 0,
+        mtu: int = 1500,
+        reenvio_modelos: float = 60.0,
+        duracao_janela: int = 5,
+    ):
+        """
+        Args:
+            endereco (str): ``host:porta`` do coletor IPFIX.
+            dominio (int): Observation Domain ID dos datagramas.
+            mtu (int): MTU do caminho até o coletor.
+            reenvio_modelos (float): Reenvia os modelos quando se passarem
+                `reenvio_modelos` segundos desde o último envio.
+            duracao_janela (int): Duração das janelas (para
+                ``flowStartSeconds``).
+        """
+        nome, porta = endereco.rsplit(":", 1)
+        self.endereco: tuple[str, int] = (nome.strip("[]"), int(porta))
+        self.dominio = dominio
+        self.tamanho_maximo: int = mtu - CABECALHOS_IP_UDP
+        self.reenvio_modelos = reenvio_modelos
+        self.duracao_janela = duracao_janela
+        self.sequencia: int = 0
+        self.datagramas: int = 0
+        self._modelos: bytes = conjunto_modelos()
+        self._ultimo_envio_modelos: float | None = None
+        self._sock: socket.socket = socket.socket(
+            socket.AF_INET6 if ":" in self.endereco[0] else socket.AF_INET,
+            socket.SOCK_DGRAM,
+        )
+
+    def registros(self, data_hora: str, linhas: list) -> list[tuple[int, bytes]]:
+        """
+        Converte as linhas de uma janela em registros de dados.
+
+        Returns:
+            list[tuple[int, bytes]]: Pares (ID do modelo, registro).
+        """
+        fim: int = int(datetime.strptime(data_hora, "%Y-%m-%d %H:%M:%S").timestamp())
+        inicio: int = fim - self.duracao_janela
+        saida: list[tuple[int, bytes]] = []
+
+        for ip, protocolo, enviado, recebido, _, pac_env, pac_rec, taxa in linhas:
+            if ip & BIT_IPV6:
+                id_modelo: int = MODELO_IPV6
+                endereco: bytes = (ip & ~BIT_IPV6).to_bytes(16, "big")
+            else:
+                id_modelo = MODELO_IPV4
+                endereco = ip.to_bytes(4, "big")
+
+            saida.append(
+                (
+                    id_modelo,
+                    REGISTROS[id_modelo].pack(
+                        inicio,
+                        fim,
+                        endereco,
+                        PORTAS_SERVICO[protocolo],
+                        enviado,
+                        pac_env,
+                        recebido,
+                        pac_rec,
+                        taxa,
+                    ),
+                )
+            )
+
+        return saida
+
+    def mensagens(self, registros: list[tuple[int, bytes]]) -> list[bytes]:
+        """
+        Agrupa os registros em mensagens de até `tamanho_maximo` bytes,
+        incluindo os modelos na primeira quando for hora de reenviá-los.
+        """
+        agora: float = time.monotonic()
+        com_modelos: bool = (
+            self._ultimo_envio_modelos is None
+            or agora - self._ultimo_envio_modelos >= self.reenvio_modelos
+        )
+        if com_modelos:
+            self._ultimo_envio_modelos = agora
+
+        mensagens: list[bytes] = []
+        conjuntos: dict[int, list[bytes]] = {}
+        tamanho: int = 0
+
+        def fecha() -> None:
+            nonlocal com_modelos, conjuntos, tamanho
+            corpo: list[bytes] = [self._modelos] if com_modelos else []
+            quantidade: int = 0
+            for id_modelo, dados in conjuntos.items():
+                corpo.append(
+                    CONJUNTO.pack(id_modelo, CONJUNTO.size + sum(map(len, dados)))
+                )
+                corpo.extend(dados)
+                quantidade += len(dados)
+
+            conteudo: bytes = b"".join(corpo)
+            mensagens.append(
+                CABECALHO.pack(
+                    VERSAO,
+                    CABECALHO.size + len(conteudo),
+                    int(time.time()),
+                    self.sequencia,
+                    self.dominio,
+                )
+                + conteudo
+            )
+            self.sequencia = (self.sequencia + quantidade) % (1 << 32)
+            com_modelos, conjuntos = False, {}
+            tamanho = CABECALHO.size
+
+        tamanho = CABECALHO.size + (len(self._modelos) if com_modelos else 0)
+        for id_modelo, registro in registros:
+            acrescimo: int = len(registro)
+            if id_modelo not in conjuntos:
+                acrescimo += CONJUNTO.size
+            if conjuntos and tamanho + acrescimo > self.tamanho_maximo:
+                fecha()
+                acrescimo = len(registro) + CONJUNTO.size
+
+            conjuntos.setdefault(id_modelo, []).append(registro)
+            tamanho += acrescimo
+
+        if conjuntos or com_modelos:
+            fecha()
+        return mensagens
+
+    def __call__(self, data_hora: str, linhas: list) -> None:
+        """Exporta as linhas de uma janela do `NetLogger`."""
+
+        for mensagem in self.mensagens(self.registros(data_hora, linhas)):
+            self._sock.sendto(mensagem, self.endereco)
+            self.datagramas += 1
+
+    def close(self) -> None:
+        """Fecha o socket UDP."""
+
+        self._sock.close()
+
+
+class ColetorIPFIX:
+    """
+    Coletor IPFIX mínimo: recebe datagramas UDP e os decodifica, mantendo
+    os modelos recebidos em cache por (domínio, ID do modelo).
+
+    Attributes:
+        modelos (dict): Campos de cada modelo conhecido.
+        porta (int): Porta UDP de escuta.
+    """
+
+    def __init__(self, porta: int = PORTA_PADRAO, endereco: str = "127.0.0.1"):
+        self.modelos: dict[tuple[int, int], list[Campo]] = {}
+        self._sock: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((endereco, porta))
+        self.porta: int = self._sock.getsockname()[1]
+
+    def decodifica(self, datagrama: bytes) -> list[dict[str, int | str]]:
+        """
+        Decodifica uma mensagem IPFIX, atualizando o cache de modelos.
+        Conjuntos de dados de modelos desconhecidos são ignorados.
+
+        Returns:
+            list[dict]: Um dicionário (nome do elemento -> valor) por
+            registro de dados; endereços IP vêm em texto.
+
+        Raises:
+            ValueError: Se a mensagem não for IPFIX ou estiver truncada.
+        """
+        try:
+            versao, tamanho, _, _, dominio = CABECALHO.unpack_from(datagrama)
+        except struct.error as erro:
+            raise ValueError(f"mensagem truncada: {erro}") from erro
+        if versao != VERSAO or tamanho != len(datagrama):
+            raise ValueError("mensagem IPFIX inválida")
+
+        registros: list[dict[str, int | str]] = []
+        posicao: int = CABECALHO.size
+        while posicao + CONJUNTO.size <= tamanho:
+            id_conjunto, tam_conjunto = CONJUNTO.unpack_from(datagrama, posicao)
+            if tam_conjunto < CONJUNTO.size:
+                raise ValueError("conjunto inválido")
+            corpo: bytes = datagrama[posicao + CONJUNTO.size : posicao + tam_conjunto]
+            posicao += tam_conjunto
+
+            if id_conjunto == ID_CONJUNTO_MODELOS:
+                self._le_modelos(dominio, corpo)
+            elif (dominio, id_conjunto) in self.modelos:
+                registros.extend(
+                    self._le_dados(self.modelos[(dominio, id_conjunto)], corpo)
+                )
+
+        return registros
+
+    def _le_modelos(self, dominio: int, corpo: bytes) -> None:
+        posicao: int = 0
+        while posicao + 4 <= len(corpo):
+            id_modelo, quantidade = struct.unpack_from("!HH", corpo, posicao)
+            posicao += 4
+            campos: list[Campo] = []
+            for _ in range(quantidade):
+                id_elemento, tamanho = struct.unpack_from("!HH", corpo, posicao)
+                posicao += 4
+                enterprise: int = 0
+                if id_elemento & BIT_ENTERPRISE:
+                    (enterprise,) = struct.unpack_from("!I", corpo, posicao)
+                    posicao += 4
+                    id_elemento &= ~BIT_ENTERPRISE
+                campos.append((enterprise, id_elemento, tamanho))
+            self.modelos[(dominio, id_modelo)] = campos
+
+    def _le_dados(
+        self, campos: list[Campo], corpo: bytes
+    ) -> list[dict[str, int | str]]:
+        tamanho_registro: int = sum(campo[2] for campo in campos)
+        registros: list[dict[str, int | str]] = []
+
+        # O que sobra depois do último registro completo é preenchimento
+        for inicio in range(0, len(corpo) - tamanho_registro + 1, tamanho_registro):
+            registro: dict[str, int | str] = {}
+            posicao: int = inicio
+            for enterprise, id_elemento, tamanho in campos:
+                bruto: bytes = corpo[posicao : posicao + tamanho]
+                posicao += tamanho
+                nome: str = ELEMENTOS.get(
+                    (enterprise, id_elemento), f"{enterprise}.{id_elemento}"
+                )
+                registro[nome] = (
+                    str(ipaddress.ip_address(bruto))
+                    if nome in ENDERECOS
+                    else int.from_bytes(bruto, "big")
+                )
+            registros.append(registro)
+
+        return registros
+
+    def recebe(self, timeout: float = 1.0) -> list[dict[str, int | str]]:
+        """
+        Recebe e decodifica um datagrama.
+
+        Raises:
+            TimeoutError: Se nada chegar em `timeout` segundos.
+        """
+        self._sock.settimeout(timeout)
+        datagrama, _ = self._sock.recvfrom(65535)
+        return self.decodifica(datagrama)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coletor IPFIX de depuração")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--endereco", default="127.0.0.1")
+    args = parser.parse_args()
+
+    coletor: ColetorIPFIX = ColetorIPFIX(args.porta, args.endereco)
+    print(f"Escutando IPFIX em {args.endereco}:{coletor.porta}")
+    try:
+        while True:
+            try:
+                for registro in coletor.recebe(timeout=None):
+                    print(registro)
+            except ValueError as erro:
+                print(f"Datagrama ignorado: {erro}")
+    except KeyboardInterrupt:
+        coletor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Módulo principal do sistema de captura e monitoramento de rede.
 """
 
+import argparse
 import logging
 import os
 import subprocess
@@ -11,6 +12,8 @@ from typing import NoReturn
 
 from netlog import NetLogger
 from servers import Server
+from supervisor import Supervisor, inicia_dashboard
+from taxas import METRICAS
 
 SRCPATH: str = os.path.dirname(__file__)
 PATH: str = os.path.dirname(SRCPATH)
@@ -31,6 +34,24 @@ def sigint_handler() -> NoReturn:
     exit()
 
 
+def limite_alerta(texto: str) -> tuple[str, float]:
+    """
+    Converte ``METRICA=VALOR`` (opção ``--alerta``) em um par.
+
+    Raises:
+        argparse.ArgumentTypeError: Se o formato ou a métrica forem inválidos.
+    """
+    metrica, _, valor = texto.partition("=")
+    if metrica not in METRICAS:
+        raise argparse.ArgumentTypeError(
+            f"métrica inválida: {metrica!r} (use {', '.join(METRICAS)})"
+        )
+    try:
+        return metrica, float(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"limite inválido: {valor!r}") from None
+
+
 def main() -> None:
     """
     Função principal do sistema.
@@ -39,10 +60,94 @@ def main() -> None:
     - Configura o logging (arquivo e console).
     - Registra o handler de interrupção SIGINT.
     - Cria e inicia os threads para:
+        * Captura de pacotes (`NetLogger.run`), iniciada primeiro
         * Servidores HTTP/FTP (`Server.start`)
-        * Captura de pacotes (`NetLogger.run`)
+    - Inicia a interface Streamlit em paralelo, depois da captura.
     - Mantém os threads ativos até o término.
+
+    Com ``--modo processos``, delega tudo ao `Supervisor`, que executa
+    cada componente em um processo separado.
     """
+    parser = argparse.ArgumentParser(description="NetLogger")
+    parser.add_argument(
+        "--modo",
+        choices=("threads", "processos"),
+        default="threads",
+        help="executa os componentes em threads ou em processos separados",
+    )
+    parser.add_argument(
+        "--servidores",
+        choices=("threads", "asyncio"),
+        default="threads",
+        help="atende HTTP/FTP com uma thread por servidor ou em um event loop",
+    )
+    parser.add_argument(
+        "--motor",
+        choices=("scapy", "mmap"),
+        default="scapy",
+        help="motor de captura (mmap: anel TPACKET_V3, apenas Linux)",
+    )
+    parser.add_argument(
+        "--permitidos",
+        metavar="ARQUIVO",
+        help="arquivo com IPs e faixas CIDR a capturar, um por linha",
+    )
+    parser.add_argument(
+        "--duravel",
+        action="store_true",
+        help="continua o CSV existente e retoma os totais do checkpoint",
+    )
+    parser.add_argument(
+        "--amostragem",
+        choices=("sistematica", "probabilistica"),
+        help="sob sobrecarga, conta apenas uma amostra dos pacotes "
+        "(bytes e pacotes são estimados)",
+    )
+    parser.add_argument(
+        "--coletor",
+        metavar="HOST:PORTA",
+        help="modo agente: envia também cada janela a um coletor central",
+    )
+    parser.add_argument(
+        "--ipfix",
+        metavar="HOST:PORTA",
+        help="exporta as janelas em IPFIX (UDP) para um coletor de fluxos",
+    )
+    parser.add_argument(
+        "--anel",
+        metavar="ARQUIVO",
+        help="guarda os quadros recentes em um anel mapeado neste arquivo "
+        "(exporte em pcap com: python src/anel.py ARQUIVO saida.pcap)",
+    )
+    parser.add_argument(
+        "--anel-mb",
+        type=int,
+        default=64,
+        help="memória total do anel de quadros, em MiB, incluindo o índice "
+        "(cerca de 1/3 do total): os quadros ocupam ~2/3 (padrão: 64)",
+    )
+    parser.add_argument(
+        "--tcp-metricas",
+        action="store_true",
+        help="grava RTT, retransmissões e janelas zero por conexão TCP "
+        "em netlog_tcp.csv",
+    )
+    parser.add_argument(
+        "--taxas",
+        action="store_true",
+        help="mantém as taxas recentes (bytes/s e pacotes/s) por IP e protocolo",
+    )
+    parser.add_argument(
+        "--alerta",
+        type=limite_alerta,
+        action="append",
+        metavar="METRICA=VALOR",
+        help="alerta quando a taxa passar do limite (por segundo); métricas: "
+        + ", ".join(METRICAS)
+        + " (implica --taxas)",
+    )
+    args = parser.parse_args()
+
     logging.basicConfig(
         level=logging.INFO,
         format="([{levelname}] - {asctime}): {message}",
@@ -53,35 +158,57 @@ def main() -> None:
         ],
     )
 
+    if args.modo == "processos":
+        Supervisor(
+            CSV_SAIDA,
+            servidores_async=args.servidores == "asyncio",
+            motor=args.motor,
+            permitidos_path=args.permitidos,
+            duravel=args.duravel,
+            amostragem=args.amostragem,
+            coletor=args.coletor,
+            ipfix=args.ipfix,
+            anel_path=args.anel,
+            anel_mb=args.anel_mb,
+            metricas_tcp=args.tcp_metricas,
+            taxas=args.taxas,
+            alertas=dict(args.alerta) if args.alerta else None,
+        ).executa()
+        return
+
     signal(SIGINT, sigint_handler)
 
     servidores: Server = Server()
-    logger: NetLogger = NetLogger(CSV_SAIDA)
-
-    env = os.environ.copy()
-    env["STREAMLIT_DISABLE_ONBOARDING"] = "1"
-
-    streamlit_proc = subprocess.Popen(
-        [
-            "streamlit",
-            "run",
-            os.path.join(SRCPATH, "interface.py"),
-            "--server.headless",
-            "true",
-            "--server.enableCORS",
-            "true",
-            "--server.enableXsrfProtection",
-            "true",
-        ],
-        env=env,
+    logger: NetLogger = NetLogger(
+        CSV_SAIDA,
+        motor=args.motor,
+        permitidos_path=args.permitidos,
+        duravel=args.duravel,
+        amostragem=args.amostragem,
+        coletor=args.coletor,
+        ipfix=args.ipfix,
+        anel_path=args.anel,
+        anel_mb=args.anel_mb,
+        metricas_tcp=args.tcp_metricas,
+        taxas=args.taxas,
+        alertas=dict(args.alerta) if args.alerta else None,
     )
 
-    thread_servidores: Thread = Thread(target=servidores.start, daemon=True)
+    thread_servidores: Thread = Thread(
+        target=(
+            servidores.start_async if args.servidores == "asyncio" else servidores.start
+        ),
+        daemon=True,
+    )
     thread_logger: Thread = Thread(target=logger.run, daemon=True)
 
+    # A captura começa antes de tudo; o Streamlit leva segundos para subir
+    # e só lê o CSV, então não precisa atrasá-la
     thread_logger.start()
     thread_servidores.start()
 
+    streamlit_proc: subprocess.Popen = inicia_dashboard()
+
     try:
         thread_logger.join()
         thread_servidores.join()
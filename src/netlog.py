@@ -4,10 +4,45 @@ NetLogger - Captura de pacotes de rede e gera estatísticas em CSV e log.
 Funcionalidades principais:
 - Captura pacotes de todas as interfaces de rede usando Scapy.
 - Filtra apenas pacotes envolvendo os IPs coletados
-  (servidores locais e conexões HTTP/FTP).
+  (servidores locais e conexões HTTP/FTP) ou permitidos por
+  configuração, individualmente ou por faixa CIDR (ver `permissoes`).
 - Calcula estatísticas de bytes enviados e recebidos por IP e protocolo.
+  Internamente, os IPs são inteiros internados em `ip.TABELA` e só
+  voltam a ser texto na escrita do CSV.
 - Registra os resultados em um arquivo CSV e também em log.
+- Consolida as janelas em séries de 5 s, 1 min e 1 h gravadas ao lado
+  do CSV, lidas pela interface sem reler o histórico (ver `consolidacao`).
 - Suporta interrupção manual via CTRL+C (SIGINT).
+- Modo durável: continua o CSV existente e grava periodicamente um
+  checkpoint binário dos totais acumulados (ver `checkpoint`), retomado
+  na próxima execução; os totais de todas as execuções vão para o log na
+  retomada e ao encerrar.
+- Proteção contra sobrecarga (opcional): quando o processamento não
+  acompanha o tráfego, passa a contar só uma amostra dos pacotes e
+  grava estimativas (contagens multiplicadas pela taxa), indicando a
+  taxa de amostragem em cada linha (ver `amostragem`). No motor scapy,
+  a amostra é escolhida à medida que os quadros chegam: os descartados
+  não são guardados nem dissecados.
+- Modo agente (opcional): além do CSV local, envia as linhas de cada
+  janela a um coletor central (ver `coletor`). Outros destinos podem ser
+  registrados com `NetLogger.adiciona_destino`.
+- Exportação IPFIX (opcional): envia as janelas como registros de fluxo
+  a um coletor IPFIX via UDP (ver `ipfix`).
+- Anel de quadros brutos (opcional): guarda os quadros mais recentes em
+  memória pré-alocada, para exportá-los em pcap sob demanda (ver `anel`).
+- Métricas TCP por conexão (opcional): RTT do handshake e dos dados,
+  retransmissões, segmentos fora de ordem e janelas zero, gravados a cada
+  janela em ``<csv>_tcp.csv`` (ver `tcp_metricas`).
+- Taxas e alertas (opcional): médias móveis de bytes/s e pacotes/s por IP
+  e por protocolo, com alertas por limite e um resumo JSON das maiores
+  taxas para a interface (ver `taxas`).
+
+Motores de captura:
+- ``scapy`` (padrão): `sniff` em todas as interfaces. Os quadros são
+  guardados brutos durante a janela; o anel e as métricas TCP os leem
+  direto dos bytes, e apenas os contados pela agregação são dissecados.
+- ``mmap`` (apenas Linux): anel ``TPACKET_V3`` de um socket ``AF_PACKET``
+  (ver `captura_mmap`), lido em lotes sem cópia nem objetos do scapy.
 
 Requisitos:
 - Privilégios de administrador/root.
@@ -17,19 +52,49 @@ Requisitos:
 """
 
 import csv
+import heapq
 import logging
+import os
 import sys
+import time
+from _csv import Writer
 from collections import defaultdict
 from datetime import datetime
 from signal import SIGINT, signal
 from types import FrameType
+from typing import Callable, Iterator
 
-from _csv import Writer
-from scapy.all import Packet, PacketList, get_if_list, sniff
+# Importa apenas as camadas usadas: `scapy.all` carrega todas as camadas
+# e protocolos conhecidos, o que atrasa o início da captura em segundos
+from scapy.data import MTU
+from scapy.interfaces import get_if_list
 from scapy.layers.inet import IP, TCP
-
-from ip import get_local_ip
+from scapy.layers.l2 import Ether
+from scapy.packet import Packet
+from scapy.sendrecv import sniff
+from scapy.sessions import DefaultSession
+from scapy.supersocket import SuperSocket
+
+import checkpoint
+from amostragem import Amostragem
+from anel import AnelQuadros, capacidade_para
+from coletor import Agente
+from colunas import COLUNAS_CSV, COLUNAS_CSV_TCP, Linha
+from consolidacao import Consolidacao
+from ip import TABELA, get_local_ip
+from ipfix import ExportadorIPFIX
+from permissoes import ListaPermissoes
 from servers import get_ips
+from taxas import Taxas
+from tcp_metricas import LinhaTCP, MetricasTCP, campos_tcp
+
+if sys.platform.startswith("linux"):
+    from scapy.arch.linux import L2Socket
+
+    # Sockets cujo endereço de origem (sockaddr_ll) informa enlace e sentido
+    SOCKETS_COM_SENTIDO: tuple[type, ...] = (L2Socket,)
+else:
+    SOCKETS_COM_SENTIDO = ()
 
 PROTOCOLOS: dict[int, str] = {
     # Tabela de protocolos IANA (apenas alguns exemplos)
@@ -44,6 +109,20 @@ PROTOCOLOS: dict[int, str] = {
 }
 
 
+# Contadores por (IP, protocolo): bytes enviados/recebidos e pacotes
+# enviados/recebidos
+Contadores = defaultdict[tuple[int, str], list[int]]
+
+# Quadro capturado pelo motor scapy, ainda não dissecado: classe da camada
+# de enlace, bytes e horário da captura
+Quadro = tuple[type[Packet], bytes, float]
+
+ETHERTYPES_IP: tuple[bytes, bytes] = (b"\x08\x00", b"\x86\xdd")
+ETHERTYPE_VLAN: bytes = b"\x81\x00"
+ARPHRD_LOOPBACK: int = 772
+PACKET_OUTGOING: int = 4
+
+
 def http_ftp(portas: tuple[int, int], http: int = 8000, ftp: int = 2121) -> str:
     """
     Converte ``8000`` para ``"HTTP"`` e ``2121`` para ``"FTP"``,
@@ -69,6 +148,88 @@ def hora() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+def posicao_rede(classe: type[Packet], bruto: bytes) -> int | None:
+    """
+    Retorna a posição do cabeçalho IP em um quadro não dissecado.
+
+    Args:
+        classe (type[Packet]): Camada de enlace informada pelo socket.
+        bruto (bytes): Quadro capturado.
+
+    Returns:
+        int | None: A posição, ou ``None`` se o quadro não for IP (ou a
+        camada de enlace não for Ethernet nem IP puro).
+    """
+    if classe is IP:
+        return 0
+    if classe is not Ether:
+        return None
+
+    tipo: bytes = bruto[12:14]
+    if tipo == ETHERTYPE_VLAN:
+        return 18 if bruto[16:18] in ETHERTYPES_IP else None
+    return 14 if tipo in ETHERTYPES_IP else None
+
+
+class _SessaoBruta(DefaultSession):
+    """
+    Sessão do `sniff` que guarda os quadros sem dissecá-los.
+
+    A dissecação é a parte cara do `sniff`. Adiada, a amostragem escolhe
+    os quadros à medida que chegam: os descartados não são guardados, e só
+    os selecionados viram objetos do scapy.
+
+    No Linux, como no motor mmap, a cópia de saída dos quadros do loopback
+    é descartada (o mesmo quadro volta como entrada).
+
+    Attributes:
+        quadros (list[Quadro]): Quadros selecionados pela amostragem.
+        capturados (int): Quadros recebidos, antes da amostragem.
+        tempo (float): Tempo (s) gasto em `todos` durante a captura.
+    """
+
+    def __init__(
+        self,
+        mantem: Callable[[], bool] | None = None,
+        todos: Callable[[Quadro], None] | None = None,
+    ):
+        """
+        Args:
+            mantem (Callable | None): Decide se cada quadro é guardado
+                (ver `Amostragem.mantem`); ``None``: guarda todos.
+            todos (Callable | None): Chamada com cada quadro recebido,
+                inclusive os descartados pela amostragem.
+        """
+        super().__init__()
+        self.mantem = mantem
+        self.todos = todos
+        self.quadros: list[Quadro] = []
+        self.capturados: int = 0
+        self.tempo: float = 0.0
+
+    def recv(self, sock: SuperSocket) -> Iterator[Packet]:
+        if isinstance(sock, SOCKETS_COM_SENTIDO):
+            # O mesmo que `L2Socket.recv_raw`, mas com acesso ao sockaddr_ll
+            bruto, endereco, instante = sock._recv_raw(sock.ins, MTU)
+            if endereco[3] == ARPHRD_LOOPBACK and endereco[2] == PACKET_OUTGOING:
+                return iter(())
+            classe = sock.LL
+        else:
+            classe, bruto, instante = sock.recv_raw()
+        if not (bruto and classe):
+            return iter(())
+
+        quadro: Quadro = (classe, bruto, time.time() if instante is None else instante)
+        self.capturados += 1
+        if self.todos is not None:
+            inicio: float = time.perf_counter()
+            self.todos(quadro)
+            self.tempo += time.perf_counter() - inicio
+        if self.mantem is None or self.mantem():
+            self.quadros.append(quadro)
+        return iter(())
+
+
 class NetLogger:
     """
     Captura pacotes de rede e registra estatísticas em CSV e log.
@@ -84,13 +245,91 @@ class NetLogger:
         csv_path (str): Caminho do arquivo CSV de saída.
         interrompeu (bool): Indica se a execução foi interrompida manualmente.
         numero_iteracao (int): Contador de iterações de captura.
-        conexoes (set[str]): Conjunto de IPs locais ou conectados a servidores.
+        conexoes (ListaPermissoes): IPs locais, conectados a servidores
+            ou permitidos por configuração (IPs e faixas CIDR), na
+            representação inteira de `ip.TABELA`.
+        motor (str): Motor de captura (``"scapy"`` ou ``"mmap"``).
+        duravel (bool): Se o CSV é continuado e os totais são retomados
+            do checkpoint entre execuções.
+        continua (bool): Se os arquivos de saída existentes são continuados
+            em vez de recriados (modo durável ou reinício pelo supervisor).
+        checkpoint_path (str): Caminho do checkpoint binário.
+        intervalo_checkpoint (int): Janelas entre checkpoints.
+        totais (defaultdict): Totais ``[enviado, recebido]`` acumulados
+            por (IP, protocolo) desde a primeira execução (modo durável)
+            ou desde o início desta.
+        ultima_janela (str): Data/hora da última janela gravada.
+        amostragem (Amostragem | None): Controle da amostragem adaptativa
+            (``None``: sempre contagem exata).
+        destinos (list[Callable]): Funções chamadas com a data/hora e as
+            `Linha` de cada janela, depois da escrita no CSV.
+        consolidacao (Consolidacao): Séries consolidadas para a interface.
+        agente (Agente | None): Envio das janelas ao coletor central.
+        exportador_ipfix (ExportadorIPFIX | None): Exportação IPFIX.
+        anel (AnelQuadros | None): Anel com os quadros brutos recentes.
+        tcp (MetricasTCP | None): Métricas TCP por conexão.
+        tcp_path (str): CSV das métricas TCP (``<csv>_tcp.csv``).
+        taxas (Taxas | None): Taxas recentes e alertas, atualizadas a cada
+            janela (resumo em ``<csv>_taxas.json``, alertas em
+            ``<csv>_alertas.csv``).
     """
 
-    def __init__(self, csv_path: str, portas_proibidas: tuple[int] = (8501,)):
+    def __init__(
+        self,
+        csv_path: str,
+        portas_proibidas: tuple[int] = (8501,),
+        motor: str = "scapy",
+        permitidos_path: str | None = None,
+        duravel: bool = False,
+        checkpoint_path: str | None = None,
+        intervalo_checkpoint: int = 1,
+        amostragem: str | None = None,
+        coletor: str | None = None,
+        ipfix: str | None = None,
+        anel_path: str | None = None,
+        anel_mb: int = 64,
+        metricas_tcp: bool = False,
+        taxas: bool = False,
+        alertas: dict[str, float] | None = None,
+        continua: bool = False,
+    ):
         """
         Inicializa o arquivo CSV de saída com o cabeçalho padrão.
 
+        Args:
+            csv_path (str): Caminho do CSV de saída.
+            portas_proibidas (tuple[int]): Portas ignoradas na captura
+                (padrão: a do Streamlit).
+            motor (str): ``"scapy"`` (padrão) ou ``"mmap"`` (apenas Linux).
+            permitidos_path (str | None): Arquivo com IPs e faixas CIDR
+                permitidos, um por linha (ver `ListaPermissoes.carrega`).
+            duravel (bool): Continua o CSV existente em vez de apagá-lo e
+                retoma os totais do checkpoint.
+            checkpoint_path (str | None): Caminho do checkpoint
+                (padrão: ``<csv_path>.ckpt``).
+            intervalo_checkpoint (int): Grava o checkpoint a cada
+                `intervalo_checkpoint` janelas (padrão: todas).
+            amostragem (str | None): Modo da amostragem adaptativa sob
+                sobrecarga (``"sistematica"`` ou ``"probabilistica"``);
+                ``None`` (padrão) conta sempre todos os pacotes.
+            coletor (str | None): Endereço ``host:porta`` de um coletor
+                central para onde enviar as janelas (modo agente).
+            ipfix (str | None): Endereço ``host:porta`` de um coletor
+                IPFIX (UDP) para onde exportar as janelas.
+            anel_path (str | None): Arquivo onde mapear o anel de quadros
+                brutos (lido por ``python src/anel.py``); ``None`` (padrão)
+                não guarda os quadros.
+            anel_mb (int): Tamanho total do anel (índice incluído), em MiB.
+            metricas_tcp (bool): Calcula as métricas TCP por conexão
+                (sobre todos os pacotes, mesmo com amostragem) e as grava
+                em `tcp_path`.
+            taxas (bool): Mantém as taxas recentes por IP e protocolo.
+            alertas (dict[str, float] | None): Limites por métrica (ver
+                `taxas.METRICAS`), em unidades por segundo; ativa `taxas`.
+            continua (bool): Continua os arquivos de saída existentes, sem
+                retomar o checkpoint (usado quando o supervisor reinicia a
+                captura); implícito no modo durável.
+
         Colunas:
             - data_hora
             - ip
@@ -98,21 +337,89 @@ class NetLogger:
             - bytes_enviados
             - bytes_recebidos
             - tipo (remetente/destino)
+            - pacotes_enviados
+            - pacotes_recebidos
+            - taxa_amostragem (1: contagem exata; N: estimativa a partir
+              de 1 em N pacotes)
         """
 
         self.csv_path: str = csv_path
         self.interrompeu: bool = False
         self.numero_iteracao: int = 1
-        self.conexoes: set[str]
+        self.conexoes: ListaPermissoes = (
+            ListaPermissoes.carrega(permitidos_path)
+            if permitidos_path is not None
+            else ListaPermissoes()
+        )
         self.portas_proibidas: tuple[int] = portas_proibidas
+        self.motor: str = motor
+        self.duravel: bool = duravel
+        self.continua: bool = duravel or continua
+        self.checkpoint_path: str = checkpoint_path or csv_path + ".ckpt"
+        self.intervalo_checkpoint: int = intervalo_checkpoint
+        self.totais: defaultdict[tuple[int, str], list[int]] = defaultdict(
+            lambda: [0, 0]
+        )
+        self.ultima_janela: str = ""
+        self.amostragem: Amostragem | None = (
+            Amostragem(amostragem) if amostragem is not None else None
+        )
+        self.destinos: list[Callable[[str, list[Linha]], None]] = []
+        self.agente: Agente | None = None
+        self.exportador_ipfix: ExportadorIPFIX | None = None
+        self.anel: AnelQuadros | None = (
+            AnelQuadros(capacidade_para(anel_mb << 20), anel_path)
+            if anel_path is not None
+            else None
+        )
+        self.tcp: MetricasTCP | None = MetricasTCP() if metricas_tcp else None
+        self.tcp_path: str = os.path.splitext(csv_path)[0] + "_tcp.csv"
+        self._ips_servidores: int = 0
+        self._csv_offset: int = 0
+
+        if self.tcp is not None:
+            self.tcp.aceita = self._aceita_tcp
+
+        self.consolidacao: Consolidacao = Consolidacao(csv_path, self.continua)
+        self.adiciona_destino(self.consolidacao)
+        self.taxas: Taxas | None = None
+        if taxas or alertas:
+            base: str = os.path.splitext(csv_path)[0]
+            self.taxas = Taxas(
+                base + "_taxas.json",
+                base + "_alertas.csv",
+                alertas,
+                continua=self.continua,
+            )
+            self.adiciona_destino(self.taxas)
+        if coletor is not None:
+            self.agente = Agente(coletor)
+            self.adiciona_destino(self.agente)
+        if ipfix is not None:
+            self.exportador_ipfix = ExportadorIPFIX(ipfix)
+            self.adiciona_destino(self.exportador_ipfix)
+
+        if motor == "mmap":
+            # Importado aqui: só existe no Linux e não é usado pelo scapy
+            from captura_mmap import CapturaMmap
+
+            self._captura_mmap: CapturaMmap = CapturaMmap()
+            self._captura_mmap.anel = self.anel
+            self._captura_mmap.tcp = self.tcp
+        elif motor != "scapy":
+            raise ValueError(f"Motor de captura desconhecido: {motor}")
 
         try:
-            self.conexoes = {get_local_ip()}
+            self.conexoes.add(TABELA.interna(get_local_ip()))
         except RuntimeError:
             print("erro ao obter ip do servidor", file=sys.stderr)
             exit(1)
 
-        self._setup_csv()
+        rotacionou: bool = self._setup_csv()
+        if self.tcp is not None:
+            self._setup_csv_tcp()
+        if self.duravel:
+            self._retoma(reaplica_cauda=not rotacionou)
 
         # Captura CTRL+C
         signal(SIGINT, self.__sigint_handler)
@@ -128,85 +435,467 @@ class NetLogger:
 
         self.interrompeu = True
 
-    def _setup_csv(self) -> None:
+    def _cabecalho_existente(self) -> list[str] | None:
+        """Retorna o cabeçalho do CSV existente (ou ``None`` se vazio)."""
+
+        try:
+            with open(self.csv_path, newline="") as f:
+                return next(csv.reader(f), None)
+        except FileNotFoundError:
+            return None
+
+    def _setup_csv(self) -> bool:
         """
         Inicializa o arquivo CSV com cabeçalho.
+
+        No modo durável (ou com `continua`), um CSV existente com o mesmo
+        cabeçalho é mantido; se o cabeçalho for diferente, o arquivo antigo
+        é renomeado para ``<csv_path>.<data_hora>.antigo`` antes de criar
+        o novo.
+
+        Returns:
+            bool: Se um CSV antigo foi renomeado.
         """
 
+        rotacionou: bool = False
+
+        if self.continua:
+            cabecalho: list[str] | None = self._cabecalho_existente()
+            if cabecalho == COLUNAS_CSV:
+                return False
+            if cabecalho is not None:
+                antigo: str = f"{self.csv_path}.{datetime.now():%Y%m%d%H%M%S}.antigo"
+                os.replace(self.csv_path, antigo)
+                logging.warning(
+                    f"Cabeçalho diferente; CSV anterior movido para {antigo}"
+                )
+                rotacionou = True
+
         with open(self.csv_path, "w", newline="") as f:
             writer: Writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "data_hora",
-                    "ip",
-                    "protocolo",
-                    "bytes_enviados",
-                    "bytes_recebidos",
-                    "tipo",
-                ]
-            )
+            writer.writerow(COLUNAS_CSV)
 
-    def processa_pacotes(self, timeout: int = 5) -> None:
+        return rotacionou
+
+    def _setup_csv_tcp(self) -> None:
+        """
+        Inicializa o CSV das métricas TCP. No modo durável (ou com
+        `continua`), um arquivo existente com o mesmo cabeçalho é continuado.
         """
-        Captura pacotes por um período e registra estatísticas em CSV e log.
 
-        Para cada iteração:
-        - Captura pacotes em todas as interfaces por `timeout` segundos.
-        - Filtra pacotes IP que envolvam os IPs conhecidos
-          (conexões + IP local).
-        - Acumula bytes enviados/recebidos por IP e protocolo.
-        - Escreve estatísticas no CSV com timestamp.
+        if self.continua:
+            try:
+                with open(self.tcp_path, newline="") as f:
+                    if next(csv.reader(f), None) == COLUNAS_CSV_TCP:
+                        return
+            except FileNotFoundError:
+                pass
+
+        with open(self.tcp_path, "w", newline="") as f:
+            csv.writer(f).writerow(COLUNAS_CSV_TCP)
+
+    def _retoma(self, reaplica_cauda: bool) -> None:
+        """
+        Retoma os totais e a numeração do checkpoint, se houver.
+
+        Janelas gravadas no CSV depois do checkpoint (no máximo
+        `intervalo_checkpoint`) são relidas e somadas aos totais, e uma
+        linha final incompleta (queda no meio da escrita) é descartada.
+        O custo não depende do tamanho do histórico.
 
         Args:
-            timeout (int, optional): Tempo em segundos \
-            para captura (padrão: 5).
+            reaplica_cauda (bool): Se o CSV é o mesmo do checkpoint.
         """
 
-        pacote: Packet
-        bytes_ip: defaultdict[tuple[str, str], dict[str, int]]
-        interfaces: list[str] = get_if_list()
-        pacotes: PacketList = sniff(timeout=timeout, iface=interfaces)
-        bytes_ip = defaultdict(lambda: {"enviado": 0, "recebido": 0})
+        estado: checkpoint.Checkpoint | None = checkpoint.carrega(self.checkpoint_path)
+        self._csv_offset = os.path.getsize(self.csv_path)
+
+        if estado is None:
+            logging.info("Nenhum checkpoint válido; totais iniciados do zero")
+            return
+
+        self.numero_iteracao = estado.numero_iteracao + 1
+        self.ultima_janela = estado.ultima_janela
+        self.totais.update(estado.totais)
+
+        if reaplica_cauda and estado.csv_offset <= self._csv_offset:
+            self._reaplica_cauda(estado.csv_offset)
+
+        logging.info(
+            f"Retomado do checkpoint: iteração {self.numero_iteracao}, "
+            f"última janela {self.ultima_janela or '-'}"
+        )
+        self.registra_totais()
+
+    def _reaplica_cauda(self, offset: int) -> None:
+        """
+        Soma aos totais as linhas do CSV após `offset` e remove uma
+        eventual linha final incompleta.
+        """
+
+        with open(self.csv_path, "r+b") as f:
+            f.seek(offset)
+            cauda: bytes = f.read()
+            completa: bytes = cauda[: cauda.rfind(b"\n") + 1]
+
+            if len(completa) < len(cauda):
+                f.truncate(offset + len(completa))
+                logging.warning("Linha incompleta no fim do CSV descartada")
+
+        janelas: set[str] = set()
+        for linha in csv.reader(completa.decode("utf-8").splitlines()):
+            data_hora, ip_end, protocolo, enviado, recebido = linha[:5]
+            totais: list[int] = self.totais[(TABELA.interna(ip_end), protocolo)]
+            totais[0] += int(enviado)
+            totais[1] += int(recebido)
+            janelas.add(data_hora)
+
+        if janelas:
+            self.numero_iteracao += len(janelas)
+            self.ultima_janela = max(janelas)
 
-        self.conexoes |= get_ips()  # atualiza lista de IPs conectados
+        self._csv_offset = offset + len(completa)
 
-        for pacote in pacotes:
+    def registra_totais(self, n: int = 5) -> None:
+        """
+        Registra no log os totais acumulados (no modo durável, de todas as
+        execuções) e os `n` pares (IP, protocolo) com mais bytes.
+        """
+        if not self.totais:
+            return
+
+        enviado: int = sum(total[0] for total in self.totais.values())
+        recebido: int = sum(total[1] for total in self.totais.values())
+        maiores = heapq.nlargest(n, self.totais.items(), key=lambda item: sum(item[1]))
+        logging.info(
+            f"Totais acumulados: {enviado} bytes enviados e {recebido} recebidos "
+            f"em {len(self.totais)} pares (IP, protocolo); maiores: "
+            + ", ".join(
+                f"{TABELA.texto(ip_end)}/{protocolo} {sum(total)}"
+                for (ip_end, protocolo), total in maiores
+            )
+        )
+
+    def salva_checkpoint(self) -> None:
+        """Grava o checkpoint com o estado atual (modo durável)."""
+
+        checkpoint.salva(
+            self.checkpoint_path,
+            checkpoint.Checkpoint(
+                numero_iteracao=self.numero_iteracao,
+                ultima_janela=self.ultima_janela,
+                csv_offset=self._csv_offset,
+                totais=dict(self.totais),
+            ),
+        )
+
+    def adiciona_destino(self, destino: Callable[[str, list[Linha]], None]) -> None:
+        """
+        Registra um destino para as janelas agregadas.
+
+        Args:
+            destino (Callable): Chamado a cada janela com a data/hora e a
+                lista de `Linha`; exceções são registradas no log e não
+                interrompem a captura.
+        """
+        self.destinos.append(destino)
+
+    def _atualiza_conexoes(self) -> None:
+        """
+        Inclui em `conexoes` os IPs novos colhidos pelos servidores.
+        Como `get_ips` só cresce, basta comparar o tamanho.
+        """
+
+        ips: set[str] = get_ips()
+        if len(ips) != self._ips_servidores:
+            self.conexoes.update(map(TABELA.interna, ips))
+            self._ips_servidores = len(ips)
+
+    def _seleciona(self, pacotes: list) -> list:
+        """Aplica a amostragem (se ativada) a um lote de pacotes."""
+
+        if self.amostragem is None:
+            return pacotes
+        return self.amostragem.seleciona(pacotes)
+
+    def _recebe_quadro(self, quadro: Quadro) -> None:
+        """
+        Chamada pela sessão do `sniff` com cada quadro, antes da
+        amostragem: copia os quadros Ethernet para o anel e passa os
+        segmentos TCP às métricas.
+        """
+        classe, bruto, instante = quadro
+        if self.anel is not None and classe is Ether:
+            self.anel.adiciona(bruto, instante, len(bruto))
+        if self.tcp is not None:
+            self._alimenta_tcp(quadro)
+
+    def _aceita_tcp(self, src: int, dst: int, sport: int, dport: int) -> bool:
+        """Filtro das métricas TCP: o mesmo da agregação."""
+
+        return (
+            src in self.conexoes
+            and dst in self.conexoes
+            and sport not in self.portas_proibidas
+            and dport not in self.portas_proibidas
+        )
+
+    def _alimenta_tcp(self, quadro: Quadro) -> None:
+        """
+        Passa um segmento TCP capturado (sem amostragem) às métricas,
+        lendo os campos direto dos bytes, sem dissecar o quadro.
+        """
+        classe, bruto, instante = quadro
+        rede: int | None = posicao_rede(classe, bruto)
+        if rede is None:
+            return
+
+        campos = campos_tcp(bruto, rede)
+        if campos is not None:
+            self.tcp.processa(instante, *campos)
+
+    def _grava_tcp(self, hora_atual: str) -> None:
+        """Grava em `tcp_path` as métricas TCP da janela."""
+
+        linhas: list[LinhaTCP] = self.tcp.fecha_janela()
+        if not linhas:
+            return
+
+        with open(self.tcp_path, "a", newline="") as f:
+            writer: Writer = csv.writer(f)
+            for cliente, porta_cliente, servidor, porta_servidor, *metricas in linhas:
+                writer.writerow(
+                    [
+                        hora_atual,
+                        TABELA.texto(cliente),
+                        porta_cliente,
+                        TABELA.texto(servidor),
+                        porta_servidor,
+                        http_ftp((porta_cliente, porta_servidor)),
+                        *(
+                            "" if valor is None else round(valor, 3)
+                            for valor in metricas[:4]
+                        ),
+                        *metricas[4:],
+                    ]
+                )
+
+            if self.duravel:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _agrega_scapy(self, timeout: int) -> tuple[Contadores, int, int, float]:
+        """
+        Captura com `sniff` e acumula bytes e pacotes por (IP, protocolo).
+
+        A amostragem (se ativa) escolhe os quadros à medida que chegam; só
+        os selecionados são guardados (sem dissecar) e, depois da captura,
+        dissecados pelo scapy. O anel e as métricas TCP recebem todos os
+        quadros durante a captura.
+
+        Returns:
+            tuple: `Contadores` ``[bytes enviados, bytes recebidos,
+            pacotes enviados, pacotes recebidos]`` por (IP, protocolo),
+            sem correção da amostragem; o IP de origem do último pacote;
+            a quantidade de pacotes capturados; e o tempo (s) gasto
+            processando-os (durante e depois da captura).
+        """
+
+        bytes_ip: Contadores = defaultdict(lambda: [0, 0, 0, 0])
+        interfaces: list[str] = get_if_list()
+        self._atualiza_conexoes()
+        sessao: _SessaoBruta = _SessaoBruta(
+            None if self.amostragem is None else self.amostragem.mantem,
+            (
+                self._recebe_quadro
+                if self.anel is not None or self.tcp is not None
+                else None
+            ),
+        )
+        sniff(timeout=timeout, iface=interfaces, store=False, session=sessao)
+        inicio: float = time.perf_counter()
+        interna = TABELA.interna
+        src: int = 0
+
+        self._atualiza_conexoes()
+
+        # só os quadros selecionados pela amostragem viram objetos do scapy
+        for classe, bruto, _ in sessao.quadros:
+            pacote: Packet = classe(bruto)
             # evita pacotes com ICMP ou IGMP, por exemplo
             if IP not in pacote or TCP not in pacote:
                 continue
 
             ip: IP = pacote[IP]
             tcp: TCP = pacote[TCP]
-            if (ip.src not in self.conexoes or ip.dst not in self.conexoes) or (
+            src, dst = interna(ip.src), interna(ip.dst)
+            if (src not in self.conexoes or dst not in self.conexoes) or (
                 tcp.sport in self.portas_proibidas or tcp.dport in self.portas_proibidas
             ):
                 continue
 
             conn_protocolo: str = http_ftp((tcp.sport, tcp.dport))
-            tamanho = len(pacote)
-            bytes_ip[(ip.src, conn_protocolo)]["enviado"] += tamanho
-            bytes_ip[(ip.dst, conn_protocolo)]["recebido"] += tamanho
+            tamanho = len(bruto)
+            remetente: list[int] = bytes_ip[(src, conn_protocolo)]
+            destino: list[int] = bytes_ip[(dst, conn_protocolo)]
+            remetente[0] += tamanho
+            remetente[2] += 1
+            destino[1] += tamanho
+            destino[3] += 1
+
+        tempo: float = sessao.tempo + time.perf_counter() - inicio
+        return bytes_ip, src, sessao.capturados, tempo
+
+    def _agrega_mmap(self, timeout: int) -> tuple[Contadores, int, int, float]:
+        """
+        Captura pelo anel ``TPACKET_V3`` e acumula bytes e pacotes por
+        (IP, protocolo), um lote (bloco do anel) por vez.
 
+        Returns:
+            tuple: O mesmo que `_agrega_scapy`; o tempo de processamento
+            não inclui a espera por blocos do kernel.
+        """
+
+        bytes_ip: Contadores = defaultdict(lambda: [0, 0, 0, 0])
+        conexoes: ListaPermissoes = self.conexoes
+        proibidas: tuple[int] = self.portas_proibidas
+        captura = self._captura_mmap
+        pacotes_antes, descartados_antes = captura.pacotes, captura.descartados
+        src: int = 0
+        pendentes: int = 0
+        tempo: float = 0.0
+
+        # `lotes` atualiza as estatísticas do kernel ao terminar
+        for lote in captura.lotes(timeout):
+            inicio: float = time.perf_counter()
+            pendentes += len(lote)
+            self._atualiza_conexoes()
+
+            for src, dst, sport, dport, tamanho in self._seleciona(lote):
+                if (src not in conexoes or dst not in conexoes) or (
+                    sport in proibidas or dport in proibidas
+                ):
+                    continue
+
+                conn_protocolo: str = http_ftp((sport, dport))
+                remetente: list[int] = bytes_ip[(src, conn_protocolo)]
+                destino: list[int] = bytes_ip[(dst, conn_protocolo)]
+                remetente[0] += tamanho
+                remetente[2] += 1
+                destino[1] += tamanho
+                destino[3] += 1
+
+            tempo += time.perf_counter() - inicio
+
+        descartados: int = captura.descartados - descartados_antes
+        if descartados:
+            logging.warning(
+                f"{descartados} de {captura.pacotes - pacotes_antes} pacotes "
+                "descartados pelo kernel nesta janela"
+            )
+
+        return bytes_ip, src, pendentes, tempo
+
+    def processa_pacotes(self, timeout: int = 5) -> None:
+        """
+        Captura pacotes por um período e registra estatísticas em CSV e log.
+
+        Para cada iteração:
+        - Captura pacotes em todas as interfaces por `timeout` segundos,
+          com o motor configurado.
+        - Filtra pacotes IP que envolvam os IPs conhecidos
+          (conexões + IP local).
+        - Acumula bytes e pacotes enviados/recebidos por IP e protocolo
+          (de uma amostra, se a amostragem estiver ativa).
+        - Escreve estatísticas no CSV com timestamp, corrigidas pela taxa
+          de amostragem.
+        - Ajusta a taxa de amostragem para a próxima janela.
+
+        Args:
+            timeout (int, optional): Tempo em segundos \
+            para captura (padrão: 5).
+        """
+
+        taxa: int = 1 if self.amostragem is None else self.amostragem.taxa
+
+        if self.motor == "mmap":
+            bytes_ip, src, pendentes, tempo = self._agrega_mmap(timeout)
+        else:
+            bytes_ip, src, pendentes, tempo = self._agrega_scapy(timeout)
+
+        inicio: float = time.perf_counter()
         hora_atual: str = hora()
 
+        linhas: list[Linha] = []
+
         with open(self.csv_path, "a", newline="") as f:
-            ip_end: str
+            ip_end: int
             protocolo: str
             writer: Writer = csv.writer(f)
 
-            for (ip_end, protocolo), valores in bytes_ip.items():
-                tipo: str = "remetente" if ip_end == ip.src else "destino"
+            for (ip_end, protocolo), contadores in bytes_ip.items():
+                # Estimativas não enviesadas: cada pacote contado representa
+                # `taxa` pacotes
+                enviado, recebido, pac_enviados, pac_recebidos = (
+                    valor * taxa for valor in contadores
+                )
+                tipo: str = "remetente" if ip_end == src else "destino"
                 writer.writerow(
                     [
                         hora_atual,
-                        ip_end,
+                        TABELA.texto(ip_end),
                         protocolo,
-                        valores["enviado"],
-                        valores["recebido"],
+                        enviado,
+                        recebido,
                         tipo,
+                        pac_enviados,
+                        pac_recebidos,
+                        taxa,
                     ]
                 )
 
+                totais: list[int] = self.totais[(ip_end, protocolo)]
+                totais[0] += enviado
+                totais[1] += recebido
+
+                if self.destinos:
+                    linhas.append(
+                        (
+                            ip_end,
+                            protocolo,
+                            enviado,
+                            recebido,
+                            tipo,
+                            pac_enviados,
+                            pac_recebidos,
+                            taxa,
+                        )
+                    )
+
+            if self.duravel:
+                f.flush()
+                os.fsync(f.fileno())
+                self._csv_offset = f.tell()
+
+        if self.tcp is not None:
+            self._grava_tcp(hora_atual)
+
+        self.ultima_janela = hora_atual
+
+        for destino in self.destinos:
+            try:
+                destino(hora_atual, linhas)
+            except Exception as erro:
+                logging.warning(f"Falha no destino {destino!r}: {erro}")
+
+        if self.amostragem is not None:
+            self.amostragem.atualiza(
+                tempo + time.perf_counter() - inicio, timeout, pendentes
+            )
+
+        if self.duravel and self.numero_iteracao % self.intervalo_checkpoint == 0:
+            self.salva_checkpoint()
+
         logging.info(f"Iteração {self.numero_iteracao} concluída")
         self.numero_iteracao += 1
 
@@ -228,13 +917,25 @@ class NetLogger:
                 msg = f"Erro durante captura: {type(ex).__name__}: {ex}"
                 logging.warning(msg)
 
+        if self.motor == "mmap":
+            self._captura_mmap.close()
+
+        if self.duravel:
+            self.salva_checkpoint()
+        self.registra_totais()
+
+        if self.agente is not None:
+            self.agente.close()
+        if self.exportador_ipfix is not None:
+            self.exportador_ipfix.close()
+        if self.anel is not None:
+            self.anel.close()
+
         print("Interrompendo...", file=sys.stderr)
         logging.info("Execução interrompida manualmente")
 
 
 if __name__ == "__main__":
-    import os
-
     SRCPATH: str = os.path.dirname(__file__)
     PATH: str = os.path.dirname(SRCPATH)
 
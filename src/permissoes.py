@@ -0,0 +1,133 @@
+"""
+Lista de IPs e faixas CIDR cujos pacotes são contabilizados pelo NetLogger.
+
+Funcionalidades principais:
+- Aceita IPs individuais e faixas CIDR (IPv4 e IPv6), como ``10.0.0.0/8``.
+- IPs individuais ficam em um conjunto (consulta O(1)). As faixas são
+  agrupadas por tamanho de prefixo, uma tabela hash por prefixo, como em
+  uma trie de prefixos achatada: a consulta aplica cada máscara presente
+  e procura a rede na tabela correspondente. O custo depende apenas da
+  quantidade de prefixos distintos (no máximo 32 para IPv4), não da
+  quantidade de entradas, então se mantém rápido com dezenas de milhares.
+- Trabalha com a representação inteira de `ip` (IPv6 marcado com
+  `BIT_IPV6`), então IPv4 e IPv6 nunca se sobrepõem.
+- Pode ser carregada de um arquivo texto, com uma entrada por linha e
+  comentários iniciados por ``#``.
+
+Uso típico:
+    permitidos = ListaPermissoes.carrega("permitidos.txt")
+    permitidos.update(ips_dos_servidores)
+    ip_para_int("10.1.2.3") in permitidos
+"""
+
+import ipaddress
+from typing import Iterable
+
+from ip import BIT_IPV6
+
+TODOS_IPV4: int = (1 << 32) - 1
+TODOS_IPV6: int = (1 << 128) - 1
+
+
+def mascara(versao: int, prefixo: int) -> int:
+    """
+    Retorna a máscara de rede na representação inteira de `ip`
+    (no IPv6, mantém o `BIT_IPV6`).
+    """
+    if versao == 4:
+        return TODOS_IPV4 ^ ((1 << (32 - prefixo)) - 1)
+    return BIT_IPV6 | (TODOS_IPV6 ^ ((1 << (128 - prefixo)) - 1))
+
+
+class ListaPermissoes:
+    """
+    Conjunto de IPs (inteiros) e faixas CIDR permitidos.
+
+    Implementa ``in``, ``add`` e ``update`` como um ``set[int]``, para
+    poder substituir o conjunto de conexões do NetLogger.
+    """
+
+    def __init__(self, entradas: Iterable[str] = ()):
+        """
+        Args:
+            entradas (Iterable[str]): IPs ou faixas CIDR em texto.
+
+        Raises:
+            ValueError: Se alguma entrada não for um IP ou CIDR válido.
+        """
+        self._ips: set[int] = set()
+        self._redes: dict[tuple[int, int], set[int]] = {}
+        self._faixas4: list[tuple[int, set[int]]] = []
+        self._faixas6: list[tuple[int, set[int]]] = []
+
+        for entrada in entradas:
+            self._insere(entrada)
+        self._compila()
+
+    def _insere(self, entrada: str) -> None:
+        """
+        Interpreta uma entrada: IPs individuais vão direto para o conjunto;
+        faixas vão para a tabela do seu (versão, prefixo).
+        """
+        rede = ipaddress.ip_network(entrada.strip(), strict=False)
+        marca: int = BIT_IPV6 if rede.version == 6 else 0
+        endereco: int = int(rede.network_address) | marca
+
+        if rede.num_addresses == 1:
+            self._ips.add(endereco)
+        else:
+            chave: tuple[int, int] = (rede.version, rede.prefixlen)
+            self._redes.setdefault(chave, set()).add(endereco)
+
+    def _compila(self) -> None:
+        """
+        Monta as listas (máscara, redes) consultadas em ``in``, com as
+        tabelas maiores primeiro (mais chance de acerto antecipado).
+        """
+        faixas: dict[int, list[tuple[int, set[int]]]] = {4: [], 6: []}
+        for (versao, prefixo), redes in sorted(
+            self._redes.items(), key=lambda item: -len(item[1])
+        ):
+            faixas[versao].append((mascara(versao, prefixo), redes))
+
+        self._faixas4, self._faixas6 = faixas[4], faixas[6]
+
+    @classmethod
+    def carrega(cls, caminho: str) -> "ListaPermissoes":
+        """
+        Carrega a lista de um arquivo com uma entrada por linha.
+        Linhas vazias e comentários (``#``) são ignorados.
+        """
+        with open(caminho, encoding="utf-8") as f:
+            linhas: list[str] = [linha.split("#", 1)[0].strip() for linha in f]
+        return cls(linha for linha in linhas if linha)
+
+    def adiciona(self, entrada: str) -> None:
+        """Adiciona um IP ou faixa CIDR em texto."""
+
+        self._insere(entrada)
+        self._compila()
+
+    def add(self, valor: int) -> None:
+        """Adiciona um IP na representação inteira."""
+
+        self._ips.add(valor)
+
+    def update(self, valores: Iterable[int]) -> None:
+        """Adiciona vários IPs na representação inteira."""
+
+        self._ips.update(valores)
+
+    def __contains__(self, valor: int) -> bool:
+        if valor in self._ips:
+            return True
+
+        for mascara_rede, redes in self._faixas6 if valor & BIT_IPV6 else self._faixas4:
+            if valor & mascara_rede in redes:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        """Quantidade de IPs individuais mais quantidade de faixas."""
+
+        return len(self._ips) + sum(len(redes) for redes in self._redes.values())
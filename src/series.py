@@ -0,0 +1,441 @@
+"""
+Séries temporais reamostradas para os gráficos do painel.
+
+Funcionalidades:
+- Lê das séries consolidadas durante a captura (ver `consolidacao`) só
+  o trecho exibido, na resolução adequada, mais os baldes ainda abertos.
+- Soma os totais por IP e protocolo da série de 1 h, e lê só o fim do
+  CSV do NetLogger, para que a interface não releia o histórico.
+- Agrega as linhas do CSV do NetLogger em janelas de 5 s, 1 min e 1 h,
+  quando não há séries consolidadas (por exemplo, no CSV do coletor).
+- Escolhe automaticamente a resolução conforme o intervalo exibido.
+- Reduz cada série com LTTB (Largest-Triangle-Three-Buckets) para
+  limitar a quantidade de pontos enviada ao Altair.
+- Resume o CSV de métricas TCP em percentis de latência por IP.
+
+Assim, o tempo de renderização e o tamanho do gráfico ficam limitados,
+independentemente de há quanto tempo a captura está rodando.
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from consolidacao import (
+    COLUNAS_SERIE,
+    FORMATO,
+    RESOLUCOES,
+    caminho_abertas,
+    caminho_serie,
+)
+
+MAX_JANELAS: int = 2000  # máximo de janelas agregadas por série
+MAX_PONTOS: int = 500  # máximo de pontos por série após o LTTB
+LEITURA_CAUDA: int = 1 << 20  # bytes lidos do fim do CSV por `le_cauda`
+
+PERCENTIS: tuple[float, ...] = (0.5, 0.9, 0.99)
+
+
+def agrega_series(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Agrega os bytes por janela de tempo, IP e protocolo em cada resolução.
+
+    Args:
+        df (pd.DataFrame): Linhas do CSV com as colunas ``data_hora``,
+            ``ip``, ``protocolo``, ``bytes_enviados`` e ``bytes_recebidos``.
+
+    Returns:
+        dict[str, pd.DataFrame]: Uma tabela por chave de `RESOLUCOES`,
+        ordenada por ``data_hora``.
+    """
+
+    base: pd.DataFrame = df[
+        ["data_hora", "ip", "protocolo", "bytes_enviados", "bytes_recebidos"]
+    ].copy()
+    base["data_hora"] = pd.to_datetime(base["data_hora"], errors="coerce")
+    base = base.dropna(subset=["data_hora"])
+
+    series: dict[str, pd.DataFrame] = {}
+    for nome, segundos in RESOLUCOES.items():
+        agregado: pd.DataFrame = base.assign(
+            data_hora=base["data_hora"].dt.floor(f"{segundos}s")
+        )
+        series[nome] = (
+            agregado.groupby(["data_hora", "ip", "protocolo"], as_index=False)
+            .agg({"bytes_enviados": "sum", "bytes_recebidos": "sum"})
+            .sort_values("data_hora", ignore_index=True)
+        )
+
+    return series
+
+
+def escolhe_resolucao(
+    inicio: pd.Timestamp, fim: pd.Timestamp, max_janelas: int = MAX_JANELAS
+) -> str:
+    """
+    Retorna a resolução mais fina que cobre o intervalo com no máximo
+    `max_janelas` janelas. Se nenhuma couber, retorna a mais grossa.
+    """
+
+    duracao: float = max((fim - inicio).total_seconds(), 0.0)
+    nome: str = ""
+
+    for nome, segundos in RESOLUCOES.items():
+        if duracao / segundos <= max_janelas:
+            return nome
+
+    return nome
+
+
+def _posicao(
+    f: io.BufferedReader, inicio: int, tamanho: int, data_hora: bytes, inclusivo: bool
+) -> int:
+    """
+    Busca binária em um CSV consolidado (ordenado por horário) a partir
+    da posição `inicio` (começo de uma linha): retorna a posição da
+    primeira linha com horário maior ou igual a `data_hora` (estritamente
+    maior, se `inclusivo`), lendo O(log n) linhas.
+    """
+
+    baixo, alto = inicio, tamanho
+    while baixo < alto:
+        meio: int = (baixo + alto) // 2
+        f.seek(meio - 1)
+        f.readline()  # completa a linha em que `meio` caiu
+        linha: bytes = f.readline()
+        chave: bytes = linha[: len(data_hora)]
+        if linha and (chave <= data_hora if inclusivo else chave < data_hora):
+            baixo = meio + 1
+        else:
+            alto = meio
+
+    f.seek(baixo - 1)
+    f.readline()
+    return f.tell()
+
+
+def _le_trecho(caminho: str, inicio: pd.Timestamp, fim: pd.Timestamp) -> pd.DataFrame:
+    """Lê do CSV consolidado apenas as linhas entre `inicio` e `fim`."""
+
+    try:
+        with open(caminho, "rb") as f:
+            cabecalho: bytes = f.readline()
+            tamanho: int = os.fstat(f.fileno()).st_size
+            comeco: int = _posicao(
+                f, len(cabecalho), tamanho, inicio.strftime(FORMATO).encode(), False
+            )
+            final: int = _posicao(
+                f, comeco, tamanho, fim.strftime(FORMATO).encode(), True
+            )
+            f.seek(comeco)
+            trecho: bytes = f.read(final - comeco)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=COLUNAS_SERIE)
+
+    return pd.read_csv(io.BytesIO(cabecalho + trecho))
+
+
+def le_abertas(csv_path: str) -> dict:
+    """Lê os baldes ainda abertos (vazio se não houver)."""
+
+    try:
+        with open(caminho_abertas(csv_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _balde_aberto(csv_path: str, resolucao: str) -> pd.DataFrame:
+    """Retorna o balde ainda aberto da `resolucao` (vazio se não houver)."""
+
+    balde: dict | None = le_abertas(csv_path).get(resolucao)
+    if not balde:
+        return pd.DataFrame(columns=COLUNAS_SERIE)
+    return pd.DataFrame(
+        [[balde["data_hora"], *linha] for linha in balde["linhas"]],
+        columns=COLUNAS_SERIE,
+    )
+
+
+def le_series(
+    csv_path: str, inicio: pd.Timestamp, fim: pd.Timestamp
+) -> dict[str, pd.DataFrame]:
+    """
+    Lê das séries consolidadas (ver `consolidacao`) o intervalo exibido,
+    na resolução escolhida por `escolhe_resolucao`, incluindo o balde
+    ainda aberto. O custo depende do intervalo, não do histórico.
+
+    Args:
+        csv_path (str): CSV principal do NetLogger.
+        inicio (pd.Timestamp): Início do intervalo exibido.
+        fim (pd.Timestamp): Fim do intervalo exibido.
+
+    Returns:
+        dict[str, pd.DataFrame]: Apenas a resolução escolhida, no mesmo
+        formato de `agrega_series` (aceito por `serie_para_grafico`).
+    """
+
+    resolucao: str = escolhe_resolucao(inicio, fim)
+    partes: list[pd.DataFrame] = [
+        _le_trecho(caminho_serie(csv_path, resolucao), inicio, fim)
+    ]
+
+    aberto: pd.DataFrame = _balde_aberto(csv_path, resolucao)
+    if not aberto.empty and inicio <= pd.Timestamp(aberto["data_hora"][0]) <= fim:
+        partes.append(aberto)
+
+    partes = [parte for parte in partes if not parte.empty]
+    tabela: pd.DataFrame = (
+        pd.concat(partes, ignore_index=True)
+        if partes
+        else pd.DataFrame(columns=COLUNAS_SERIE)
+    )
+    tabela["data_hora"] = pd.to_datetime(tabela["data_hora"])
+    return {resolucao: tabela}
+
+
+def intervalo_series(csv_path: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """
+    Retorna o primeiro e o último horário das séries consolidadas, lendo
+    apenas o começo e o fim do arquivo de 5 s (``None`` se vazias).
+    """
+
+    horarios: list[str] = []
+    try:
+        with open(caminho_serie(csv_path, "5s"), "rb") as f:
+            cabecalho: bytes = f.readline()
+            primeira: bytes = f.readline()
+            if primeira:
+                f.seek(max(len(cabecalho), os.fstat(f.fileno()).st_size - 1024))
+                ultima: bytes = f.read().splitlines()[-1]
+                horarios += [
+                    linha.split(b",", 1)[0].decode() for linha in (primeira, ultima)
+                ]
+    except FileNotFoundError:
+        pass
+
+    balde: dict | None = le_abertas(csv_path).get("5s")
+    if balde and balde["linhas"]:
+        horarios.append(balde["data_hora"])
+
+    if not horarios:
+        return None
+    return pd.Timestamp(min(horarios)), pd.Timestamp(max(horarios))
+
+
+def totais_consolidados(csv_path: str) -> pd.DataFrame:
+    """
+    Soma os bytes de toda a captura por IP e protocolo, a partir da série
+    de 1 h e do seu balde aberto, sem ler o CSV principal.
+
+    Returns:
+        pd.DataFrame: Colunas ``ip``, ``protocolo``, ``bytes_enviados`` e
+        ``bytes_recebidos`` (vazio se não houver séries consolidadas).
+    """
+
+    resolucao: str = list(RESOLUCOES)[-1]
+    try:
+        tabela: pd.DataFrame = pd.read_csv(caminho_serie(csv_path, resolucao))
+    except FileNotFoundError:
+        tabela = pd.DataFrame(columns=COLUNAS_SERIE)
+
+    partes: list[pd.DataFrame] = [
+        parte
+        for parte in (tabela, _balde_aberto(csv_path, resolucao))
+        if not parte.empty
+    ]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_SERIE[1:])
+    return (
+        pd.concat(partes, ignore_index=True)
+        .groupby(["ip", "protocolo"], as_index=False)[
+            ["bytes_enviados", "bytes_recebidos"]
+        ]
+        .sum()
+    )
+
+
+def le_cauda(caminho: str, tamanho: int = LEITURA_CAUDA) -> pd.DataFrame:
+    """
+    Lê do CSV o cabeçalho e só as linhas completas dos seus últimos
+    `tamanho` bytes (vazio se o arquivo não existir).
+    """
+
+    try:
+        with open(caminho, "rb") as f:
+            cabecalho: bytes = f.readline()
+            inicio: int = max(len(cabecalho), os.fstat(f.fileno()).st_size - tamanho)
+            # Um byte antes: descartar até a primeira quebra de linha
+            # remove só a linha cortada pelo início (ou nada)
+            f.seek(inicio - 1)
+            trecho: bytes = f.read()
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+    if not cabecalho.endswith(b"\n"):
+        return pd.DataFrame()
+    trecho = trecho.partition(b"\n")[2]
+    trecho = trecho[: trecho.rfind(b"\n") + 1]  # linha ainda sendo gravada
+    return pd.read_csv(io.BytesIO(cabecalho + trecho))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, limite: int) -> np.ndarray:
+    """
+    Seleciona até `limite` pontos da série preservando seu formato visual,
+    pelo algoritmo Largest-Triangle-Three-Buckets.
+
+    Args:
+        x (np.ndarray): Eixo X crescente (numérico).
+        y (np.ndarray): Valores da série.
+        limite (int): Quantidade máxima de pontos (mínimo 3).
+
+    Returns:
+        np.ndarray: Índices dos pontos escolhidos, em ordem crescente.
+    """
+
+    n: int = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    indices: np.ndarray = np.empty(limite, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Baldes para os pontos internos (o primeiro e o último são fixos)
+    bordas: np.ndarray = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    anterior: int = 0
+
+    for i in range(limite - 2):
+        ini, fim = bordas[i], bordas[i + 1]
+
+        # Média do balde seguinte (ou o último ponto, no último balde)
+        prox_ini: int = fim
+        prox_fim: int = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x: float = x[prox_ini:prox_fim].mean()
+        media_y: float = y[prox_ini:prox_fim].mean()
+
+        # Área do triângulo (anterior, candidato, média do próximo balde)
+        areas: np.ndarray = np.abs(
+            (x[anterior] - media_x) * (y[ini:fim] - y[anterior])
+            - (x[anterior] - x[ini:fim]) * (media_y - y[anterior])
+        )
+        anterior = ini + int(areas.argmax())
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def serie_para_grafico(
+    series: dict[str, pd.DataFrame],
+    inicio: pd.Timestamp,
+    fim: pd.Timestamp,
+    ip: str | None = None,
+    protocolo: str | None = None,
+    max_pontos: int = MAX_PONTOS,
+) -> tuple[str, pd.DataFrame]:
+    """
+    Monta a série de bytes enviados/recebidos no intervalo pedido,
+    na resolução adequada e reduzida via LTTB.
+
+    Args:
+        series (dict[str, pd.DataFrame]): Resultado de `agrega_series`.
+        inicio (pd.Timestamp): Início do intervalo exibido.
+        fim (pd.Timestamp): Fim do intervalo exibido.
+        ip (str | None): Filtra por IP, se informado.
+        protocolo (str | None): Filtra por protocolo, se informado.
+        max_pontos (int): Quantidade máxima de pontos por série.
+
+    Returns:
+        tuple[str, pd.DataFrame]: Resolução usada e tabela no formato
+        longo, com as colunas ``data_hora``, ``Tipo`` e ``Bytes``.
+    """
+
+    resolucao: str = escolhe_resolucao(inicio, fim)
+    tabela: pd.DataFrame = series[resolucao]
+
+    filtro: pd.Series = (tabela["data_hora"] >= inicio) & (tabela["data_hora"] <= fim)
+    if ip is not None:
+        filtro &= tabela["ip"] == ip
+    if protocolo is not None:
+        filtro &= tabela["protocolo"] == protocolo
+
+    por_janela: pd.DataFrame = (
+        tabela[filtro]
+        .groupby("data_hora", as_index=False)
+        .agg({"bytes_enviados": "sum", "bytes_recebidos": "sum"})
+    )
+
+    partes: list[pd.DataFrame] = []
+    for coluna, tipo in (
+        ("bytes_recebidos", "Bytes Recebidos"),
+        ("bytes_enviados", "Bytes Enviados"),
+    ):
+        if por_janela.empty:
+            continue
+
+        x: np.ndarray = por_janela["data_hora"].astype("int64").to_numpy()
+        escolhidos: np.ndarray = lttb(x, por_janela[coluna].to_numpy(), max_pontos)
+        partes.append(
+            pd.DataFrame(
+                {
+                    "data_hora": por_janela["data_hora"].iloc[escolhidos],
+                    "Tipo": tipo,
+                    "Bytes": por_janela[coluna].iloc[escolhidos],
+                }
+            )
+        )
+
+    if not partes:
+        return resolucao, pd.DataFrame(columns=["data_hora", "Tipo", "Bytes"])
+
+    return resolucao, pd.concat(partes, ignore_index=True)
+
+
+def latencias_por_ip(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula percentis de latência e totais de eventos TCP por IP.
+
+    Cada IP entra nas conexões em que é cliente ou servidor. Os percentis
+    de RTT são calculados sobre os RTTs medianos de cada conexão e janela;
+    os do handshake, sobre os handshakes observados.
+
+    Args:
+        df (pd.DataFrame): Linhas do CSV de métricas TCP do NetLogger.
+
+    Returns:
+        pd.DataFrame: Uma linha por IP, com ``rtt_pNN_ms``,
+        ``handshake_pNN_ms`` (para cada percentil de `PERCENTIS`),
+        ``retransmissoes``, ``fora_de_ordem`` e ``janelas_zero``.
+    """
+
+    eventos: list[str] = ["retransmissoes", "fora_de_ordem", "janelas_zero"]
+    colunas: list[str] = ["rtt_mediano_ms", "rtt_handshake_ms", *eventos]
+
+    dados: pd.DataFrame = pd.concat(
+        [
+            df.rename(columns={"ip_cliente": "ip"})[["ip", *colunas]],
+            # Conexões locais (mesmo IP nas duas pontas) contam uma vez
+            df[df["ip_servidor"] != df["ip_cliente"]].rename(
+                columns={"ip_servidor": "ip"}
+            )[["ip", *colunas]],
+        ],
+        ignore_index=True,
+    )
+    for coluna in colunas:
+        dados[coluna] = pd.to_numeric(dados[coluna], errors="coerce")
+
+    grupos = dados.groupby("ip")
+    resultado: pd.DataFrame = pd.DataFrame(index=grupos.size().index)
+    for coluna, nome in (("rtt_mediano_ms", "rtt"), ("rtt_handshake_ms", "handshake")):
+        quantis: pd.DataFrame = grupos[coluna].quantile(list(PERCENTIS)).unstack()
+        for percentil in PERCENTIS:
+            resultado[f"{nome}_p{round(percentil * 100)}_ms"] = quantis[percentil]
+
+    resultado[eventos] = grupos[eventos].sum().astype(int)
+    return resultado.reset_index()
@@ -10,19 +10,36 @@ Funcionalidades principais:
   evitar condições de corrida entre múltiplas threads.
 - Classe `Server`: inicializa e gerencia os servidores HTTP e FTP
   em threads separadas.
+- Modo asyncio (`Server.start_async`): HTTP e FTP (controle e dados)
+  atendidos em um único event loop, sem uma thread por servidor e
+  com baixo custo por conexão ociosa. Arquivos são enviados com
+  `loop.sendfile` e a demais E/S de disco roda em um executor, para não
+  bloquear o loop.
+- Canal opcional (`define_canal`): quando os servidores rodam em outro
+  processo (ver `supervisor`), cada IP novo também é enviado por uma fila.
 
 Uso típico:
     server = Server(http_port=8000, ftp_port=2121)
-    server.start()
+    server.start()  # ou server.start_async()
 
     # Mais tarde, é possível acessar os IPs conectados:
     ips = get_ips()
 """
 
+import asyncio
+import html
 import logging
+import mimetypes
 import os
+import posixpath
+import stat
+import time
+from functools import partial
+from http import HTTPStatus
 from http.server import HTTPServer, SimpleHTTPRequestHandler
+from multiprocessing.queues import Queue
 from threading import Lock, Thread
+from urllib.parse import quote, unquote, urlsplit
 
 from pyftpdlib.authorizers import DummyAuthorizer
 from pyftpdlib.handlers import FTPHandler
@@ -32,6 +49,30 @@ LOCK: Lock = Lock()
 
 ip_set: set[str] = set()
 
+canal: Queue | None = None
+
+
+def define_canal(fila: Queue | None) -> None:
+    """
+    Define a fila para a qual cada IP novo é enviado, além de `ip_set`.
+    Usado quando a captura roda em outro processo.
+    """
+    global canal
+    canal = fila
+
+
+def registra_ip(client_ip: str) -> None:
+    """
+    Adiciona o IP ao conjunto global, com proteção via Lock, e o envia
+    ao canal (se houver) na primeira vez em que é visto.
+    """
+    with LOCK:
+        novo: bool = client_ip not in ip_set
+        ip_set.add(client_ip)
+
+    if novo and canal is not None:
+        canal.put_nowait(client_ip)
+
 
 class LoggingHTTPHandler(SimpleHTTPRequestHandler):
     """
@@ -49,8 +90,7 @@ class LoggingHTTPHandler(SimpleHTTPRequestHandler):
         logging.info(f"IP {client_ip} conectado via HTTP")
 
         # Adiciona ao conjunto de IPs com Lock, para evitar race conditions
-        with LOCK:
-            ip_set.add(client_ip)
+        registra_ip(client_ip)
 
         super().do_GET()
 
@@ -69,8 +109,476 @@ class LoggingFTPHandler(FTPHandler):
         client_ip = self.remote_ip
         logging.info(f"IP {client_ip} conectado via FTP")
 
-        with LOCK:
-            ip_set.add(client_ip)
+        registra_ip(client_ip)
+
+
+def _caminho_real(raiz: str, virtual: str) -> str | None:
+    """
+    Converte um caminho virtual (``/a/b``) no caminho real dentro de `raiz`.
+    Retorna ``None`` se o caminho escapar da raiz.
+    """
+    raiz = os.path.realpath(raiz)
+    real: str = os.path.realpath(os.path.join(raiz, virtual.lstrip("/")))
+
+    if os.path.commonpath((raiz, real)) != raiz:
+        return None
+    return real
+
+
+async def _envia_arquivo(writer: asyncio.StreamWriter, caminho: str) -> None:
+    """
+    Envia o arquivo `caminho` pelo transporte de `writer` com
+    `loop.sendfile`: ``os.sendfile`` (sem cópia) quando o transporte
+    permite, ou leitura em blocos por um executor. Em nenhum caso a E/S
+    de disco bloqueia o loop.
+    """
+
+    await writer.drain()
+    with open(caminho, "rb") as f:
+        await asyncio.get_running_loop().sendfile(writer.transport, f)
+
+
+class HTTPAssincrono:
+    """
+    Servidor HTTP mínimo (GET/HEAD de arquivos estáticos) sobre asyncio,
+    com o mesmo registro de IPs de `LoggingHTTPHandler.do_GET`.
+
+    Conexões ociosas custam apenas uma corrotina parada em `readline`,
+    sem uma thread dedicada.
+
+    Atributos:
+        raiz (str): Diretório servido.
+    """
+
+    LIMITE_CABECALHO: int = 64 * 1024
+
+    def __init__(self, raiz: str):
+        self.raiz = raiz
+
+    async def _responde(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        cabecalhos: dict[str, str],
+        corpo: bytes = b"",
+    ) -> None:
+        """Envia a linha de status, os cabeçalhos e o corpo (opcional)."""
+
+        linhas: list[str] = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        linhas += [f"{chave}: {valor}" for chave, valor in cabecalhos.items()]
+        writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1"))
+        writer.write(corpo)
+        await writer.drain()
+
+    async def _erro(self, writer: asyncio.StreamWriter, status: HTTPStatus) -> None:
+        """Envia uma resposta de erro curta."""
+
+        corpo: bytes = f"{status.value} {status.phrase}\n".encode()
+        await self._responde(
+            writer,
+            status,
+            {"Content-Type": "text/plain", "Content-Length": str(len(corpo))},
+            corpo,
+        )
+
+    def _listagem(self, caminho: str, virtual: str) -> bytes:
+        """Gera a listagem HTML de um diretório."""
+
+        base: str = virtual if virtual.endswith("/") else virtual + "/"
+        itens: list[str] = []
+        for nome in sorted(os.listdir(caminho)):
+            if os.path.isdir(os.path.join(caminho, nome)):
+                nome += "/"
+            itens.append(
+                f'<li><a href="{quote(base + nome)}">{html.escape(nome)}</a></li>'
+            )
+
+        return (
+            f"<!DOCTYPE html><html><body><h1>{html.escape(base)}</h1>"
+            f"<ul>{''.join(itens)}</ul></body></html>"
+        ).encode()
+
+    async def _envia(
+        self,
+        writer: asyncio.StreamWriter,
+        virtual: str,
+        somente_cabecalho: bool,
+    ) -> None:
+        """Envia o arquivo (ou a listagem) correspondente a `virtual`."""
+
+        caminho: str | None = _caminho_real(self.raiz, virtual)
+        if caminho is not None and os.path.isdir(caminho):
+            indice: str = os.path.join(caminho, "index.html")
+            if os.path.isfile(indice):
+                caminho = indice
+            else:
+                corpo: bytes = await asyncio.get_running_loop().run_in_executor(
+                    None, self._listagem, caminho, virtual
+                )
+                await self._responde(
+                    writer,
+                    HTTPStatus.OK,
+                    {
+                        "Content-Type": "text/html; charset=utf-8",
+                        "Content-Length": str(len(corpo)),
+                    },
+                    b"" if somente_cabecalho else corpo,
+                )
+                return
+
+        if caminho is None or not os.path.isfile(caminho):
+            await self._erro(writer, HTTPStatus.NOT_FOUND)
+            return
+
+        tipo: str = mimetypes.guess_type(caminho)[0] or "application/octet-stream"
+        await self._responde(
+            writer,
+            HTTPStatus.OK,
+            {
+                "Content-Type": tipo,
+                "Content-Length": str(os.path.getsize(caminho)),
+            },
+        )
+        if somente_cabecalho:
+            return
+
+        await _envia_arquivo(writer, caminho)
+
+    async def atende(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Atende uma conexão, com suporte a keep-alive:
+        - Em cada GET, registra no log o IP do cliente e o armazena no
+          conjunto global.
+        - Responde até o cliente fechar a conexão ou pedir ``close``.
+        """
+        client_ip: str = writer.get_extra_info("peername")[0]
+
+        try:
+            while True:
+                try:
+                    cabecalho: bytes = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._erro(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+                    break
+
+                linhas: list[str] = cabecalho.decode("latin-1").split("\r\n")
+                partes: list[str] = linhas[0].split()
+                if len(partes) != 3:
+                    await self._erro(writer, HTTPStatus.BAD_REQUEST)
+                    break
+
+                metodo, alvo, versao = partes
+                campos: dict[str, str] = {}
+                for linha in linhas[1:]:
+                    chave, _, valor = linha.partition(":")
+                    campos[chave.strip().lower()] = valor.strip().lower()
+
+                if metodo not in ("GET", "HEAD"):
+                    await self._erro(writer, HTTPStatus.NOT_IMPLEMENTED)
+                    break
+
+                if metodo == "GET":
+                    logging.info(f"IP {client_ip} conectado via HTTP")
+                    registra_ip(client_ip)
+
+                virtual: str = unquote(urlsplit(alvo).path)
+                await self._envia(writer, virtual, metodo == "HEAD")
+
+                conexao: str = campos.get("connection", "")
+                if conexao == "close" or (
+                    versao == "HTTP/1.0" and conexao != "keep-alive"
+                ):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class FTPAssincrono:
+    """
+    Servidor FTP anônimo mínimo sobre asyncio (modo passivo), com o mesmo
+    registro de IPs de `LoggingFTPHandler.on_connect`.
+
+    Comandos suportados: USER, PASS, SYST, FEAT, OPTS, PWD, CWD, CDUP,
+    TYPE, PASV, EPSV, LIST, NLST, RETR, STOR, SIZE, NOOP e QUIT.
+
+    Atributos:
+        raiz (str): Diretório acessível pelos clientes.
+    """
+
+    TAMANHO_BLOCO: int = 64 * 1024
+    LIMITE_LINHA: int = 8 * 1024  # comandos maiores recebem ``500``
+    ESPERA_DADOS: float = 30.0
+    ESPERA_COMANDO: float = 300.0  # conexão de controle ociosa é encerrada
+
+    def __init__(self, raiz: str):
+        self.raiz = raiz
+
+    async def atende(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Atende uma conexão de controle até QUIT ou desconexão."""
+
+        client_ip: str = writer.get_extra_info("peername")[0]
+        logging.info(f"IP {client_ip} conectado via FTP")
+        registra_ip(client_ip)
+
+        sessao = _SessaoFTP(self, reader, writer)
+        try:
+            await sessao.executa()
+        except ConnectionError:
+            pass
+        finally:
+            sessao.fecha_passivo()
+            writer.close()
+
+
+class _SessaoFTP:
+    """
+    Estado de uma conexão de controle FTP.
+    """
+
+    def __init__(
+        self,
+        servidor: FTPAssincrono,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.servidor = servidor
+        self.reader = reader
+        self.writer = writer
+        self.cwd: str = "/"
+        self.logado: bool = False
+        self.passivo: asyncio.Server | None = None
+        self.conexao_dados: asyncio.Future | None = None
+
+    async def responde(self, texto: str) -> None:
+        """Envia uma resposta na conexão de controle."""
+
+        self.writer.write(f"{texto}\r\n".encode("utf-8"))
+        await self.writer.drain()
+
+    def virtual(self, argumento: str) -> str:
+        """Resolve `argumento` em relação ao diretório atual."""
+
+        return posixpath.normpath(posixpath.join(self.cwd, argumento or "."))
+
+    def fecha_passivo(self) -> None:
+        """Fecha o socket passivo, se houver."""
+
+        if self.passivo is not None:
+            self.passivo.close()
+            self.passivo = None
+
+    async def abre_passivo(self) -> int:
+        """Abre um socket passivo em porta efêmera e retorna a porta."""
+
+        self.fecha_passivo()
+        host: str = self.writer.get_extra_info("sockname")[0]
+        self.conexao_dados = asyncio.get_running_loop().create_future()
+
+        def conectou(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            if self.conexao_dados.done():
+                writer.close()
+            else:
+                self.conexao_dados.set_result((reader, writer))
+
+        self.passivo = await asyncio.start_server(conectou, host, 0)
+        return self.passivo.sockets[0].getsockname()[1]
+
+    async def dados(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        """Aguarda a conexão de dados aberta por PASV/EPSV."""
+
+        if self.conexao_dados is None:
+            await self.responde("425 Use PASV or EPSV first.")
+            return None
+
+        try:
+            return await asyncio.wait_for(
+                self.conexao_dados, self.servidor.ESPERA_DADOS
+            )
+        except asyncio.TimeoutError:
+            await self.responde("425 Can't open data connection.")
+            return None
+        finally:
+            self.conexao_dados = None
+            self.fecha_passivo()
+
+    async def transfere(self, conteudo: bytes | str) -> None:
+        """Envia `conteudo` (bytes ou caminho de arquivo) pelo canal de dados."""
+
+        canal = await self.dados()
+        if canal is None:
+            return
+
+        _, escrita = canal
+        await self.responde("150 Opening data connection.")
+        try:
+            if isinstance(conteudo, bytes):
+                escrita.write(conteudo)
+                await escrita.drain()
+            else:
+                await _envia_arquivo(escrita, conteudo)
+        finally:
+            escrita.close()
+        await self.responde("226 Transfer complete.")
+
+    async def recebe(self, caminho: str) -> None:
+        """Grava em `caminho` os dados recebidos pelo canal de dados."""
+
+        canal = await self.dados()
+        if canal is None:
+            return
+
+        leitura, escrita = canal
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        await self.responde("150 Opening data connection.")
+        try:
+            with open(caminho, "wb") as f:
+                while bloco := await leitura.read(self.servidor.TAMANHO_BLOCO):
+                    # A escrita em disco pode bloquear: fica fora do loop
+                    await loop.run_in_executor(None, f.write, bloco)
+        finally:
+            escrita.close()
+        await self.responde("226 Transfer complete.")
+
+    def listagem(self, caminho: str, detalhada: bool) -> bytes:
+        """Gera a listagem de `caminho` no formato do ``ls -l`` (ou só nomes)."""
+
+        nomes: list[str] = (
+            sorted(os.listdir(caminho))
+            if os.path.isdir(caminho)
+            else [os.path.basename(caminho)]
+        )
+        base: str = caminho if os.path.isdir(caminho) else os.path.dirname(caminho)
+        linhas: list[str] = []
+
+        for nome in nomes:
+            if not detalhada:
+                linhas.append(nome)
+                continue
+
+            info: os.stat_result = os.stat(os.path.join(base, nome))
+            tipo: str = "d" if stat.S_ISDIR(info.st_mode) else "-"
+            data: str = time.strftime("%b %d %H:%M", time.localtime(info.st_mtime))
+            linhas.append(
+                f"{tipo}{stat.filemode(info.st_mode)[1:]} 1 owner group "
+                f"{info.st_size:>12} {data} {nome}"
+            )
+
+        return "".join(f"{linha}\r\n" for linha in linhas).encode("utf-8")
+
+    async def executa(self) -> None:
+        """Lê e executa comandos até QUIT ou desconexão."""
+
+        await self.responde("220 NetLogger FTP pronto.")
+
+        while True:
+            try:
+                linha: bytes = await asyncio.wait_for(
+                    self.reader.readline(), self.servidor.ESPERA_COMANDO
+                )
+            except asyncio.TimeoutError:
+                await self.responde("421 Idle timeout, closing control connection.")
+                return
+            except ValueError:
+                # Linha maior que o limite do StreamReader: o restante dela
+                # seria lido como outro comando, então a conexão é encerrada
+                await self.responde("500 Command line too long.")
+                return
+            if not linha:
+                return
+
+            comando, _, argumento = (
+                linha.decode("utf-8", "replace").strip().partition(" ")
+            )
+            comando = comando.upper()
+
+            if comando == "QUIT":
+                await self.responde("221 Goodbye.")
+                return
+            elif comando == "USER":
+                await self.responde("331 Username ok, send password.")
+            elif comando == "PASS":
+                self.logado = True
+                await self.responde("230 Login successful.")
+            elif comando == "NOOP":
+                await self.responde("200 NOOP ok.")
+            elif comando == "SYST":
+                await self.responde("215 UNIX Type: L8")
+            elif comando == "FEAT":
+                await self.responde(
+                    "211-Features:\r\n EPSV\r\n PASV\r\n SIZE\r\n UTF8\r\n211 End"
+                )
+            elif comando == "OPTS":
+                await self.responde("200 OK.")
+            elif not self.logado:
+                await self.responde("530 Log in with USER and PASS first.")
+            else:
+                await self._comando_arquivos(comando, argumento)
+
+    async def _comando_arquivos(self, comando: str, argumento: str) -> None:
+        """Executa comandos que exigem login."""
+
+        virtual: str = self.virtual(argumento)
+        real: str | None = _caminho_real(self.servidor.raiz, virtual)
+
+        if comando == "PWD":
+            await self.responde(f'257 "{self.cwd}" is the current directory.')
+        elif comando in ("CWD", "CDUP"):
+            if comando == "CDUP":
+                virtual = self.virtual("..")
+                real = _caminho_real(self.servidor.raiz, virtual)
+            if real is None or not os.path.isdir(real):
+                await self.responde("550 No such directory.")
+            else:
+                self.cwd = virtual
+                await self.responde(f'250 "{virtual}" is the current directory.')
+        elif comando == "TYPE":
+            await self.responde(f"200 Type set to {argumento or 'I'}.")
+        elif comando == "PASV":
+            porta: int = await self.abre_passivo()
+            host: str = self.writer.get_extra_info("sockname")[0]
+            numeros: str = ",".join(
+                host.split(".") + [str(porta >> 8), str(porta & 0xFF)]
+            )
+            await self.responde(f"227 Entering Passive Mode ({numeros}).")
+        elif comando == "EPSV":
+            porta = await self.abre_passivo()
+            await self.responde(f"229 Entering Extended Passive Mode (|||{porta}|).")
+        elif comando in ("LIST", "NLST"):
+            # Ignora opções do tipo ``ls`` (ex.: ``LIST -la``)
+            if argumento.startswith("-"):
+                real = _caminho_real(self.servidor.raiz, self.cwd)
+            if real is None or not os.path.exists(real):
+                await self.responde("550 No such file or directory.")
+            else:
+                listagem: bytes = await asyncio.get_running_loop().run_in_executor(
+                    None, self.listagem, real, comando == "LIST"
+                )
+                await self.transfere(listagem)
+        elif comando == "RETR":
+            if real is None or not os.path.isfile(real):
+                await self.responde("550 No such file.")
+            else:
+                await self.transfere(real)
+        elif comando == "STOR":
+            if real is None or not os.path.isdir(os.path.dirname(real)):
+                await self.responde("550 Can't store file here.")
+            else:
+                await self.recebe(real)
+        elif comando == "SIZE":
+            if real is None or not os.path.isfile(real):
+                await self.responde("550 No such file.")
+            else:
+                await self.responde(f"213 {os.path.getsize(real)}")
+        else:
+            await self.responde("502 Command not implemented.")
 
 
 class Server:
@@ -80,25 +588,33 @@ class Server:
     Atributos:
         http_port (int): Porta do servidor HTTP.
         ftp_port (int): Porta do servidor FTP.
+        raiz (str | None): Diretório servido (``None``: o diretório de
+            trabalho no início dos servidores).
         http_thread (Thread | None): Thread responsável pelo servidor HTTP.
         ftp_thread (Thread | None): Thread responsável pelo servidor FTP.
     """
 
     http_port: int
     ftp_port: int
+    raiz: str | None
     http_thread: Thread | None
     ftp_thread: Thread | None
 
-    def __init__(self, http_port: int = 8000, ftp_port: int = 2121):
+    def __init__(
+        self, http_port: int = 8000, ftp_port: int = 2121, raiz: str | None = None
+    ):
         """
         Inicializa a instância do servidor.
 
         Args:
             http_port (int): Porta para o servidor HTTP (padrão: 8000).
             ftp_port (int): Porta para o servidor FTP (padrão: 2121).
+            raiz (str | None): Diretório servido (padrão: o diretório de
+                trabalho atual).
         """
         self.http_port = http_port
         self.ftp_port = ftp_port
+        self.raiz = raiz
         self.http_thread = None
         self.ftp_thread = None
 
@@ -106,7 +622,11 @@ class Server:
         """
         Inicia o servidor HTTP com LoggingHTTPHandler na porta configurada.
         """
-        handler: LoggingHTTPHandler = LoggingHTTPHandler
+        handler = (
+            LoggingHTTPHandler
+            if self.raiz is None
+            else partial(LoggingHTTPHandler, directory=self.raiz)
+        )
         server: HTTPServer = HTTPServer(("0.0.0.0", self.http_port), handler)
 
         logging.info(f"Inicializando servidor HTTP na porta {self.http_port}")
@@ -115,12 +635,13 @@ class Server:
     def start_ftp_server(self):
         """
         Inicia o servidor FTP com LoggingFTPHandler na porta configurada.
-        O acesso é anônimo e concedido ao diretório de trabalho atual.
+        O acesso é anônimo e concedido a `raiz` (padrão: o diretório de
+        trabalho atual).
         """
         authorizer: DummyAuthorizer = DummyAuthorizer()
 
         # Permite acesso anonimo
-        authorizer.add_anonymous(os.getcwd(), perm="elradfmw")
+        authorizer.add_anonymous(self.raiz or os.getcwd(), perm="elradfmw")
 
         handler: LoggingFTPHandler = LoggingFTPHandler
         handler.authorizer = authorizer
@@ -144,6 +665,51 @@ class Server:
         self.http_thread.join()
         self.ftp_thread.join()
 
+    async def serve_async(self, pronto: asyncio.Event | None = None) -> None:
+        """
+        Atende HTTP e FTP no event loop atual, até ser cancelado.
+
+        Com porta ``0``, uma porta livre é escolhida e gravada em
+        `http_port`/`ftp_port` antes de `pronto` ser sinalizado.
+
+        Args:
+            pronto (asyncio.Event | None): Sinalizado quando os servidores
+                estiverem aceitando conexões.
+        """
+        raiz: str = self.raiz or os.getcwd()
+
+        http: asyncio.Server = await asyncio.start_server(
+            HTTPAssincrono(raiz).atende,
+            "0.0.0.0",
+            self.http_port,
+            backlog=1024,
+            limit=HTTPAssincrono.LIMITE_CABECALHO,
+        )
+        ftp: asyncio.Server = await asyncio.start_server(
+            FTPAssincrono(raiz).atende,
+            "0.0.0.0",
+            self.ftp_port,
+            backlog=1024,
+            limit=FTPAssincrono.LIMITE_LINHA,
+        )
+        self.http_port = http.sockets[0].getsockname()[1]
+        self.ftp_port = ftp.sockets[0].getsockname()[1]
+
+        logging.info(f"Inicializando servidor HTTP na porta {self.http_port}")
+        logging.info(f"Inicializando servidor FTP na porta {self.ftp_port}")
+        if pronto is not None:
+            pronto.set()
+
+        async with http, ftp:
+            await asyncio.gather(http.serve_forever(), ftp.serve_forever())
+
+    def start_async(self):
+        """
+        Inicia os servidores HTTP e FTP em um único event loop asyncio.
+        Os servidores rodam indefinidamente até o processo ser encerrado.
+        """
+        asyncio.run(self.serve_async())
+
 
 def get_ips() -> set[str]:
     """
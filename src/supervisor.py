@@ -0,0 +1,404 @@
+"""
+Supervisor que executa captura, servidores e interface em processos
+separados.
+
+Funcionalidades principais:
+- Cada componente (captura, servidores HTTP/FTP e Streamlit) roda em seu
+  próprio processo, sem disputar o GIL com os demais.
+- Os IPs registrados pelos servidores chegam ao supervisor por uma fila,
+  que os repassa ao processo de captura. Se a captura for reiniciada,
+  o supervisor reenvia todos os IPs já conhecidos, e a nova captura
+  continua os arquivos de saída em vez de recriá-los.
+- O número de janelas capturadas é compartilhado via `multiprocessing.Value`
+  e informado em `Supervisor.estado`.
+- Processos que terminam inesperadamente são reiniciados, com espera
+  exponencial entre tentativas seguidas.
+- SIGINT e SIGTERM encerram todos os processos de forma ordenada.
+
+Uso típico:
+    supervisor = Supervisor(csv_path="netlog.csv")
+    supervisor.executa()
+"""
+
+import logging
+import os
+import queue
+import subprocess
+import sys
+import time
+from multiprocessing import Process, Queue, Value
+from multiprocessing.sharedctypes import Synchronized
+from signal import SIG_DFL, SIG_IGN, SIGINT, SIGTERM, signal
+from threading import Lock, Thread
+from types import FrameType
+from typing import Callable
+
+SRCPATH: str = os.path.dirname(__file__)
+
+
+def inicia_dashboard() -> subprocess.Popen:
+    """
+    Inicia a interface Streamlit em um subprocesso, sem bloquear.
+
+    Returns:
+        subprocess.Popen: Processo do Streamlit.
+    """
+    env = os.environ.copy()
+    env["STREAMLIT_DISABLE_ONBOARDING"] = "1"
+
+    return subprocess.Popen(
+        [
+            "streamlit",
+            "run",
+            os.path.join(SRCPATH, "interface.py"),
+            "--server.headless",
+            "true",
+            "--server.enableCORS",
+            "true",
+            "--server.enableXsrfProtection",
+            "true",
+        ],
+        env=env,
+    )
+
+
+def _configura_filho() -> None:
+    """
+    Prepara o processo filho: o encerramento é coordenado pelo supervisor
+    (via SIGTERM), então o SIGINT do terminal é ignorado. Os handlers do
+    supervisor, herdados no fork, são desfeitos.
+    """
+    signal(SIGINT, SIG_IGN)
+    signal(SIGTERM, SIG_DFL)
+
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="([{levelname}] - {asctime}): {message}",
+            style="{",
+        )
+
+
+def _processo_captura(
+    csv_path: str,
+    opcoes: dict[str, str | int | bool | dict[str, float] | None],
+    fila_ips: Queue,
+    iteracoes: Synchronized,
+) -> None:
+    """
+    Processo de captura: executa `NetLogger.run`, recebendo IPs pela fila.
+    `opcoes` são repassadas ao construtor do `NetLogger`.
+    """
+    _configura_filho()
+
+    # Importado aqui para não atrasar o supervisor com o scapy
+    import servers
+    from netlog import NetLogger
+
+    logger: NetLogger = NetLogger(csv_path, **opcoes)
+    signal(SIGINT, SIG_IGN)  # NetLogger registra seu próprio handler
+
+    def sigterm_handler(sig: int, frame: FrameType) -> None:
+        logger.interrompeu = True
+
+    signal(SIGTERM, sigterm_handler)
+
+    def recebe_ips() -> None:
+        while True:
+            try:
+                ip: str = fila_ips.get(timeout=1)
+            except queue.Empty:
+                pass
+            else:
+                with servers.LOCK:
+                    servers.ip_set.add(ip)
+            iteracoes.value = logger.numero_iteracao - 1
+
+    Thread(target=recebe_ips, daemon=True).start()
+    logger.run()
+
+
+def _processo_servidores(fila_ips: Queue, assincrono: bool) -> None:
+    """
+    Processo dos servidores HTTP/FTP: envia cada IP novo pela fila.
+    """
+    _configura_filho()
+
+    import servers
+
+    servers.define_canal(fila_ips)
+    if assincrono:
+        servers.Server().start_async()
+    else:
+        servers.Server().start()
+
+
+def _processo_dashboard() -> None:
+    """
+    Processo da interface: mantém o Streamlit vivo e o encerra no SIGTERM.
+    """
+    _configura_filho()
+
+    streamlit_proc: subprocess.Popen = inicia_dashboard()
+
+    def sigterm_handler(sig: int, frame: FrameType) -> None:
+        streamlit_proc.terminate()
+
+    signal(SIGTERM, sigterm_handler)
+    sys.exit(streamlit_proc.wait())
+
+
+class Supervisor:
+    """
+    Executa e monitora os processos do sistema.
+
+    Attributes:
+        csv_path (str): Caminho do CSV de saída da captura.
+        dashboard (bool): Se a interface Streamlit deve ser iniciada.
+        servidores_async (bool): Se os servidores usam o modo asyncio.
+        motor (str): Motor de captura do `NetLogger`.
+        permitidos_path (str | None): Arquivo de IPs/faixas permitidos.
+        duravel (bool): Se a captura retoma o CSV e o checkpoint, inclusive
+            quando o processo é reiniciado.
+        amostragem (str | None): Modo da amostragem adaptativa da captura.
+        coletor (str | None): ``host:porta`` do coletor central (modo agente).
+        ipfix (str | None): ``host:porta`` do coletor IPFIX.
+        anel_path (str | None): Arquivo do anel de quadros brutos.
+        anel_mb (int): Tamanho do anel de quadros, em MiB.
+        metricas_tcp (bool): Se a captura calcula as métricas TCP.
+        taxas (bool): Se a captura mantém as taxas recentes.
+        alertas (dict[str, float] | None): Limites de alerta das taxas.
+        espera_inicial (float): Espera (s) antes do 1º reinício de um processo.
+        espera_maxima (float): Espera máxima (s) entre reinícios seguidos.
+        prazo_encerramento (float): Tempo (s) dado aos processos para
+            terminarem antes de serem finalizados à força.
+        processos (dict[str, Process]): Processos em execução, por nome.
+        reinicios (dict[str, int]): Quantidade de reinícios, por nome.
+        ips (set[str]): IPs registrados pelos servidores.
+        iteracoes (Synchronized): Janelas concluídas pela captura atual.
+        parando (bool): Indica se o encerramento foi solicitado.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        dashboard: bool = True,
+        servidores_async: bool = False,
+        motor: str = "scapy",
+        permitidos_path: str | None = None,
+        duravel: bool = False,
+        amostragem: str | None = None,
+        coletor: str | None = None,
+        ipfix: str | None = None,
+        anel_path: str | None = None,
+        anel_mb: int = 64,
+        metricas_tcp: bool = False,
+        taxas: bool = False,
+        alertas: dict[str, float] | None = None,
+        espera_inicial: float = 1.0,
+        espera_maxima: float = 30.0,
+        prazo_encerramento: float = 10.0,
+    ):
+        """
+        Inicializa o supervisor, sem iniciar nenhum processo.
+        """
+        self.csv_path = csv_path
+        self.dashboard = dashboard
+        self.servidores_async = servidores_async
+        self.motor = motor
+        self.permitidos_path = permitidos_path
+        self.duravel = duravel
+        self.amostragem = amostragem
+        self.coletor = coletor
+        self.ipfix = ipfix
+        self.anel_path = anel_path
+        self.anel_mb = anel_mb
+        self.metricas_tcp = metricas_tcp
+        self.taxas = taxas
+        self.alertas = alertas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.prazo_encerramento = prazo_encerramento
+
+        self.processos: dict[str, Process] = {}
+        self.reinicios: dict[str, int] = {}
+        self.ips: set[str] = set()
+        self.iteracoes: Synchronized = Value("Q", 0)
+        self.parando: bool = False
+
+        self._fila_servidores: Queue = Queue()
+        self._fila_captura: Queue = Queue()
+        # Protege `ips` e a troca de `_fila_captura` entre o laço principal
+        # (reinícios) e a thread que repassa os IPs
+        self._lock_ips: Lock = Lock()
+        self._falhas_seguidas: dict[str, int] = {}
+        self._proxima_tentativa: dict[str, float] = {}
+        self._inicio: dict[str, float] = {}
+
+    def _alvos(self) -> dict[str, Callable[[], Process]]:
+        """Retorna, por nome, a função que cria cada processo."""
+
+        alvos: dict[str, Callable[[], Process]] = {
+            "captura": self._cria_captura,
+            "servidores": lambda: Process(
+                target=_processo_servidores,
+                args=(self._fila_servidores, self.servidores_async),
+                name="servidores",
+            ),
+        }
+        if self.dashboard:
+            alvos["dashboard"] = lambda: Process(
+                target=_processo_dashboard, name="dashboard"
+            )
+        return alvos
+
+    def _cria_captura(self) -> Process:
+        """
+        Cria o processo de captura com uma fila nova, já contendo todos
+        os IPs conhecidos (a fila anterior pode ter ficado inconsistente).
+        Em um reinício, a captura continua os arquivos de saída.
+        """
+        with self._lock_ips:
+            self._fila_captura = Queue()
+            for ip in self.ips:
+                self._fila_captura.put_nowait(ip)
+
+        return Process(
+            target=_processo_captura,
+            args=(
+                self.csv_path,
+                {
+                    "motor": self.motor,
+                    "permitidos_path": self.permitidos_path,
+                    "duravel": self.duravel,
+                    "amostragem": self.amostragem,
+                    "coletor": self.coletor,
+                    "ipfix": self.ipfix,
+                    "anel_path": self.anel_path,
+                    "anel_mb": self.anel_mb,
+                    "metricas_tcp": self.metricas_tcp,
+                    "taxas": self.taxas,
+                    "alertas": self.alertas,
+                    "continua": self.reinicios.get("captura", 0) > 0,
+                },
+                self._fila_captura,
+                self.iteracoes,
+            ),
+            name="captura",
+        )
+
+    def _inicia(self, nome: str) -> None:
+        """Cria e inicia o processo `nome`."""
+
+        processo: Process = self._alvos()[nome]()
+        processo.start()
+        self.processos[nome] = processo
+        self._inicio[nome] = time.monotonic()
+        logging.info(f"Processo {nome} iniciado (PID {processo.pid})")
+
+    def _repassa_ips(self) -> None:
+        """Repassa ao processo de captura os IPs vindos dos servidores."""
+
+        while not self.parando:
+            try:
+                ip: str = self._fila_servidores.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            with self._lock_ips:
+                if ip not in self.ips:
+                    self.ips.add(ip)
+                    self._fila_captura.put_nowait(ip)
+
+    def _verifica(self) -> None:
+        """Reinicia processos que terminaram, respeitando a espera."""
+
+        agora: float = time.monotonic()
+
+        for nome, processo in list(self.processos.items()):
+            if processo.is_alive():
+                continue
+
+            if nome not in self._proxima_tentativa:
+                # Processo estável por bastante tempo: zera as falhas
+                if agora - self._inicio[nome] > self.espera_maxima:
+                    self._falhas_seguidas[nome] = 0
+
+                falhas: int = self._falhas_seguidas.get(nome, 0)
+                espera: float = min(self.espera_inicial * 2**falhas, self.espera_maxima)
+                self._falhas_seguidas[nome] = falhas + 1
+                self._proxima_tentativa[nome] = agora + espera
+                logging.warning(
+                    f"Processo {nome} terminou (código {processo.exitcode}); "
+                    f"reiniciando em {espera:.1f} s"
+                )
+
+            if agora >= self._proxima_tentativa[nome]:
+                del self._proxima_tentativa[nome]
+                self.reinicios[nome] = self.reinicios.get(nome, 0) + 1
+                self._inicia(nome)
+
+    def _sinal_handler(self, sig: int, frame: FrameType) -> None:
+        """Handler de SIGINT/SIGTERM: solicita o encerramento."""
+
+        self.parando = True
+
+    def estado(self) -> dict[str, dict[str, int | bool | None]]:
+        """
+        Retorna PID, situação e reinícios de cada processo; o da captura
+        inclui também as janelas concluídas (``"janelas"``).
+        """
+        estado: dict[str, dict[str, int | bool | None]] = {
+            nome: {
+                "pid": processo.pid,
+                "vivo": processo.is_alive(),
+                "reinicios": self.reinicios.get(nome, 0),
+            }
+            for nome, processo in self.processos.items()
+        }
+        if "captura" in estado:
+            estado["captura"]["janelas"] = self.iteracoes.value
+        return estado
+
+    def encerra(self) -> None:
+        """
+        Envia SIGTERM a todos os processos e aguarda o término; os que
+        passarem de `prazo_encerramento` são finalizados à força.
+        """
+        self.parando = True
+
+        for processo in self.processos.values():
+            if processo.is_alive():
+                processo.terminate()
+
+        limite: float = time.monotonic() + self.prazo_encerramento
+        for nome, processo in self.processos.items():
+            processo.join(max(limite - time.monotonic(), 0))
+            if processo.is_alive():
+                logging.warning(f"Processo {nome} não terminou; finalizando")
+                processo.kill()
+                processo.join()
+
+        logging.info("Todos os processos encerrados")
+
+    def executa(self, intervalo: float = 0.5) -> None:
+        """
+        Inicia todos os processos e os monitora até SIGINT/SIGTERM.
+
+        Args:
+            intervalo (float): Intervalo (s) entre verificações.
+        """
+        signal(SIGINT, self._sinal_handler)
+        signal(SIGTERM, self._sinal_handler)
+
+        for nome in self._alvos():
+            self._inicia(nome)
+
+        Thread(target=self._repassa_ips, daemon=True).start()
+
+        while not self.parando:
+            self._verifica()
+            time.sleep(intervalo)
+
+        logging.info("Encerrando processos...")
+        self.encerra()
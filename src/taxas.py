@@ -0,0 +1,341 @@
+"""
+Taxas recentes por IP e por protocolo (médias móveis exponenciais) e
+alertas por limite, calculados a cada janela do NetLogger.
+
+Funcionalidades principais:
+- Mantém, por IP e por protocolo, a média móvel exponencial (EWMA) de
+  bytes/s e pacotes/s: estado O(1) por chave (dois números e os alertas
+  ativos), atualizado a cada janela, sem reler o histórico.
+- O peso de cada janela depende da sua duração real e da meia-vida
+  configurada; chaves sem tráfego decaem e são removidas quando a taxa
+  fica desprezível.
+- Limites configuráveis (`METRICAS`) disparam alertas ao serem
+  ultrapassados e os encerram quando a taxa cai abaixo de
+  `FRACAO_NORMALIZACAO` do limite (histerese). Cada alerta vai para o
+  log, para o CSV de alertas e para as funções registradas com
+  `Taxas.adiciona_alerta`.
+- A cada janela, grava atomicamente um resumo JSON com as N maiores taxas
+  e todos os alertas ativos (mesmo de chaves fora das N maiores), lido
+  pela interface.
+
+Uso típico:
+    taxas = Taxas("netlog_taxas.json", limites={"bytes_ip": 1e6})
+    logger.adiciona_destino(taxas)
+"""
+
+import csv
+import heapq
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+from ip import TABELA
+
+# Métricas com limite configurável: bytes/s e pacotes/s, por IP e por protocolo
+METRICAS: tuple[str, ...] = (
+    "bytes_ip",
+    "pacotes_ip",
+    "bytes_protocolo",
+    "pacotes_protocolo",
+)
+
+# O alerta termina quando a taxa cai abaixo desta fração do limite
+FRACAO_NORMALIZACAO: float = 0.8
+
+# Chaves com taxas abaixo destes valores (e sem alerta) são removidas
+MINIMO_BYTES: float = 1.0
+MINIMO_PACOTES: float = 0.01
+
+COLUNAS_ALERTAS: list[str] = [
+    "data_hora",
+    "metrica",
+    "chave",
+    "valor",
+    "limite",
+    "estado",
+]
+
+
+@dataclass
+class Alerta:
+    """
+    Um limite ultrapassado (``estado="ativo"``) ou normalizado.
+
+    Attributes:
+        data_hora (str): Janela em que o estado mudou.
+        metrica (str): Uma das `METRICAS`.
+        chave (str): IP ou protocolo.
+        valor (float): Taxa média recente (por segundo).
+        limite (float): Limite configurado.
+        estado (str): ``"ativo"`` ou ``"normalizado"``.
+    """
+
+    data_hora: str
+    metrica: str
+    chave: str
+    valor: float
+    limite: float
+    estado: str
+
+
+class Taxas:
+    """
+    Destino do `NetLogger` que mantém as taxas EWMA e os alertas.
+
+    Attributes:
+        por_ip (dict[int, list]): ``[bytes/s, pacotes/s, alertas]`` por IP
+            (inteiro de `ip.TABELA`); ``alertas`` é o conjunto de métricas
+            com alerta ativo.
+        por_protocolo (dict[str, list]): O mesmo, por protocolo.
+        meia_vida (float): Tempo (s) para o peso de uma janela cair à metade.
+        limites (dict[str, float]): Limite por métrica (ver `METRICAS`).
+        top (int): Quantidade de chaves no resumo JSON.
+        resumo_path (str | None): Caminho do resumo JSON.
+        alertas_path (str | None): Caminho do CSV de alertas.
+        alertas (list[Callable]): Funções chamadas com cada `Alerta`.
+    """
+
+    def __init__(
+        self,
+        resumo_path: str | None = None,
+        alertas_path: str | None = None,
+        limites: dict[str, float] | None = None,
+        meia_vida: float = 30.0,
+        top: int = 10,
+        duracao_janela: int = 5,
+        continua: bool = False,
+    ):
+        """
+        Args:
+            resumo_path (str | None): Onde gravar o resumo JSON a cada
+                janela (``None``: não grava).
+            alertas_path (str | None): CSV onde registrar os alertas
+                (``None``: não registra).
+            limites (dict[str, float] | None): Limite por métrica, em
+                unidades por segundo.
+            meia_vida (float): Meia-vida (s) das médias.
+            top (int): Quantidade de IPs e protocolos no resumo.
+            duracao_janela (int): Duração assumida da primeira janela.
+            continua (bool): Acrescenta ao CSV de alertas existente em vez
+                de recriá-lo.
+
+        Raises:
+            ValueError: Se algum limite usar uma métrica desconhecida.
+        """
+        desconhecidas: set[str] = set(limites or {}) - set(METRICAS)
+        if desconhecidas:
+            raise ValueError(f"Métricas desconhecidas: {sorted(desconhecidas)}")
+
+        self.por_ip: dict[int, list] = {}
+        self.por_protocolo: dict[str, list] = {}
+        self.meia_vida = meia_vida
+        self.limites: dict[str, float] = dict(limites or {})
+        self.top = top
+        self.resumo_path = resumo_path
+        self.alertas_path = alertas_path
+        self.alertas: list[Callable[[Alerta], None]] = []
+        self.duracao_janela = duracao_janela
+        self._ultima: float | None = None
+
+        if alertas_path is not None and not (continua and os.path.exists(alertas_path)):
+            with open(alertas_path, "w", newline="") as f:
+                csv.writer(f).writerow(COLUNAS_ALERTAS)
+
+    def adiciona_alerta(self, callback: Callable[[Alerta], None]) -> None:
+        """
+        Registra uma função chamada com cada `Alerta` (disparo e
+        normalização); exceções são registradas no log.
+        """
+        self.alertas.append(callback)
+
+    def __call__(self, data_hora: str, linhas: list) -> None:
+        """Destino do `NetLogger`: atualiza as taxas com a janela encerrada."""
+
+        agora: float = time.monotonic()
+        duracao: float = (
+            self.duracao_janela if self._ultima is None else agora - self._ultima
+        )
+        self._ultima = agora
+        self.atualiza(data_hora, linhas, duracao)
+
+    def atualiza(self, data_hora: str, linhas: list, duracao: float) -> list[Alerta]:
+        """
+        Incorpora uma janela às médias, verifica os limites e grava o resumo.
+
+        Args:
+            data_hora (str): Data/hora da janela.
+            linhas (list): `netlog.Linha` da janela.
+            duracao (float): Duração (s) da janela.
+
+        Returns:
+            list[Alerta]: Alertas disparados ou normalizados nesta janela.
+        """
+        # Totais da janela: por IP, tudo que enviou ou recebeu; por
+        # protocolo, só o enviado (cada pacote tem exatamente um remetente)
+        janela_ip: dict[int, list[int]] = {}
+        janela_protocolo: dict[str, list[int]] = {}
+        for ip_end, protocolo, enviado, recebido, _, pac_env, pac_rec, _ in linhas:
+            total: list[int] = janela_ip.setdefault(ip_end, [0, 0])
+            total[0] += enviado + recebido
+            total[1] += pac_env + pac_rec
+            total = janela_protocolo.setdefault(protocolo, [0, 0])
+            total[0] += enviado
+            total[1] += pac_env
+
+        peso: float = 1 - math.exp(-duracao * math.log(2) / self.meia_vida)
+        disparados: list[Alerta] = []
+        for taxas, janela, sufixo in (
+            (self.por_ip, janela_ip, "ip"),
+            (self.por_protocolo, janela_protocolo, "protocolo"),
+        ):
+            self._atualiza_chaves(taxas, janela, peso, duracao)
+            disparados += self._verifica_limites(taxas, sufixo, data_hora)
+
+        for alerta in disparados:
+            self._notifica(alerta)
+        if self.resumo_path is not None:
+            self.grava_resumo(data_hora)
+
+        return disparados
+
+    @staticmethod
+    def _atualiza_chaves(
+        taxas: dict, janela: dict, peso: float, duracao: float
+    ) -> None:
+        """Aplica a janela à EWMA de cada chave (as ausentes decaem)."""
+
+        for chave in janela.keys() - taxas.keys():
+            taxas[chave] = [0.0, 0.0, set()]
+
+        for chave in list(taxas):
+            estado: list = taxas[chave]
+            bytes_janela, pacotes_janela = janela.get(chave, (0, 0))
+            estado[0] += peso * (bytes_janela / duracao - estado[0])
+            estado[1] += peso * (pacotes_janela / duracao - estado[1])
+            if (
+                estado[0] < MINIMO_BYTES
+                and estado[1] < MINIMO_PACOTES
+                and not estado[2]
+            ):
+                del taxas[chave]
+
+    def _verifica_limites(
+        self, taxas: dict, sufixo: str, data_hora: str
+    ) -> list[Alerta]:
+        """Dispara ou normaliza os alertas das métricas de `sufixo`."""
+
+        alertas: list[Alerta] = []
+        for indice, metrica in enumerate((f"bytes_{sufixo}", f"pacotes_{sufixo}")):
+            limite: float | None = self.limites.get(metrica)
+            if limite is None:
+                continue
+
+            for chave, estado in taxas.items():
+                valor: float = estado[indice]
+                ativo: bool = metrica in estado[2]
+                if not ativo and valor > limite:
+                    estado[2].add(metrica)
+                    estado_alerta: str = "ativo"
+                elif ativo and valor < limite * FRACAO_NORMALIZACAO:
+                    estado[2].discard(metrica)
+                    estado_alerta = "normalizado"
+                else:
+                    continue
+
+                alertas.append(
+                    Alerta(
+                        data_hora,
+                        metrica,
+                        TABELA.texto(chave) if sufixo == "ip" else chave,
+                        round(valor, 3),
+                        limite,
+                        estado_alerta,
+                    )
+                )
+
+        return alertas
+
+    def _notifica(self, alerta: Alerta) -> None:
+        """Envia o alerta ao log, ao CSV de alertas e às funções registradas."""
+
+        mensagem: str = (
+            f"{alerta.metrica} de {alerta.chave}: {alerta.valor:.1f}/s "
+            f"(limite {alerta.limite:g}/s)"
+        )
+        if alerta.estado == "ativo":
+            logging.warning(f"Alerta: {mensagem}")
+        else:
+            logging.info(f"Alerta normalizado: {mensagem}")
+
+        if self.alertas_path is not None:
+            with open(self.alertas_path, "a", newline="") as f:
+                csv.writer(f).writerow(asdict(alerta).values())
+
+        for callback in self.alertas:
+            try:
+                callback(alerta)
+            except Exception as erro:
+                logging.warning(f"Falha ao notificar alerta {callback!r}: {erro}")
+
+    def maiores(self, por: str = "ip", n: int | None = None) -> list[dict]:
+        """
+        Retorna as `n` chaves com maior taxa de bytes.
+
+        Args:
+            por (str): ``"ip"`` ou ``"protocolo"``.
+            n (int | None): Quantidade (padrão: `top`).
+        """
+        taxas: dict = self.por_ip if por == "ip" else self.por_protocolo
+        maiores = heapq.nlargest(
+            n or self.top, taxas.items(), key=lambda item: item[1][0]
+        )
+        return [
+            {
+                por: TABELA.texto(chave) if por == "ip" else chave,
+                "bytes_s": round(estado[0], 3),
+                "pacotes_s": round(estado[1], 3),
+                "alertas": sorted(estado[2]),
+            }
+            for chave, estado in maiores
+        ]
+
+    def ativos(self) -> list[dict]:
+        """
+        Retorna todos os alertas ativos, de IPs e de protocolos, inclusive
+        de chaves fora das `top` maiores taxas.
+        """
+        ativos: list[dict] = []
+        for taxas, sufixo in ((self.por_ip, "ip"), (self.por_protocolo, "protocolo")):
+            for chave, estado in taxas.items():
+                for metrica in sorted(estado[2]):
+                    ativos.append(
+                        {
+                            "metrica": metrica,
+                            "chave": TABELA.texto(chave) if sufixo == "ip" else chave,
+                            "valor": round(estado[metrica.startswith("pacotes_")], 3),
+                            "limite": self.limites[metrica],
+                        }
+                    )
+        return ativos
+
+    def grava_resumo(self, data_hora: str) -> None:
+        """
+        Grava o resumo JSON de forma atômica (temporário + rename), para que
+        a interface nunca leia um arquivo pela metade.
+        """
+        resumo: dict = {
+            "data_hora": data_hora,
+            "meia_vida": self.meia_vida,
+            "limites": self.limites,
+            "ips": self.maiores("ip"),
+            "protocolos": self.maiores("protocolo"),
+            "alertas": self.ativos(),
+        }
+        temporario: str = self.resumo_path + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump(resumo, f)
+        os.replace(temporario, self.resumo_path)
@@ -0,0 +1,454 @@
+"""
+Métricas de latência e retransmissão por conexão TCP, a partir dos
+cabeçalhos capturados.
+
+Funcionalidades principais:
+- RTT do handshake (SYN até o ACK do SYN/ACK, no ponto de captura).
+- RTT de dados: tempo entre um segmento com dados e o ACK que o cobre,
+  ignorando segmentos retransmitidos (algoritmo de Karn).
+- Retransmissões, segmentos fora de ordem e eventos de janela zero.
+- Tudo incremental, pacote a pacote, com estado limitado: no máximo
+  `max_conexoes` conexões (as menos recentes são descartadas) e uma fila
+  limitada de segmentos aguardando ACK por sentido.
+- Números de sequência comparados em aritmética de 32 bits, então a
+  volta do contador não gera falsas retransmissões.
+
+Classificação de um segmento com dados abaixo do maior já visto: se
+chegar logo depois dele (menos de um RTT), é fora de ordem; senão, é
+retransmissão.
+
+Cada segmento deve ser entregue uma única vez: as cópias de saída do
+loopback são descartadas pelos motores de captura.
+
+Uso típico:
+    metricas = MetricasTCP()
+    metricas.processa(instante, src, dst, sport, dport, seq, ack, flags,
+                      janela, carga)
+    linhas = metricas.fecha_janela()  # uma por conexão ativa
+"""
+
+import struct
+from collections import OrderedDict, deque
+from typing import Callable
+
+from ip import BIT_IPV6
+
+FIN: int = 0x01
+SYN: int = 0x02
+RST: int = 0x04
+ACK: int = 0x10
+
+MASCARA_SEQ: int = 0xFFFFFFFF
+METADE_SEQ: int = 1 << 31
+
+# Limite para classificar como fora de ordem enquanto não há RTT medido
+LIMITE_FORA_DE_ORDEM: float = 0.003
+
+IPV4: struct.Struct = struct.Struct("!BxH5xB2xII")  # versão/IHL, total, proto, src, dst
+IPV6: struct.Struct = struct.Struct("!4xHBxQQQQ")  # carga, próximo cabeçalho, src, dst
+TCP: struct.Struct = struct.Struct("!HHIIHH")  # portas, seq, ack, offset/flags, janela
+
+# (src, dst, porta de origem, porta de destino, seq, ack, flags, janela,
+# bytes de dados); o instante do quadro é passado à parte a
+# `MetricasTCP.processa`
+CamposTCP = tuple[int, int, int, int, int, int, int, int, int]
+
+# Linha de uma janela: cliente, porta do cliente, servidor, porta do
+# servidor, RTT do handshake, RTT mínimo, mediano e máximo (ms, ou None),
+# amostras de RTT, retransmissões, fora de ordem e eventos de janela zero
+LinhaTCP = tuple[
+    int,
+    int,
+    int,
+    int,
+    float | None,
+    float | None,
+    float | None,
+    float | None,
+    int,
+    int,
+    int,
+    int,
+]
+
+
+def campos_tcp(quadro: memoryview | bytes, rede: int) -> CamposTCP | None:
+    """
+    Extrai os campos TCP usados nas métricas a partir do cabeçalho IP.
+
+    Returns:
+        CamposTCP | None: src, dst (na representação inteira de `ip`),
+        portas, seq, ack, flags, janela e bytes de dados, ou ``None`` se
+        não for TCP (ou for um fragmento).
+    """
+    versao: int = quadro[rede] >> 4
+
+    if versao == 4:
+        versao_ihl, total, protocolo, src, dst = IPV4.unpack_from(quadro, rede)
+        fragmento: int = (quadro[rede + 6] & 0x1F) << 8 | quadro[rede + 7]
+        if protocolo != 6 or fragmento:
+            return None
+        cabecalho_ip: int = (versao_ihl & 0x0F) * 4
+        dados_ip: int = total - cabecalho_ip
+    elif versao == 6:
+        dados_ip, proximo, src_a, src_b, dst_a, dst_b = IPV6.unpack_from(quadro, rede)
+        if proximo != 6:
+            return None
+        src = (src_a << 64 | src_b) | BIT_IPV6
+        dst = (dst_a << 64 | dst_b) | BIT_IPV6
+        cabecalho_ip = 40
+    else:
+        return None
+
+    sport, dport, seq, ack, offset_flags, janela = TCP.unpack_from(
+        quadro, rede + cabecalho_ip
+    )
+    carga: int = dados_ip - (offset_flags >> 12) * 4
+    return src, dst, sport, dport, seq, ack, offset_flags & 0x1FF, janela, max(carga, 0)
+
+
+def _depois(a: int, b: int) -> bool:
+    """Indica se a posição `a` vem depois de `b` no espaço de sequência."""
+
+    return 0 < ((a - b) & MASCARA_SEQ) < METADE_SEQ
+
+
+class _Sentido:
+    """Estado de um sentido da conexão."""
+
+    __slots__ = (
+        "proximo",
+        "instante_proximo",
+        "pendentes",
+        "janela_zero",
+    )
+
+    def __init__(self, max_pendentes: int):
+        self.proximo: int | None = None  # maior seq + dados já visto
+        self.instante_proximo: float = 0.0
+        # (fim do segmento, instante, retransmitido), aguardando ACK
+        self.pendentes: deque[list] = deque(maxlen=max_pendentes)
+        self.janela_zero: bool = False
+
+
+class Conexao:
+    """
+    Estado e contadores de uma conexão TCP (cliente: quem enviou o SYN).
+
+    Os contadores se referem à janela atual e são zerados por
+    `MetricasTCP.fecha_janela`.
+    """
+
+    __slots__ = (
+        "cliente",
+        "porta_cliente",
+        "servidor",
+        "porta_servidor",
+        "sentidos",
+        "syn",
+        "synack",
+        "rtt_handshake",
+        "rtts",
+        "retransmissoes",
+        "fora_de_ordem",
+        "janelas_zero",
+        "ativa",
+        "fins",
+        "fechada",
+    )
+
+    def __init__(
+        self,
+        cliente: int,
+        porta_cliente: int,
+        servidor: int,
+        porta_servidor: int,
+        max_pendentes: int,
+    ):
+        self.cliente = cliente
+        self.porta_cliente = porta_cliente
+        self.servidor = servidor
+        self.porta_servidor = porta_servidor
+        self.sentidos: tuple[_Sentido, _Sentido] = (
+            _Sentido(max_pendentes),
+            _Sentido(max_pendentes),
+        )
+        self.syn: float | None = None
+        self.synack: float | None = None
+        self.rtt_handshake: float | None = None
+        self.rtts: list[float] = []
+        self.retransmissoes: int = 0
+        self.fora_de_ordem: int = 0
+        self.janelas_zero: int = 0
+        self.ativa: bool = False
+        self.fins: int = 0
+        self.fechada: bool = False
+
+    def resumo(self) -> LinhaTCP:
+        """Resume a janela atual em uma `LinhaTCP` (tempos em ms)."""
+
+        rtts: list[float] = sorted(self.rtts)
+        if rtts:
+            minimo, mediano, maximo = (
+                rtts[0] * 1000,
+                rtts[len(rtts) // 2] * 1000,
+                rtts[-1] * 1000,
+            )
+        else:
+            minimo = mediano = maximo = None
+
+        return (
+            self.cliente,
+            self.porta_cliente,
+            self.servidor,
+            self.porta_servidor,
+            None if self.rtt_handshake is None else self.rtt_handshake * 1000,
+            minimo,
+            mediano,
+            maximo,
+            len(rtts),
+            self.retransmissoes,
+            self.fora_de_ordem,
+            self.janelas_zero,
+        )
+
+    def zera(self) -> None:
+        """Zera os contadores da janela (o RTT do handshake sai uma vez)."""
+
+        self.rtt_handshake = None
+        self.rtts = []
+        self.retransmissoes = self.fora_de_ordem = self.janelas_zero = 0
+        self.ativa = False
+
+
+class MetricasTCP:
+    """
+    Calcula as métricas por conexão, pacote a pacote.
+
+    Attributes:
+        conexoes (OrderedDict): Conexões por (cliente, porta, servidor,
+            porta), da menos para a mais recentemente vista.
+        max_conexoes (int): Máximo de conexões acompanhadas.
+        max_amostras (int): Máximo de amostras de RTT por conexão e janela.
+        aceita (Callable | None): Filtro ``(src, dst, sport, dport) ->
+            bool``; pacotes recusados são ignorados.
+        descartadas (int): Conexões descartadas por falta de espaço.
+    """
+
+    def __init__(
+        self,
+        max_conexoes: int = 10_000,
+        max_pendentes: int = 64,
+        max_amostras: int = 256,
+    ):
+        """
+        Args:
+            max_conexoes (int): Máximo de conexões acompanhadas.
+            max_pendentes (int): Segmentos aguardando ACK, por sentido.
+            max_amostras (int): Amostras de RTT guardadas por conexão e
+                janela.
+        """
+        self.conexoes: OrderedDict[tuple[int, int, int, int], Conexao] = OrderedDict()
+        self.max_conexoes = max_conexoes
+        self.max_pendentes = max_pendentes
+        self.max_amostras = max_amostras
+        self.aceita: Callable[[int, int, int, int], bool] | None = None
+        self.descartadas: int = 0
+        self._ativas: list[Conexao] = []
+        self._removidas: list[LinhaTCP] = []
+
+    def _conexao(
+        self, src: int, dst: int, sport: int, dport: int, flags: int
+    ) -> tuple[Conexao, int] | None:
+        """
+        Localiza (ou cria) a conexão do pacote.
+
+        Returns:
+            tuple | None: A conexão e o sentido do pacote (0: do cliente,
+            1: do servidor), ou ``None`` para um RST de conexão desconhecida.
+        """
+        conexoes = self.conexoes
+        chave: tuple[int, int, int, int] = (src, sport, dst, dport)
+
+        if (conexao := conexoes.get(chave)) is not None:
+            conexoes.move_to_end(chave)
+            return conexao, 0
+
+        inversa: tuple[int, int, int, int] = (dst, dport, src, sport)
+        if (conexao := conexoes.get(inversa)) is not None:
+            conexoes.move_to_end(inversa)
+            return conexao, 1
+
+        if flags & RST:
+            return None
+
+        # Sem ver o SYN, supõe que o cliente usa a porta efêmera (maior)
+        do_cliente: bool = not flags & ACK if flags & SYN else sport > dport
+        if not do_cliente:
+            chave = inversa
+
+        if len(conexoes) >= self.max_conexoes:
+            _, antiga = conexoes.popitem(last=False)
+            self.descartadas += 1
+            if antiga.ativa:
+                self._removidas.append(antiga.resumo())
+                antiga.ativa = False
+
+        conexao = Conexao(*chave, self.max_pendentes)
+        conexoes[chave] = conexao
+        return conexao, 0 if do_cliente else 1
+
+    def processa(
+        self,
+        instante: float,
+        src: int,
+        dst: int,
+        sport: int,
+        dport: int,
+        seq: int,
+        ack: int,
+        flags: int,
+        janela: int,
+        carga: int,
+    ) -> None:
+        """
+        Atualiza as métricas com um segmento TCP.
+
+        Args:
+            instante (float): Horário da captura (s).
+            src, dst (int): IPs na representação inteira de `ip`.
+            sport, dport (int): Portas.
+            seq, ack (int): Números de sequência e de confirmação.
+            flags (int): Flags TCP (``SYN``, ``ACK``, ...).
+            janela (int): Janela anunciada.
+            carga (int): Bytes de dados do segmento.
+        """
+        if self.aceita is not None and not self.aceita(src, dst, sport, dport):
+            return
+
+        encontrada = self._conexao(src, dst, sport, dport, flags)
+        if encontrada is None:
+            return
+        conexao, indice = encontrada
+
+        if not conexao.ativa:
+            conexao.ativa = True
+            self._ativas.append(conexao)
+
+        sentido: _Sentido = conexao.sentidos[indice]
+        outro: _Sentido = conexao.sentidos[1 - indice]
+
+        if flags & RST:
+            conexao.fechada = True
+            return
+
+        # Handshake
+        if flags & SYN:
+            if indice == 0 and not flags & ACK:
+                if conexao.syn is not None:
+                    conexao.retransmissoes += 1
+                conexao.syn = instante
+            elif indice == 1:
+                conexao.synack = instante
+            sentido.proximo = (seq + 1) & MASCARA_SEQ
+            sentido.instante_proximo = instante
+        elif (
+            flags & ACK
+            and indice == 0
+            and conexao.synack is not None
+            and conexao.syn is not None
+        ):
+            conexao.rtt_handshake = instante - conexao.syn
+            conexao.syn = conexao.synack = None
+
+        # ACK: confirma os segmentos do outro sentido e mede o RTT
+        if flags & ACK and outro.pendentes:
+            pendentes: deque[list] = outro.pendentes
+            amostra: float | None = None
+            while pendentes and not _depois(pendentes[0][0], ack):
+                _, enviado, retransmitido = pendentes.popleft()
+                amostra = None if retransmitido else instante - enviado
+            if amostra is not None and len(conexao.rtts) < self.max_amostras:
+                conexao.rtts.append(amostra)
+
+        # Janela zero (conta só a transição)
+        if janela == 0 and not flags & SYN:
+            if not sentido.janela_zero:
+                conexao.janelas_zero += 1
+                sentido.janela_zero = True
+        else:
+            sentido.janela_zero = False
+
+        if carga:
+            self._dados(conexao, sentido, instante, seq, carga)
+
+        if flags & FIN:
+            conexao.fins += 1
+            conexao.fechada = conexao.fins >= 2
+
+    def _dados(
+        self,
+        conexao: Conexao,
+        sentido: _Sentido,
+        instante: float,
+        seq: int,
+        carga: int,
+    ) -> None:
+        """Classifica um segmento com dados (novo, fora de ordem, retransmitido)."""
+
+        fim: int = (seq + carga) & MASCARA_SEQ
+        proximo: int | None = sentido.proximo
+
+        if proximo is None or not _depois(proximo, seq):
+            # Segmento novo (possivelmente depois de uma lacuna)
+            sentido.proximo = fim
+            sentido.instante_proximo = instante
+            sentido.pendentes.append([fim, instante, False])
+            return
+
+        if _depois(fim, proximo):
+            # Sobreposição parcial: retransmissão com dados novos no fim
+            conexao.retransmissoes += 1
+            sentido.proximo = fim
+            sentido.instante_proximo = instante
+            sentido.pendentes.append([fim, instante, True])
+            return
+
+        limite: float = min(conexao.rtts) if conexao.rtts else LIMITE_FORA_DE_ORDEM
+        if instante - sentido.instante_proximo < limite:
+            conexao.fora_de_ordem += 1
+            return
+
+        conexao.retransmissoes += 1
+        for pendente in sentido.pendentes:
+            if not _depois(pendente[0], fim) and _depois(pendente[0], seq):
+                pendente[2] = True  # Karn: não medir RTT deste segmento
+
+    def fecha_janela(self) -> list[LinhaTCP]:
+        """
+        Encerra a janela: resume as conexões ativas nela, zera os
+        contadores e descarta as conexões encerradas.
+
+        Returns:
+            list[LinhaTCP]: Uma linha por conexão ativa na janela.
+        """
+        linhas: list[LinhaTCP] = self._removidas
+        for conexao in self._ativas:
+            if not conexao.ativa:
+                continue  # descartada durante a janela (já resumida)
+            linhas.append(conexao.resumo())
+            conexao.zera()
+            if conexao.fechada:
+                self.conexoes.pop(
+                    (
+                        conexao.cliente,
+                        conexao.porta_cliente,
+                        conexao.servidor,
+                        conexao.porta_servidor,
+                    ),
+                    None,
+                )
+
+        self._ativas = []
+        self._removidas = []
+        return linhas
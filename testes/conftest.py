@@ -1,5 +1,10 @@
+import asyncio
+import contextlib
 import os
 import sys
+import threading
+
+import pytest
 
 # adiciona src/ ao PATH do Python para evitar erros e avisos do pytest
 sys.path.insert(
@@ -8,3 +13,30 @@ sys.path.insert(
         os.path.join(os.path.dirname(__file__), "../src"),
     ),
 )
+
+import servers  # noqa: E402
+
+
+@pytest.fixture
+def servidor_async(tmp_path):
+    """Servidor asyncio em portas livres, servindo `tmp_path` (opção `raiz`)."""
+
+    server = servers.Server(http_port=0, ftp_port=0, raiz=str(tmp_path))
+    loop = asyncio.new_event_loop()
+    pronto = asyncio.Event()
+    tarefa = loop.create_task(server.serve_async(pronto))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    asyncio.run_coroutine_threadsafe(pronto.wait(), loop).result(timeout=5)
+    yield server
+
+    async def para():
+        tarefa.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await tarefa
+
+    asyncio.run_coroutine_threadsafe(para(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
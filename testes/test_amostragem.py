@@ -0,0 +1,74 @@
+import pytest
+
+from amostragem import Amostragem
+
+
+def test_contagem_exata_por_padrao() -> None:
+    """Sem sobrecarga, todos os pacotes são mantidos."""
+
+    amostragem = Amostragem()
+    pacotes = list(range(100))
+
+    assert amostragem.seleciona(pacotes) is pacotes
+    assert amostragem.atualiza(0.01, 5, len(pacotes)) == 1
+
+
+@pytest.mark.parametrize("modo", ["sistematica", "probabilistica"])
+def test_estimativa_nao_enviesada(modo: str) -> None:
+    """Contagens multiplicadas pela taxa estimam o total real."""
+
+    amostragem = Amostragem(modo, semente=1)
+    amostragem.taxa = 16
+    tamanhos = [60 + (i * 7919) % 1400 for i in range(200_000)]
+
+    estimativa = sum(amostragem.seleciona(tamanhos)) * amostragem.taxa
+
+    assert estimativa == pytest.approx(sum(tamanhos), rel=0.02)
+
+
+@pytest.mark.parametrize("modo", ["sistematica", "probabilistica"])
+def test_selecao_pacote_a_pacote(modo: str) -> None:
+    """`mantem` decide na chegada de cada pacote, com a mesma chance 1/N."""
+
+    amostragem = Amostragem(modo, semente=1)
+    amostragem.taxa = 16
+    tamanhos = [60 + (i * 7919) % 1400 for i in range(200_000)]
+
+    mantidos = [tamanho for tamanho in tamanhos if amostragem.mantem()]
+
+    assert sum(mantidos) * 16 == pytest.approx(sum(tamanhos), rel=0.02)
+    if modo == "sistematica":
+        assert len(mantidos) == len(tamanhos) // 16
+
+
+def test_histerese() -> None:
+    """
+    A taxa dobra sob carga alta, fica estável na faixa intermediária e
+    volta à contagem exata com folga.
+    """
+    amostragem = Amostragem(carga_alta=0.5, carga_baixa=0.1)
+
+    assert amostragem.atualiza(4.0, 5, 1000) == 2
+    assert amostragem.atualiza(3.0, 5, 1000) == 4
+    assert amostragem.atualiza(1.0, 5, 1000) == 4  # entre os limites
+    assert amostragem.atualiza(0.2, 5, 1000) == 2
+    assert amostragem.atualiza(0.2, 5, 1000) == 1
+    assert amostragem.atualiza(0.0, 5, 1000) == 1
+
+
+def test_fila_e_taxa_maxima() -> None:
+    """Pacotes pendentes demais também aumentam a taxa, até o máximo."""
+
+    amostragem = Amostragem(limite_pendentes=1000, taxa_maxima=4)
+
+    for _ in range(5):
+        amostragem.atualiza(0.0, 5, 100_000)
+
+    assert amostragem.taxa == 4
+
+
+def test_parametros_invalidos() -> None:
+    with pytest.raises(ValueError):
+        Amostragem("aleatoria")
+    with pytest.raises(ValueError):
+        Amostragem(carga_alta=0.5, carga_baixa=0.3)
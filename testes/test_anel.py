@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from scapy.layers.inet import IP, TCP, UDP
+from scapy.layers.l2 import Ether
+from scapy.utils import rdpcap
+
+from anel import AnelQuadros, capacidade_para, enderecos_e_portas
+
+
+def quadro(src: str, dst: str, dport: int = 80, carga: bytes = b"") -> bytes:
+    return bytes(Ether() / IP(src=src, dst=dst) / TCP(sport=1234, dport=dport) / carga)
+
+
+def marcado(numero: int, tamanho: int = 100) -> bytes:
+    """Quadro (não IP) cujos bytes identificam `numero`."""
+    return bytes([numero % 256]) * tamanho
+
+
+def test_adiciona_e_le() -> None:
+    """Os quadros voltam na ordem, com instante e tamanho original."""
+
+    anel = AnelQuadros(1 << 16)
+    anel.adiciona(b"a" * 60, 10.5, 60)
+    anel.adiciona(memoryview(b"b" * 2000)[:1500], 11.0, 2000)
+
+    assert list(anel.quadros()) == [(10.5, 60, b"a" * 60), (11.0, 2000, b"b" * 1500)]
+    assert [q[0] for q in anel.quadros(desde=10.8)] == [11.0]
+    anel.close()
+
+
+def test_capacidade_para_inclui_o_indice(tmp_path: Path) -> None:
+    """O arquivo do anel (cabeçalho, índice e dados) cabe no tamanho pedido."""
+
+    caminho = tmp_path / "netlog.anel"
+    AnelQuadros(capacidade_para(1 << 20), str(caminho)).close()
+
+    assert (1 << 20) - 128 <= caminho.stat().st_size <= 1 << 20
+
+
+def test_sobrescreve_os_mais_antigos() -> None:
+    """Com o anel cheio, só os quadros recentes permanecem, íntegros."""
+
+    anel = AnelQuadros(1000, max_quadros=50)
+    for numero in range(100):
+        anel.adiciona(marcado(numero, 90 + numero % 7), float(numero), 100)
+
+    restantes = list(anel.quadros())
+
+    assert anel.escritos == 100
+    assert 0 < len(restantes) < 12
+    assert restantes[-1][0] == 99.0
+    for instante, _, dados in restantes:
+        assert dados == marcado(int(instante), 90 + int(instante) % 7)
+    anel.close()
+
+
+def test_filtro_e_pcap(tmp_path: Path) -> None:
+    """A exportação filtra por IP, porta e tempo e gera um pcap legível."""
+
+    anel = AnelQuadros(1 << 16)
+    agora = time.time()
+    anel.adiciona(quadro("10.0.0.1", "10.0.0.2"), agora - 100, 54)
+    anel.adiciona(quadro("10.0.0.1", "10.0.0.2", carga=b"x" * 10), agora, 64)
+    anel.adiciona(quadro("10.0.0.3", "10.0.0.1", dport=2121), agora, 54)
+    anel.adiciona(quadro("10.0.0.3", "10.0.0.4"), agora, 54)
+    anel.adiciona(marcado(1), agora, 100)
+
+    assert len(anel.seleciona(segundos=10, ip="10.0.0.1")) == 2
+    assert len(anel.seleciona(ip="10.0.0.1")) == 3
+    assert len(anel.seleciona(ip="10.0.0.1", porta=2121)) == 1
+    assert len(anel.seleciona(segundos=10)) == 4
+
+    caminho = str(tmp_path / "saida.pcap")
+    assert anel.despeja(caminho, segundos=10, ip="10.0.0.1") == 2
+    pacotes = rdpcap(caminho)
+    anel.close()
+
+    assert [p[IP].dst for p in pacotes] == ["10.0.0.2", "10.0.0.1"]
+    assert bytes(pacotes[0][TCP].payload) == b"x" * 10
+    assert abs(float(pacotes[0].time) - agora) < 1e-3
+
+
+def test_enderecos_e_portas() -> None:
+    udp = bytes(Ether() / IP(src="1.2.3.4", dst="5.6.7.8") / UDP(sport=5, dport=53))
+
+    assert enderecos_e_portas(udp) == (
+        bytes([1, 2, 3, 4]),
+        bytes([5, 6, 7, 8]),
+        5,
+        53,
+    )
+    assert enderecos_e_portas(marcado(0)) is None
+
+
+def test_exportacao_nao_bloqueia_escrita(tmp_path: Path) -> None:
+    """
+    A escrita continua durante uma exportação em outra thread, e a
+    exportação só contém quadros íntegros.
+    """
+    anel = AnelQuadros(1 << 16, max_quadros=1024)
+    parar = threading.Event()
+    escritos = []
+
+    def escritor() -> None:
+        numero = 0
+        while not parar.is_set():
+            anel.adiciona(marcado(numero, 64 + numero % 200), float(numero), 0)
+            numero += 1
+        escritos.append(numero)
+
+    thread = threading.Thread(target=escritor)
+    thread.start()
+    time.sleep(0.05)
+
+    antes = anel.escritos
+    copias = [list(anel.quadros()) for _ in range(20)]
+    despejo = anel.despeja_em_segundo_plano(str(tmp_path / "saida.pcap"))
+    despejo.join(timeout=10)
+    depois = anel.escritos
+    parar.set()
+    thread.join()
+    anel.close()
+
+    assert depois > antes
+    for copia in copias:
+        for instante, _, dados in copia:
+            assert dados == marcado(int(instante), 64 + int(instante) % 200)
+
+
+def test_anel_em_arquivo_e_cli(tmp_path: Path) -> None:
+    """Outro processo lê o anel mapeado em arquivo pela linha de comando."""
+
+    caminho_anel = str(tmp_path / "netlog.anel")
+    anel = AnelQuadros(1 << 16, caminho=caminho_anel)
+    anel.adiciona(quadro("10.0.0.1", "10.0.0.2"), time.time(), 54)
+    anel.adiciona(quadro("10.0.0.5", "10.0.0.6"), time.time(), 54)
+
+    leitor = AnelQuadros.abre(caminho_anel)
+    assert leitor.escritos == 2
+    leitor.close()
+
+    saida = str(tmp_path / "saida.pcap")
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    subprocess.run(
+        [sys.executable, "anel.py", caminho_anel, saida, "--ip", "10.0.0.6"],
+        cwd=src,
+        check=True,
+        capture_output=True,
+    )
+    anel.close()
+
+    assert [p[IP].src for p in rdpcap(saida)] == ["10.0.0.5"]
@@ -0,0 +1,220 @@
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from scapy.layers.inet import IP, TCP, UDP
+from scapy.layers.inet6 import IPv6
+from scapy.layers.l2 import Ether
+
+from anel import AnelQuadros
+from captura_mmap import extrai_tcp
+from ip import TABELA, ip_para_int
+
+requer_root_linux = pytest.mark.skipif(
+    not sys.platform.startswith("linux") or os.geteuid() != 0,
+    reason="PACKET_MMAP exige Linux e root",
+)
+
+
+def test_extrai_tcp_ipv4() -> None:
+    """Extrai IPs (inteiros) e portas de um quadro Ethernet/IPv4/TCP."""
+
+    quadro = bytes(
+        Ether() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1234, dport=8000)
+    )
+
+    pacote = extrai_tcp(memoryview(quadro), 14, len(quadro))
+
+    assert pacote == (
+        ip_para_int("10.0.0.1"),
+        ip_para_int("10.0.0.2"),
+        1234,
+        8000,
+        len(quadro),
+    )
+
+
+def test_extrai_tcp_ipv4_com_opcoes() -> None:
+    """Considera o IHL ao localizar o cabeçalho TCP."""
+
+    quadro = bytes(
+        IP(src="10.0.0.1", dst="10.0.0.2", options=b"\x01" * 8) / TCP(sport=5, dport=6)
+    )
+
+    assert extrai_tcp(memoryview(quadro), 0, len(quadro))[2:4] == (5, 6)
+
+
+def test_extrai_tcp_ipv6() -> None:
+    """IPv6 usa a representação inteira com `BIT_IPV6`."""
+
+    quadro = bytes(IPv6(src="fe80::1", dst="fe80::2") / TCP(sport=1, dport=2121))
+
+    pacote = extrai_tcp(memoryview(quadro), 0, len(quadro))
+
+    assert pacote[:4] == (ip_para_int("fe80::1"), ip_para_int("fe80::2"), 1, 2121)
+
+
+def test_extrai_tcp_ignora_outros() -> None:
+    """UDP e fragmentos não iniciais são ignorados."""
+
+    udp = bytes(IP() / UDP())
+    fragmento = bytes(IP(frag=10, proto=6) / (b"x" * 20))
+
+    assert extrai_tcp(memoryview(udp), 0, len(udp)) is None
+    assert extrai_tcp(memoryview(fragmento), 0, len(fragmento)) is None
+
+
+def captura_com_bloco(quadros: list[tuple[int, int, int, bytes, int]]):
+    """
+    Cria uma `CapturaMmap` sem socket cujo anel tem um único bloco, já
+    entregue, com os `quadros` (tipo de enlace, sentido, ethertype, bytes e
+    posição do cabeçalho de rede no quadro).
+    """
+    from captura_mmap import (
+        BLOCO_NUM_PACOTES,
+        CABECALHO_TPACKET3,
+        ENDERECO_LL,
+        SOCKADDR_LL,
+        TP_STATUS_USER,
+        CapturaMmap,
+    )
+
+    bloco = bytearray(1 << 12)
+    bloco[8] = TP_STATUS_USER
+    posicao = 64
+    struct.pack_into("=II", bloco, BLOCO_NUM_PACOTES, len(quadros), posicao)
+    for enlace, sentido, tipo, quadro, rede in quadros:
+        mac = 80
+        proximo = mac + len(quadro) + (-len(quadro) % 16)
+        CABECALHO_TPACKET3.pack_into(
+            bloco, posicao, proximo, 1, 0, len(quadro), len(quadro), 0, mac, mac + rede
+        )
+        ENDERECO_LL.pack_into(
+            bloco, posicao + SOCKADDR_LL, tipo.to_bytes(2, "big"), enlace, sentido
+        )
+        bloco[posicao + mac : posicao + mac + len(quadro)] = quadro
+        posicao += proximo
+
+    captura = CapturaMmap.__new__(CapturaMmap)
+    captura._visao = memoryview(bloco)
+    captura.tamanho_bloco, captura.num_blocos, captura._atual = len(bloco), 1, 0
+    captura.quadros, captura.tcp, captura.anel = 0, None, None
+    return captura
+
+
+def test_anel_recebe_apenas_quadros_ethernet() -> None:
+    """
+    Quadros de enlaces sem cabeçalho Ethernet (ex.: túneis) são agregados,
+    mas não vão para o anel, cujo pcap é Ethernet.
+    """
+    ip_tcp = IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1, dport=8000)
+    ethernet = bytes(Ether(src="00:00:00:00:00:01", dst="00:00:00:00:00:02") / ip_tcp)
+    captura = captura_com_bloco(
+        [(1, 0, 0x0800, ethernet, 14), (65534, 0, 0x0800, bytes(ip_tcp), 0)]
+    )
+    captura.anel = AnelQuadros(1 << 16)
+
+    lote = captura._le_bloco()
+
+    assert len(lote) == 2
+    assert [quadro for _, _, quadro in captura.anel.quadros()] == [ethernet]
+    assert captura.quadros == 2
+    captura.anel.close()
+
+
+def test_ignora_quadros_nao_ip() -> None:
+    """
+    Quadros de outros ethertypes não são lidos como IP, mesmo que a carga
+    comece como um cabeçalho IPv4 ou IPv6.
+    """
+    ip_tcp = IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=1, dport=8000)
+    ip6_tcp = IPv6(src="fe80::1", dst="fe80::2") / TCP(sport=1, dport=8000)
+    captura = captura_com_bloco(
+        [
+            (1, 0, 0x0806, bytes(Ether(type=0x0806) / ip_tcp), 14),  # ARP
+            (1, 0, 0x8847, bytes(Ether(type=0x8847) / ip6_tcp), 14),  # MPLS
+            (1, 0, 0x0800, bytes(Ether() / ip_tcp), 14),
+        ]
+    )
+
+    assert [pacote[:2] for pacote in captura._le_bloco()] == [
+        (ip_para_int("10.0.0.1"), ip_para_int("10.0.0.2"))
+    ]
+    assert captura.quadros == 3
+
+
+@requer_root_linux
+def test_captura_mmap_loopback() -> None:
+    """Captura no loopback uma conexão TCP, em lotes."""
+
+    from captura_mmap import CapturaMmap
+
+    captura = CapturaMmap("lo", tamanho_bloco=1 << 16, num_blocos=8)
+    servidor = socket.create_server(("127.0.0.1", 0))
+    porta = servidor.getsockname()[1]
+
+    def cliente() -> None:
+        time.sleep(0.1)
+        with socket.create_connection(("127.0.0.1", porta)) as s:
+            s.sendall(b"x" * 1000)
+
+    threading.Thread(target=cliente).start()
+
+    pacotes = [p for lote in captura.lotes(1) for p in lote]
+    captura.close()
+    servidor.close()
+
+    local = ip_para_int("127.0.0.1")
+    da_conexao = [p for p in pacotes if porta in p[2:4]]
+    assert da_conexao
+    assert all(p[0] == local and p[1] == local for p in da_conexao)
+    # A cópia de saída do loopback é descartada: o segmento de dados aparece
+    # uma única vez
+    tamanhos = [p[4] for p in da_conexao]
+    assert tamanhos.count(max(tamanhos)) == 1
+    assert captura.pacotes >= len(da_conexao)
+
+
+@requer_root_linux
+def test_netlogger_motor_mmap(tmp_path: Path) -> None:
+    """NetLogger com motor mmap agrega e grava o tráfego no CSV."""
+
+    from netlog import NetLogger
+
+    netlogger = NetLogger(str(tmp_path / "test.csv"), motor="mmap")
+    netlogger.conexoes = {TABELA.interna("127.0.0.1")}
+    servidor = socket.create_server(("127.0.0.1", 0))
+
+    def cliente() -> None:
+        time.sleep(0.1)
+        with socket.create_connection(servidor.getsockname()) as s:
+            s.sendall(b"x" * 1000)
+
+    threading.Thread(target=cliente).start()
+
+    with patch("netlog.logging"):
+        netlogger.processa_pacotes(timeout=1)
+    netlogger._captura_mmap.close()
+    servidor.close()
+
+    with open(netlogger.csv_path) as f:
+        linhas = f.readlines()[1:]
+
+    assert any(linha.split(",")[1] == "127.0.0.1" for linha in linhas)
+    enviados = sum(int(linha.split(",")[3]) for linha in linhas)
+    assert enviados > 1000
+
+
+def test_netlogger_motor_invalido(tmp_path: Path) -> None:
+    """Motores desconhecidos são rejeitados."""
+
+    from netlog import NetLogger
+
+    with pytest.raises(ValueError):
+        NetLogger(str(tmp_path / "test.csv"), motor="pcap")
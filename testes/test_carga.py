@@ -0,0 +1,110 @@
+import asyncio
+import queue
+import time
+from collections import defaultdict
+from unittest.mock import patch
+
+import pytest
+
+import carga
+import servers
+from carga import GeradorCarga, Nivel, gera_carga, nome_arquivo
+
+
+@pytest.fixture
+def servidor_carga(servidor_async, tmp_path, monkeypatch):
+    """
+    `servidor_async` com um arquivo de teste e as portas usadas pelo gerador
+    de carga redirecionadas para ele.
+    """
+    (tmp_path / nome_arquivo(1000)).write_bytes(b"x" * 1000)
+    monkeypatch.setattr(carga, "PORTA_HTTP", servidor_async.http_port)
+    monkeypatch.setattr(carga, "PORTA_FTP", servidor_async.ftp_port)
+    return servidor_async
+
+
+def test_requisicoes_http_e_ftp(servidor_carga) -> None:
+    """Baixa o arquivo pelos dois protocolos, a partir do IP dos clientes."""
+
+    enviados, recebidos = asyncio.run(carga.requisicao_http(nome_arquivo(1000)))
+    assert enviados > 0 and recebidos > 1000
+
+    enviados, recebidos = asyncio.run(carga.requisicao_ftp(nome_arquivo(1000)))
+    assert enviados > 0 and recebidos > 1000
+
+    assert carga.CLIENTE in servers.get_ips()
+
+
+def test_requisicao_http_inexistente(servidor_carga) -> None:
+    """Respostas de erro são falhas da requisição."""
+
+    with pytest.raises(ValueError):
+        asyncio.run(carga.requisicao_http("nao_existe.bin"))
+    with pytest.raises(ValueError):
+        asyncio.run(carga.requisicao_ftp("nao_existe.bin"))
+
+
+def test_gera_carga_concorrencia_e_taxa(servidor_carga) -> None:
+    """Conta bytes e requisições por protocolo e respeita a taxa pedida."""
+
+    transferidos = asyncio.run(gera_carga(Nivel(2, 1000), 0.3))
+    for protocolo in carga.PROTOCOLOS:
+        enviados, recebidos, requisicoes, falhas = transferidos[protocolo]
+        assert requisicoes > 0 and falhas == 0
+        assert recebidos > requisicoes * 1000
+
+    limitado = asyncio.run(gera_carga(Nivel(2, 1000, taxa=10), 0.5))
+    assert all(1 <= limitado[p][2] <= 7 for p in carga.PROTOCOLOS)
+
+
+def test_executa_compara_janelas_e_transferencia() -> None:
+    """
+    Janelas de antes do nível são descartadas; as entregues durante a carga
+    e a primeira que começa depois dela são somadas e comparadas com os
+    bytes transferidos (dados do FTP passivo, ``"Outro"``, contam como FTP).
+    """
+    gerador = GeradorCarga.__new__(GeradorCarga)
+    gerador._fila = queue.Queue()
+    gerador.janela = 1
+    gerador.tolerancia = 0.02
+    cabecalhos = carga.CABECALHOS_QUADRO
+
+    gerador._fila.put((0.0, [("HTTP", 10**6, 10**6, 1, 1)]))
+
+    async def carga_falsa(nivel: Nivel, duracao: float):
+        agora = time.time()
+        gerador._fila.put(
+            (
+                agora,
+                [
+                    ("HTTP", 1000 + cabecalhos, 4000 + cabecalhos, 1, 1),
+                    ("FTP", 50 + cabecalhos, 30 + cabecalhos, 1, 1),
+                ],
+            )
+        )
+        gerador._fila.put(
+            (
+                agora + 60,
+                [
+                    ("HTTP", 0, 5000 + cabecalhos, 0, 1),
+                    ("Outro", 0, 3000 + 2 * cabecalhos, 0, 2),
+                ],
+            )
+        )
+        gerador._fila.put((agora + 61, [("HTTP", 10**6, 10**6, 1, 1)]))
+        transferidos = defaultdict(lambda: [0, 0, 0, 0])
+        transferidos["HTTP"] = [1000, 9000, 10, 0]
+        transferidos["FTP"] = [50, 3000, 2, 1]
+        return transferidos
+
+    with patch("carga.gera_carga", side_effect=carga_falsa):
+        http, ftp = gerador.executa(Nivel(2, 1000), 2.0)
+
+    assert http["protocolo"] == "HTTP" and ftp["protocolo"] == "FTP"
+    assert http["bytes_aplicacao"] == 10000 and http["pacotes"] == 3
+    assert http["precisao"] == 1.0 and http["ok"]
+    assert http["req_s"] == 5.0
+    assert ftp["bytes_aplicacao"] == 3050 and ftp["pacotes"] == 4
+    assert ftp["precisao"] == pytest.approx(3080 / 3050)
+    assert ftp["falhas"] == 1 and ftp["ok"]
+    assert gerador._fila.qsize() == 1
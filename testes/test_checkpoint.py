@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+import checkpoint
+from checkpoint import Checkpoint
+from ip import ip_para_int
+
+
+def exemplo() -> Checkpoint:
+    return Checkpoint(
+        numero_iteracao=7,
+        ultima_janela="2025-01-01 10:00:00",
+        csv_offset=1234,
+        totais={
+            (ip_para_int("10.0.0.1"), "HTTP"): [100, 200],
+            (ip_para_int("fe80::1"), "FTP"): [3, 4],
+            (ip_para_int("192.168.0.9"), "Outro"): [2**40, 0],
+        },
+    )
+
+
+def test_serializa_ida_e_volta() -> None:
+    """O checkpoint (IPv4 e IPv6) sobrevive à serialização."""
+
+    assert checkpoint.desserializa(checkpoint.serializa(exemplo())) == exemplo()
+
+
+@pytest.mark.parametrize("posicao", [0, 10, 40, -1])
+def test_desserializa_corrompido(posicao: int) -> None:
+    """Qualquer byte alterado é detectado pelo CRC."""
+
+    dados = bytearray(checkpoint.serializa(exemplo()))
+    dados[posicao] ^= 0xFF
+
+    with pytest.raises(ValueError):
+        checkpoint.desserializa(bytes(dados))
+
+
+def test_salva_e_carrega(tmp_path: Path) -> None:
+    """A gravação é atômica e não deixa o temporário para trás."""
+
+    caminho = str(tmp_path / "netlog.ckpt")
+    checkpoint.salva(caminho, Checkpoint(numero_iteracao=1))
+    checkpoint.salva(caminho, exemplo())
+
+    assert checkpoint.carrega(caminho) == exemplo()
+    assert [p.name for p in tmp_path.iterdir()] == ["netlog.ckpt"]
+
+
+def test_carrega_invalido(tmp_path: Path) -> None:
+    """Checkpoints ausentes ou truncados são ignorados."""
+
+    caminho = tmp_path / "netlog.ckpt"
+    assert checkpoint.carrega(str(caminho)) is None
+
+    caminho.write_bytes(checkpoint.serializa(exemplo())[:-10])
+    assert checkpoint.carrega(str(caminho)) is None
@@ -0,0 +1,221 @@
+import asyncio
+import contextlib
+import csv
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import coletor
+from coletor import Agente, Coletor, codifica, decodifica
+from ip import ip_para_int
+
+
+def linha(ip: str, enviado: int, tipo: str = "remetente") -> tuple:
+    return (ip_para_int(ip), "HTTP", enviado, 0, tipo, 1, 0, 1)
+
+
+@pytest.fixture
+def servidor_coletor(tmp_path: Path):
+    """Coletor em uma porta livre, gravando em um CSV temporário."""
+
+    servidor = Coletor(str(tmp_path / "coletor.csv"), porta=0, endereco="127.0.0.1")
+    loop = asyncio.new_event_loop()
+    pronto = asyncio.Event()
+    tarefa = loop.create_task(servidor.serve(pronto))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    asyncio.run_coroutine_threadsafe(pronto.wait(), loop).result(timeout=5)
+    yield servidor
+
+    async def para():
+        tarefa.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await tarefa
+
+    asyncio.run_coroutine_threadsafe(para(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+    servidor.close()
+
+
+def test_codifica_ida_e_volta() -> None:
+    """Lotes com várias janelas, IPv4 e IPv6 sobrevivem à codificação."""
+
+    janelas = [
+        (7, "2025-01-01 10:00:00", [linha("10.0.0.1", 100), linha("fe80::1", 5)]),
+        (8, "2025-01-01 10:00:05", []),
+    ]
+
+    quadro = codifica("host-a", 2**64 - 1, janelas)
+
+    assert decodifica(quadro[coletor.TAMANHO.size :]) == (
+        "host-a",
+        2**64 - 1,
+        janelas,
+    )
+
+
+def test_decodifica_invalido() -> None:
+    with pytest.raises(ValueError):
+        decodifica(b"lixo")
+
+
+def test_varios_agentes(servidor_coletor: Coletor) -> None:
+    """Janelas de vários agentes no localhost vão para um só CSV, por host."""
+
+    endereco = f"127.0.0.1:{servidor_coletor.porta}"
+    agentes = [Agente(endereco, host=f"host-{i}") for i in range(3)]
+
+    def envia(agente: Agente, indice: int) -> None:
+        for segundo in range(0, 15, 5):
+            agente(f"2025-01-01 10:00:{segundo:02d}", [linha("10.0.0.1", indice)])
+        agente.close()
+
+    threads = [
+        threading.Thread(target=envia, args=(agente, i))
+        for i, agente in enumerate(agentes)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    with open(servidor_coletor.csv_path, newline="") as f:
+        linhas = list(csv.DictReader(f))
+
+    assert all(agente.enviadas == 3 and not agente.pendentes for agente in agentes)
+    assert len(linhas) == 9
+    for i in range(3):
+        do_host = [row for row in linhas if row["host"] == f"host-{i}"]
+        assert [row["bytes_enviados"] for row in do_host] == [str(i)] * 3
+        assert do_host[0]["ip"] == "10.0.0.1"
+
+
+def espera(condicao, timeout: float = 5.0) -> None:
+    """Espera a thread de envio do agente satisfazer `condicao`."""
+
+    limite = time.monotonic() + timeout
+    while not condicao():
+        assert time.monotonic() < limite
+        time.sleep(0.01)
+
+
+def test_agente_reenvia_pendentes(servidor_coletor: Coletor) -> None:
+    """
+    Com o coletor inacessível, as janelas ficam pendentes e são enviadas
+    depois; janelas repetidas são descartadas pelo coletor.
+    """
+    agente = Agente("127.0.0.1:1", host="host-a", timeout=0.5)
+    with patch("coletor.logging"):
+        agente("2025-01-01 10:00:00", [linha("10.0.0.1", 10)])
+        espera(lambda: agente.falhas == 1)
+    assert len(agente.pendentes) == 1
+
+    agente.endereco = ("127.0.0.1", servidor_coletor.porta)
+    agente("2025-01-01 10:00:05", [linha("10.0.0.1", 20)])
+    espera(lambda: agente.enviadas == 2)
+
+    # Reenvio de uma janela já gravada (ex.: ACK perdido)
+    with socket.create_connection(agente.endereco) as s:
+        janela = (2, "2025-01-01 10:00:05", [linha("10.0.0.1", 20)])
+        s.sendall(codifica("host-a", agente.sessao, [janela]))
+        assert s.recv(1) == coletor.ACK
+    agente.close()
+
+    assert servidor_coletor.janelas == 2
+    with open(servidor_coletor.csv_path, newline="") as f:
+        assert len(list(csv.DictReader(f))) == 2
+
+
+def test_sequencia_independe_do_relogio(servidor_coletor: Coletor) -> None:
+    """
+    Janelas no mesmo segundo ou com o relógio do agente voltando são
+    gravadas; um novo agente (reinício) no mesmo host começa outra sessão.
+    """
+    agente = Agente(f"127.0.0.1:{servidor_coletor.porta}", host="host-a")
+    for data_hora in ("2025-01-01 10:00:05", "2025-01-01 10:00:05"):
+        agente(data_hora, [linha("10.0.0.1", 1)])
+    agente("2025-01-01 09:59:00", [linha("10.0.0.1", 1)])
+    agente.close()
+
+    reiniciado = Agente(f"127.0.0.1:{servidor_coletor.porta}", host="host-a")
+    reiniciado("2025-01-01 10:00:05", [linha("10.0.0.1", 1)])
+    reiniciado.close()
+
+    assert reiniciado.sessao != agente.sessao
+    assert servidor_coletor.janelas == 4
+    with open(servidor_coletor.csv_path, newline="") as f:
+        assert [row["seq"] for row in csv.DictReader(f)] == ["1", "2", "3", "1"]
+
+
+def test_agente_nao_bloqueia_a_captura() -> None:
+    """Um coletor que não confirma não atrasa quem entrega as janelas."""
+
+    with socket.create_server(("127.0.0.1", 0)) as mudo:
+        agente = Agente(f"127.0.0.1:{mudo.getsockname()[1]}", timeout=1.0)
+        inicio = time.monotonic()
+        for segundo in range(0, 50, 5):
+            agente(f"2025-01-01 10:00:{segundo:02d}", [linha("10.0.0.1", 1)])
+        assert time.monotonic() - inicio < 0.5
+
+        with patch("coletor.logging"):
+            agente.close()
+    assert agente.enviadas == 0 and len(agente.pendentes) == 10
+
+
+def test_coletor_reiniciado_descarta_reenvios(tmp_path: Path) -> None:
+    """
+    Ao continuar um CSV, as últimas janelas de cada host são lidas dele;
+    uma linha final incompleta é descartada.
+    """
+    csv_path = str(tmp_path / "coletor.csv")
+    primeiro = Coletor(csv_path, porta=0)
+    primeiro.registra("host-a", 1, [(4, "2025-01-01 10:00:05", [linha("10.0.0.1", 1)])])
+    primeiro.registra("host-b", 2, [(9, "2025-01-01 10:00:10", [linha("10.0.0.2", 1)])])
+    primeiro.close()
+    with open(csv_path, "a") as f:
+        f.write("host-a,1,5,2025-01-01 10:00:1")
+
+    with patch("coletor.logging"):
+        segundo = Coletor(csv_path, porta=0)
+    assert segundo.ultimas == {("host-a", 1): 4, ("host-b", 2): 9}
+
+    gravadas = segundo.registra(
+        "host-a",
+        1,
+        [
+            (4, "2025-01-01 10:00:05", [linha("10.0.0.1", 1)]),
+            (5, "2025-01-01 10:00:05", [linha("10.0.0.1", 2)]),
+        ],
+    )
+    segundo.close()
+
+    assert gravadas == 1
+    with open(csv_path, newline="") as f:
+        assert len(list(csv.DictReader(f))) == 3
+
+
+def test_import_nao_carrega_scapy() -> None:
+    """O coletor roda em máquinas sem captura: importá-lo não carrega o scapy."""
+
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    codigo = (
+        "import sys, coletor; print(any(m.startswith('scapy') for m in sys.modules))"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=src,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert saida.stdout.strip() == "False"
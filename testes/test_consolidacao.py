@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from consolidacao import Consolidacao, caminho_abertas, caminho_serie, inicio_balde
+from ip import ip_para_int
+from series import agrega_series, intervalo_series, le_series, totais_consolidados
+
+A, B = ip_para_int("10.0.0.1"), ip_para_int("10.0.0.2")
+
+
+def alimenta(consolidacao: Consolidacao, janelas: int, inicio: str) -> pd.DataFrame:
+    """
+    Passa `janelas` janelas de 5 s à consolidação e retorna as linhas
+    equivalentes do CSV do NetLogger.
+    """
+    linhas: list[dict] = []
+    for horario in pd.date_range(inicio, periods=janelas, freq="5s"):
+        data_hora: str = horario.strftime("%Y-%m-%d %H:%M:%S")
+        consolidacao(
+            data_hora,
+            [
+                (A, "HTTP", 10, 0, "remetente", 1, 0, 1),
+                (B, "HTTP", 0, 10, "destino", 0, 1, 1),
+            ],
+        )
+        linhas += [
+            {"data_hora": data_hora, "ip": "10.0.0.1", "protocolo": "HTTP"}
+            | {"bytes_enviados": 10, "bytes_recebidos": 0},
+            {"data_hora": data_hora, "ip": "10.0.0.2", "protocolo": "HTTP"}
+            | {"bytes_enviados": 0, "bytes_recebidos": 10},
+        ]
+    return pd.DataFrame(linhas)
+
+
+def test_inicio_balde() -> None:
+    """Os baldes seguem o mesmo alinhamento de `Timestamp.floor`."""
+
+    assert inicio_balde("2025-01-01 10:37:13", 5) == "2025-01-01 10:37:10"
+    assert inicio_balde("2025-01-01 10:37:13", 60) == "2025-01-01 10:37:00"
+    assert inicio_balde("2025-01-01 10:37:13", 3600) == "2025-01-01 10:00:00"
+
+
+def test_equivale_a_agregar_o_csv(tmp_path: Path) -> None:
+    """Arquivos consolidados mais baldes abertos = agregar o CSV inteiro."""
+
+    csv_path = str(tmp_path / "netlog.csv")
+    df = alimenta(Consolidacao(csv_path), 1_000, "2025-01-01 10:00:00")
+    esperadas = agrega_series(df)
+
+    inicio, fim = intervalo_series(csv_path)
+    assert inicio == esperadas["5s"]["data_hora"].min()
+    assert fim == esperadas["5s"]["data_hora"].max()
+
+    for resolucao, janela in (("5s", "1h"), ("1min", "1D"), ("1h", "365D")):
+        (tabela,) = le_series(csv_path, inicio, inicio + pd.Timedelta(janela)).values()
+        chaves = ["data_hora", "ip"]
+        obtida = tabela.sort_values(chaves, ignore_index=True)
+        esperada = esperadas[resolucao]
+        esperada = esperada[esperada["data_hora"] <= inicio + pd.Timedelta(janela)]
+        pd.testing.assert_frame_equal(
+            obtida, esperada.sort_values(chaves, ignore_index=True), check_dtype=False
+        )
+
+
+def test_le_apenas_o_intervalo(tmp_path: Path) -> None:
+    """A leitura traz só as janelas do intervalo pedido."""
+
+    csv_path = str(tmp_path / "netlog.csv")
+    alimenta(Consolidacao(csv_path), 1_000, "2025-01-01 10:00:00")
+
+    inicio = pd.Timestamp("2025-01-01 10:20:00")
+    fim = pd.Timestamp("2025-01-01 10:25:00")
+    tabela = le_series(csv_path, inicio, fim)["5s"]
+
+    assert tabela["data_hora"].min() == inicio
+    assert tabela["data_hora"].max() == fim
+    assert len(tabela) == 2 * 61
+
+
+def test_continua_retoma_baldes_abertos(tmp_path: Path) -> None:
+    """Com `continua`, o balde aberto continua na execução seguinte."""
+
+    csv_path = str(tmp_path / "netlog.csv")
+    alimenta(Consolidacao(csv_path, continua=True), 6, "2025-01-01 10:00:00")
+    alimenta(Consolidacao(csv_path, continua=True), 6, "2025-01-01 10:00:30")
+
+    abertas = json.loads(Path(caminho_abertas(csv_path)).read_text())
+    assert abertas["1min"]["linhas"] == [
+        ["10.0.0.1", "HTTP", 120, 0],
+        ["10.0.0.2", "HTTP", 0, 120],
+    ]
+    assert len(Path(caminho_serie(csv_path, "5s")).read_text().splitlines()) == 23
+
+    Consolidacao(csv_path)
+    assert not Path(caminho_abertas(csv_path)).exists()
+    assert len(Path(caminho_serie(csv_path, "5s")).read_text().splitlines()) == 1
+
+
+def test_totais_sem_ler_o_csv(tmp_path: Path) -> None:
+    """Série de 1 h + balde aberto = totais do CSV inteiro, por IP e protocolo."""
+
+    csv_path = str(tmp_path / "netlog.csv")
+    df = alimenta(Consolidacao(csv_path), 1_000, "2025-01-01 10:00:00")
+
+    totais = totais_consolidados(csv_path)
+
+    esperados = df.groupby(["ip", "protocolo"], as_index=False)[
+        ["bytes_enviados", "bytes_recebidos"]
+    ].sum()
+    pd.testing.assert_frame_equal(totais, esperados, check_dtype=False)
+    assert totais_consolidados(str(tmp_path / "outro.csv")).empty
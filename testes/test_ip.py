@@ -3,7 +3,14 @@ from unittest.mock import patch
 
 import pytest
 
-from ip import get_local_ip
+from ip import (
+    BIT_IPV6,
+    TabelaIPs,
+    bytes_para_int,
+    get_local_ip,
+    int_para_ip,
+    ip_para_int,
+)
 from ip import main as ip_main
 
 
@@ -63,3 +70,60 @@ def test_main_failure(capsys: pytest.CaptureFixture) -> None:
 
         captured = capsys.readouterr()
         assert "erro: Erro simulado" in captured.err
+
+
+def test_ip_para_int_ida_e_volta() -> None:
+    """
+    Testa a conversão texto <-> inteiro para IPv4 e IPv6.
+    """
+
+    assert ip_para_int("10.0.0.1") == 0x0A000001
+    assert int_para_ip(0x0A000001) == "10.0.0.1"
+
+    v6: int = ip_para_int("::1")
+    assert v6 == BIT_IPV6 | 1
+    assert int_para_ip(v6) == "::1"
+
+    # "::10.0.0.1" (IPv6) não colide com "10.0.0.1" (IPv4)
+    assert ip_para_int("::10.0.0.1") != ip_para_int("10.0.0.1")
+
+    assert bytes_para_int(bytes([10, 0, 0, 1])) == 0x0A000001
+    assert bytes_para_int(bytes(15) + b"\x01") == v6
+
+    with pytest.raises(ValueError):
+        ip_para_int("não é ip")
+
+
+def test_tabela_ips_interna() -> None:
+    """
+    Testa se a TabelaIPs converte cada endereço uma única vez.
+    """
+
+    tabela: TabelaIPs = TabelaIPs()
+
+    with patch("ip.ip_para_int", wraps=ip_para_int) as conversao:
+        a: int = tabela.interna("192.168.0.1")
+        b: int = tabela.interna("192.168.0.1")
+        assert a == b
+        conversao.assert_called_once()
+
+    assert tabela.texto(a) == "192.168.0.1"
+    assert tabela.texto(ip_para_int("fe80::1")) == "fe80::1"
+    assert len(tabela) == 2
+
+
+def test_tabela_ips_limitada() -> None:
+    """
+    Testa se a TabelaIPs não passa do limite e continua convertendo
+    corretamente depois de esvaziada.
+    """
+
+    tabela: TabelaIPs = TabelaIPs(limite=100)
+    valores: list[int] = [
+        tabela.interna(f"10.0.{i // 250}.{i % 250}") for i in range(1000)
+    ]
+
+    assert len(tabela) <= 100
+    assert valores == [ip_para_int(f"10.0.{i // 250}.{i % 250}") for i in range(1000)]
+    assert tabela.texto(valores[0]) == "10.0.0.0"
+    assert len(tabela) <= 100
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+import pytest
+
+from ip import ip_para_int
+from ipfix import CABECALHOS_IP_UDP, ColetorIPFIX, ExportadorIPFIX
+
+
+@pytest.fixture
+def coletor():
+    """Coletor IPFIX em uma porta UDP livre do loopback."""
+
+    coletor = ColetorIPFIX(porta=0)
+    yield coletor
+    coletor.close()
+
+
+def linhas(quantidade: int) -> list[tuple]:
+    return [
+        (
+            ip_para_int(f"10.0.{i // 250}.{i % 250}"),
+            "HTTP",
+            i,
+            2 * i,
+            "destino",
+            1,
+            2,
+            4,
+        )
+        for i in range(quantidade)
+    ]
+
+
+def test_ida_e_volta(coletor: ColetorIPFIX) -> None:
+    """Registros IPv4 e IPv6 exportados são decodificados pelo coletor."""
+
+    exportador = ExportadorIPFIX(f"127.0.0.1:{coletor.porta}", duracao_janela=5)
+    janela = "2025-01-01 10:00:05"
+    exportador(
+        janela,
+        [
+            (ip_para_int("10.0.0.1"), "HTTP", 1500, 300, "remetente", 3, 2, 1),
+            (ip_para_int("fe80::1"), "FTP", 10, 0, "destino", 1, 0, 8),
+        ],
+    )
+
+    registros = coletor.recebe()
+    exportador.close()
+
+    fim = int(datetime(2025, 1, 1, 10, 0, 5).timestamp())
+    assert registros == [
+        {
+            "flowStartSeconds": fim - 5,
+            "flowEndSeconds": fim,
+            "sourceIPv4Address": "10.0.0.1",
+            "destinationTransportPort": 8000,
+            "octetDeltaCount": 1500,
+            "packetDeltaCount": 3,
+            "reverseOctetDeltaCount": 300,
+            "reversePacketDeltaCount": 2,
+            "samplingPacketInterval": 1,
+        },
+        {
+            "flowStartSeconds": fim - 5,
+            "flowEndSeconds": fim,
+            "sourceIPv6Address": "fe80::1",
+            "destinationTransportPort": 2121,
+            "octetDeltaCount": 10,
+            "packetDeltaCount": 1,
+            "reverseOctetDeltaCount": 0,
+            "reversePacketDeltaCount": 0,
+            "samplingPacketInterval": 8,
+        },
+    ]
+
+
+def test_lotes_do_tamanho_da_mtu(coletor: ColetorIPFIX) -> None:
+    """
+    Muitos registros são divididos em datagramas que cabem na MTU, e os
+    modelos só vão no primeiro.
+    """
+    exportador = ExportadorIPFIX(f"127.0.0.1:{coletor.porta}", mtu=576)
+    mensagens = exportador.mensagens(
+        exportador.registros("2025-01-01 10:00:00", linhas(100))
+    )
+
+    assert len(mensagens) > 1
+    assert all(len(m) <= 576 - CABECALHOS_IP_UDP for m in mensagens)
+
+    decodificados = [r for m in mensagens for r in coletor.decodifica(m)]
+    assert len(decodificados) == 100
+    assert [r["octetDeltaCount"] for r in decodificados] == list(range(100))
+
+    # Sem os modelos no cache, datagramas posteriores são ignorados
+    novo = ColetorIPFIX(porta=0)
+    assert novo.decodifica(mensagens[1]) == []
+    novo.close()
+    exportador.close()
+
+
+def test_reenvio_dos_modelos(coletor: ColetorIPFIX, monkeypatch) -> None:
+    """Os modelos são reenviados quando o intervalo de reenvio passa."""
+
+    agora = [100.0]
+    monkeypatch.setattr("ipfix.time.monotonic", lambda: agora[0])
+    exportador = ExportadorIPFIX(f"127.0.0.1:{coletor.porta}", reenvio_modelos=60)
+    registros = exportador.registros("2025-01-01 10:00:00", linhas(1))
+
+    primeira = exportador.mensagens(registros)[0]
+    agora[0] += 30
+    segunda = exportador.mensagens(registros)[0]
+    agora[0] += 30
+    terceira = exportador.mensagens(registros)[0]
+    exportador.close()
+
+    assert len(primeira) == len(terceira) > len(segunda)
+    assert exportador.sequencia == 3
+
+    novo = ColetorIPFIX(porta=0)
+    assert novo.decodifica(segunda) == []
+    assert len(novo.decodifica(terceira)) == 1
+    novo.close()
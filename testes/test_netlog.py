@@ -1,11 +1,21 @@
+import os
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+from scapy.packet import Padding
 
+import netlog
+from amostragem import Amostragem
+from ip import TABELA
 from netlog import NetLogger
 
+MAC = "00:00:00:00:00:01"
+
 
 # Fixture para NetLogger com CSV temporário
 @pytest.fixture
@@ -20,30 +30,35 @@ def netlogger(tmp_path: Path) -> NetLogger:
 def fake_packet(
     src="127.0.0.1",
     dst="127.0.0.2",
-    proto=6,
     size=100,
     sport=12345,
     dport=8000,
-) -> MagicMock:
+) -> Ether:
     """
-    Cria um pacote falso com IP e TCP, adequado para passar pelos filtros de NetLogger.
+    Cria um quadro Ethernet/IP/TCP de `size` bytes, adequado para passar
+    pelos filtros de NetLogger.
     """
-    ip = MagicMock()
-    ip.src = src
-    ip.dst = dst
-    ip.proto = proto
+    pacote = (
+        Ether(src=MAC, dst=MAC) / IP(src=src, dst=dst) / TCP(sport=sport, dport=dport)
+    )
+    return Ether(bytes(pacote / (b"\0" * (size - len(pacote)))))
 
-    tcp = MagicMock()
-    tcp.sport = sport
-    tcp.dport = dport
 
-    pkt = MagicMock()
-    # suporta 'IP in pkt' e 'TCP in pkt'
-    pkt.__contains__.side_effect = lambda x: x in (IP, TCP)
-    pkt.__getitem__.side_effect = lambda x: ip if x == IP else tcp
-    pkt.__len__.return_value = size
+def sniff_falso(pacotes: list):
+    """
+    Cria um substituto de `sniff` que entrega `pacotes` à sessão do
+    NetLogger como um socket entregaria (bytes ainda não dissecados).
+    """
+
+    def sniff(session, **kwargs):
+        socket_falso = MagicMock()
+        socket_falso.recv_raw.side_effect = [
+            (type(pacote), bytes(pacote), float(pacote.time)) for pacote in pacotes
+        ]
+        for _ in pacotes:
+            list(session.recv(socket_falso))
 
-    return pkt
+    return sniff
 
 
 def test_processa_pacotes_single_logging(netlogger: NetLogger) -> None:
@@ -52,10 +67,10 @@ def test_processa_pacotes_single_logging(netlogger: NetLogger) -> None:
     """
     pkt = fake_packet(dport=8000)  # HTTP port
     with (
-        patch("netlog.sniff", return_value=[pkt]),
+        patch("netlog.sniff", side_effect=sniff_falso([pkt])),
         patch("netlog.logging") as mock_log,
     ):
-        netlogger.conexoes = {"127.0.0.1", "127.0.0.2"}
+        netlogger.conexoes = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
         netlogger.processa_pacotes(timeout=1)
 
         mock_log.info.assert_called_with("Iteração 1 concluída")
@@ -69,22 +84,18 @@ def test_processa_pacotes_multiple_logging(netlogger: NetLogger) -> None:
     """
     Verifica CSV e log com captura de múltiplos pacotes.
     """
-    pkt1 = fake_packet(
-        src="127.1.1.1", dst="127.2.2.2", proto=6, sport=5000, dport=8000
-    )
+    pkt1 = fake_packet(src="127.1.1.1", dst="127.2.2.2", sport=5000, dport=8000)
     pkt2 = fake_packet(
-        src="127.3.3.3", dst="127.4.4.4", proto=17, sport=6000, dport=2121
+        src="127.3.3.3", dst="127.4.4.4", sport=6000, dport=2121
     )  # FTP port
 
     with (
-        patch("netlog.sniff", return_value=[pkt1, pkt2]),
+        patch("netlog.sniff", side_effect=sniff_falso([pkt1, pkt2])),
         patch("netlog.logging") as mock_log,
     ):
         netlogger.conexoes = {
-            "127.1.1.1",
-            "127.2.2.2",
-            "127.3.3.3",
-            "127.4.4.4",
+            TABELA.interna(ip)
+            for ip in ("127.1.1.1", "127.2.2.2", "127.3.3.3", "127.4.4.4")
         }
         netlogger.processa_pacotes(timeout=1)
 
@@ -131,3 +142,334 @@ def test_run_exception_logging(netlogger: NetLogger) -> None:
             netlogger.run()
 
         assert mock_log.warning.called
+
+
+def test_import_nao_carrega_scapy_all() -> None:
+    """
+    Garante que importar netlog não carrega `scapy.all` (inicialização lenta).
+    """
+
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    codigo = "import sys, netlog; print('scapy.all' in sys.modules)"
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=src,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert saida.stdout.strip() == "False"
+
+
+def test_processa_pacotes_faixa_cidr(tmp_path: Path) -> None:
+    """
+    Pacotes dentro de faixas CIDR permitidas por arquivo são contabilizados.
+    """
+    permitidos = tmp_path / "permitidos.txt"
+    permitidos.write_text("10.0.0.0/8\n")
+    netlogger = NetLogger(str(tmp_path / "test.csv"), permitidos_path=str(permitidos))
+
+    dentro = fake_packet(src="10.1.2.3", dst="10.9.8.7")
+    fora = fake_packet(src="10.1.2.3", dst="11.0.0.1")
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([dentro, fora])),
+        patch("netlog.logging"),
+    ):
+        netlogger.processa_pacotes(timeout=1)
+
+    with open(netlogger.csv_path) as f:
+        ips = {linha.split(",")[1] for linha in f.readlines()[1:]}
+    assert ips == {"10.1.2.3", "10.9.8.7"}
+
+
+def test_modo_duravel_retoma(tmp_path: Path) -> None:
+    """
+    No modo durável, o CSV é continuado e os totais e a numeração são
+    retomados do checkpoint, somando as janelas gravadas depois dele e
+    descartando uma linha final incompleta.
+    """
+    csv_path = str(tmp_path / "test.csv")
+    ips = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
+    chave = (TABELA.interna("127.0.0.1"), "HTTP")
+
+    primeiro = NetLogger(csv_path, duravel=True, intervalo_checkpoint=2)
+    primeiro.conexoes = ips
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([fake_packet()])),
+        patch("netlog.logging"),
+    ):
+        for _ in range(3):  # checkpoint só após a 2ª janela
+            primeiro.processa_pacotes(timeout=1)
+
+    # Queda no meio da escrita de uma linha
+    with open(csv_path, "a") as f:
+        f.write("2025-01-01 00:00:00,127.0.0.1,HT")
+
+    with patch("netlog.logging") as log:
+        segundo = NetLogger(csv_path, duravel=True)
+
+    assert segundo.numero_iteracao == 4
+    assert segundo.totais[chave] == [300, 0]
+    # Os totais retomados (de todas as execuções) vão para o log
+    assert log.info.call_args.args[0] == (
+        "Totais acumulados: 300 bytes enviados e 300 recebidos em 2 pares "
+        "(IP, protocolo); maiores: 127.0.0.1/HTTP 300, 127.0.0.2/HTTP 300"
+    )
+    with open(csv_path) as f:
+        linhas = f.readlines()
+    assert len(linhas) == 7  # cabeçalho + 3 janelas x 2 linhas
+    assert linhas[-1].endswith("\n")
+
+
+def test_continua_mantem_csv_sem_checkpoint(tmp_path: Path) -> None:
+    """Com `continua` (reinício pelo supervisor), o CSV não é apagado."""
+
+    csv_path = str(tmp_path / "test.csv")
+    primeiro = NetLogger(csv_path)
+    primeiro.conexoes = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([fake_packet()])),
+        patch("netlog.logging"),
+    ):
+        primeiro.processa_pacotes(timeout=1)
+
+    segundo = NetLogger(csv_path, continua=True)
+
+    with open(csv_path) as f:
+        assert len(f.readlines()) == 3
+    assert segundo.numero_iteracao == 1 and not segundo.totais
+    assert not os.path.exists(segundo.checkpoint_path)
+
+
+def test_modo_duravel_cabecalho_diferente(tmp_path: Path) -> None:
+    """Um CSV com outro cabeçalho é preservado com outro nome."""
+
+    csv_file = tmp_path / "test.csv"
+    csv_file.write_text("a,b\n1,2\n")
+
+    with patch("netlog.logging"):
+        NetLogger(str(csv_file), duravel=True)
+
+    assert csv_file.read_text().startswith("data_hora,ip")
+    antigos = list(tmp_path.glob("test.csv.*.antigo"))
+    assert len(antigos) == 1 and antigos[0].read_text() == "a,b\n1,2\n"
+
+
+def test_processa_pacotes_amostragem(tmp_path: Path) -> None:
+    """
+    Sob amostragem, só os quadros selecionados são dissecados, as contagens
+    são multiplicadas pela taxa e a taxa é gravada em cada linha; uma
+    janela lenta aumenta a taxa seguinte.
+    """
+    netlogger = NetLogger(str(tmp_path / "test.csv"), amostragem="sistematica")
+    netlogger.conexoes = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
+    netlogger.amostragem.taxa = 4
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([fake_packet()] * 400)),
+        patch("netlog.logging"),
+        patch("amostragem.logging"),
+        patch("netlog.time.perf_counter", side_effect=[0.0, 4.0, 4.0, 4.0]),
+        patch.object(Ether, "dissect", autospec=True, side_effect=Ether.dissect) as d,
+    ):
+        netlogger.processa_pacotes(timeout=5)
+
+    # só a amostra é dissecada
+    assert sum(isinstance(chamada.args[0], Ether) for chamada in d.mock_calls) == 100
+
+    with open(netlogger.csv_path) as f:
+        linhas = [linha.strip().split(",") for linha in f.readlines()[1:]]
+
+    remetente = next(linha for linha in linhas if linha[5] == "remetente")
+    assert remetente[3] == "40000"  # 100 pacotes contados x 100 bytes x 4
+    assert remetente[6] == "400"
+    assert {linha[8] for linha in linhas} == {"4"}
+    assert netlogger.amostragem.taxa == 8
+
+
+def test_sessao_guarda_so_a_amostra() -> None:
+    """
+    A amostragem decide na chegada de cada quadro: os descartados não são
+    guardados, mas passam por `todos` (anel e métricas TCP).
+    """
+    amostragem = Amostragem(semente=1)
+    amostragem.taxa = 4
+    recebidos: list = []
+    sessao = netlog._SessaoBruta(amostragem.mantem, recebidos.append)
+
+    sniff_falso([fake_packet()] * 400)(session=sessao)
+
+    assert sessao.capturados == len(recebidos) == 400
+    assert len(sessao.quadros) == 100
+
+
+def test_processa_pacotes_destinos(netlogger: NetLogger) -> None:
+    """Os destinos recebem as linhas de cada janela; falhas não param a captura."""
+
+    recebidas = []
+
+    def falha(hora, linhas):
+        raise RuntimeError("destino fora do ar")
+
+    netlogger.adiciona_destino(falha)
+    netlogger.adiciona_destino(lambda hora, linhas: recebidas.append(linhas))
+    netlogger.conexoes = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([fake_packet()])),
+        patch("netlog.logging") as mock_log,
+    ):
+        netlogger.processa_pacotes(timeout=1)
+
+    assert mock_log.warning.called
+    assert sorted(recebidas[0]) == [
+        (TABELA.interna("127.0.0.1"), "HTTP", 100, 0, "remetente", 1, 0, 1),
+        (TABELA.interna("127.0.0.2"), "HTTP", 0, 100, "destino", 0, 1, 1),
+    ]
+
+
+def test_processa_pacotes_anel(tmp_path: Path) -> None:
+    """Com o anel ativo, os quadros capturados são guardados para exportação."""
+
+    netlogger = NetLogger(
+        str(tmp_path / "test.csv"), anel_path=str(tmp_path / "netlog.anel"), anel_mb=1
+    )
+    capturado = Ether(bytes(Ether() / IP(src="127.0.0.1") / TCP(dport=8000)))
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso([capturado])),
+        patch("netlog.logging"),
+    ):
+        netlogger.processa_pacotes(timeout=1)
+
+    assert [q[2] for q in netlogger.anel.quadros()] == [bytes(capturado)]
+    netlogger.anel.close()
+
+
+def test_processa_pacotes_metricas_tcp(tmp_path: Path) -> None:
+    """Com as métricas TCP ativas, cada janela grava uma linha por conexão."""
+
+    netlogger = NetLogger(str(tmp_path / "test.csv"), metricas_tcp=True)
+    cliente = IP(src="127.0.0.1", dst="127.0.0.2")
+    servidor = IP(src="127.0.0.2", dst="127.0.0.1")
+    pacotes = [
+        Ether() / cliente / TCP(sport=40000, dport=8000, flags="S", seq=0),
+        Ether() / servidor / TCP(sport=8000, dport=40000, flags="SA", seq=0, ack=1),
+        Ether() / cliente / TCP(sport=40000, dport=8000, flags="A", seq=1, ack=1),
+    ]
+    for instante, pacote in zip((0.0, 0.004, 0.01), pacotes):
+        pacote.time = instante
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso(pacotes)),
+        patch("netlog.logging"),
+    ):
+        netlogger.conexoes.update(
+            TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")
+        )
+        netlogger.processa_pacotes(timeout=1)
+
+    with open(tmp_path / "test_tcp.csv") as f:
+        cabecalho, linha = (texto.strip().split(",") for texto in f)
+
+    registro = dict(zip(cabecalho, linha))
+    assert registro["ip_cliente"] == "127.0.0.1"
+    assert registro["porta_servidor"] == "8000"
+    assert registro["protocolo"] == "HTTP"
+    assert registro["rtt_handshake_ms"] == "10.0"
+    assert registro["retransmissoes"] == "0"
+
+
+def test_metricas_tcp_ack_com_preenchimento(tmp_path: Path) -> None:
+    """
+    ACKs puros preenchidos até o quadro Ethernet mínimo (60 bytes) não têm
+    dados: o preenchimento não vira amostra de RTT nem retransmissão.
+    """
+    netlogger = NetLogger(str(tmp_path / "test.csv"), metricas_tcp=True)
+    cliente = IP(src="127.0.0.1", dst="127.0.0.2")
+    servidor = IP(src="127.0.0.2", dst="127.0.0.1")
+    pacotes = [
+        Ether(src=MAC, dst=MAC) / cliente / TCP(sport=40000, dport=8000, flags="S"),
+        Ether(src=MAC, dst=MAC)
+        / servidor
+        / TCP(sport=8000, dport=40000, flags="SA", ack=1),
+    ] + [
+        Ether(src=MAC, dst=MAC)
+        / cliente
+        / TCP(sport=40000, dport=8000, flags="A", seq=1, ack=1)
+        / Padding(b"\0" * 6)
+        for _ in range(3)
+    ]
+    for instante, pacote in enumerate(pacotes):
+        pacote.time = instante / 100
+
+    with (
+        patch("netlog.sniff", side_effect=sniff_falso(pacotes)),
+        patch("netlog.logging"),
+    ):
+        netlogger.conexoes.update(
+            TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")
+        )
+        netlogger.processa_pacotes(timeout=1)
+
+    with open(tmp_path / "test_tcp.csv") as f:
+        registro = dict(zip(*(texto.strip().split(",") for texto in f)))
+
+    assert len(bytes(pacotes[-1])) == 60
+    assert registro["amostras_rtt"] == "0"
+    assert registro["retransmissoes"] == "0"
+
+
+def test_sessao_descarta_copia_de_saida_do_loopback() -> None:
+    """No Linux, a cópia de saída de um quadro do loopback é descartada."""
+
+    L2Socket = pytest.importorskip("scapy.arch.linux").L2Socket
+    sessao = netlog._SessaoBruta()
+    socket_falso = MagicMock(spec=L2Socket)
+    socket_falso.LL = Ether
+    socket_falso.ins = MagicMock()
+    socket_falso._recv_raw.side_effect = [
+        (b"saida", ("lo", 0x800, netlog.PACKET_OUTGOING, netlog.ARPHRD_LOOPBACK), 1.0),
+        (b"entrada", ("lo", 0x800, 0, netlog.ARPHRD_LOOPBACK), 1.0),
+        (b"eth0", ("eth0", 0x800, netlog.PACKET_OUTGOING, 1), 2.0),
+    ]
+
+    for _ in range(3):
+        list(sessao.recv(socket_falso))
+
+    assert sessao.quadros == [(Ether, b"entrada", 1.0), (Ether, b"eth0", 2.0)]
+
+
+def test_processa_pacotes_taxas(tmp_path: Path) -> None:
+    """Com alertas configurados, cada janela atualiza as taxas e o resumo."""
+
+    netlogger = NetLogger(str(tmp_path / "test.csv"), alertas={"bytes_ip": 1})
+    pkt = fake_packet(size=1000)
+    with patch("netlog.sniff", side_effect=sniff_falso([pkt])), patch("netlog.logging"):
+        netlogger.conexoes = {TABELA.interna(ip) for ip in ("127.0.0.1", "127.0.0.2")}
+        netlogger.processa_pacotes(timeout=1)
+
+    assert netlogger.taxas.por_ip[TABELA.interna("127.0.0.1")][0] > 0
+    assert (tmp_path / "test_taxas.json").exists()
+    assert len((tmp_path / "test_alertas.csv").read_text().splitlines()) == 3
+
+
+def test_agrega_mmap_descartes_por_janela(netlogger: NetLogger) -> None:
+    """O aviso de descartes do kernel traz apenas os da janela, não o total."""
+
+    class CapturaFalsa:
+        pacotes = descartados = 0
+
+        def lotes(self, timeout):
+            self.pacotes += 100
+            self.descartados += 10
+            yield []
+
+    netlogger._captura_mmap = CapturaFalsa()
+    with patch("netlog.logging") as mock_log:
+        netlogger._agrega_mmap(1)
+        netlogger._agrega_mmap(1)
+
+    avisos = [chamada.args[0] for chamada in mock_log.warning.call_args_list]
+    assert avisos == ["10 de 100 pacotes descartados pelo kernel nesta janela"] * 2
@@ -0,0 +1,100 @@
+import ipaddress
+import random
+from pathlib import Path
+
+import pytest
+
+from ip import ip_para_int
+from permissoes import ListaPermissoes
+
+
+def test_ips_e_faixas() -> None:
+    """IPs individuais e faixas CIDR (IPv4 e IPv6) são reconhecidos."""
+
+    lista = ListaPermissoes(["10.0.0.0/8", "192.168.1.7", "fd00::/8"])
+
+    assert ip_para_int("10.255.0.1") in lista
+    assert ip_para_int("11.0.0.0") not in lista
+    assert ip_para_int("9.255.255.255") not in lista
+    assert ip_para_int("192.168.1.7") in lista
+    assert ip_para_int("192.168.1.8") not in lista
+    assert ip_para_int("fd12::1") in lista
+    assert ip_para_int("fe80::1") not in lista
+
+    # A faixa IPv6 ::/96 não inclui IPv4
+    assert ip_para_int("10.0.0.1") not in ListaPermissoes(["::/96"])
+
+
+def test_faixas_de_prefixos_diferentes() -> None:
+    """Faixas com prefixos diferentes (inclusive aninhadas) convivem."""
+
+    lista = ListaPermissoes(["10.0.0.0/24", "10.0.0.128/25", "172.16.0.0/12"])
+    assert ip_para_int("10.0.1.1") not in lista
+
+    lista.adiciona("10.0.0.0/16")
+
+    assert len(lista) == 4
+    assert ip_para_int("10.0.200.1") in lista
+    assert ip_para_int("172.31.255.255") in lista
+    assert ip_para_int("172.32.0.0") not in lista
+
+
+def test_add_update_como_set() -> None:
+    """add/update aceitam a representação inteira, como um set[int]."""
+
+    lista = ListaPermissoes()
+    lista.add(ip_para_int("1.1.1.1"))
+    lista.update(map(ip_para_int, ["2.2.2.2", "3.3.3.3"]))
+
+    assert all(ip_para_int(ip) in lista for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"))
+    assert len(lista) == 3
+
+
+def test_carrega_arquivo(tmp_path: Path) -> None:
+    """Carrega entradas de arquivo, ignorando comentários e linhas vazias."""
+
+    arquivo = tmp_path / "permitidos.txt"
+    arquivo.write_text("# rede interna\n10.0.0.0/8\n\n172.16.0.1  # gateway\n")
+
+    lista = ListaPermissoes.carrega(str(arquivo))
+
+    assert ip_para_int("10.1.1.1") in lista
+    assert ip_para_int("172.16.0.1") in lista
+    assert len(lista) == 2
+
+
+def test_entrada_invalida() -> None:
+    """Entradas inválidas levantam ValueError."""
+
+    with pytest.raises(ValueError):
+        ListaPermissoes(["10.0.0.0/33"])
+
+
+def test_muitas_faixas() -> None:
+    """Com dezenas de milhares de faixas, o resultado bate com ipaddress."""
+
+    rng = random.Random(0)
+    redes = [
+        ipaddress.ip_network(
+            (rng.getrandbits(32), rng.choice((8, 16, 20, 24, 28))),
+            strict=False,
+        )
+        for _ in range(20_000)
+    ]
+    lista = ListaPermissoes(str(rede) for rede in redes)
+    por_prefixo = {
+        p: {int(r.network_address) for r in redes if r.prefixlen == p}
+        for p in (8, 16, 20, 24, 28)
+    }
+
+    def esperado(valor: int) -> bool:
+        return any(
+            valor >> (32 - p) << (32 - p) in enderecos
+            for p, enderecos in por_prefixo.items()
+        )
+
+    for _ in range(5_000):
+        valor = rng.getrandbits(32)
+        assert (valor in lista) == esperado(valor)
+    for rede in redes[:1000]:
+        assert int(rede.network_address) + rng.randrange(rede.num_addresses) in lista
@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from series import (
+    MAX_JANELAS,
+    agrega_series,
+    escolhe_resolucao,
+    le_cauda,
+    lttb,
+    serie_para_grafico,
+)
+
+
+def df_csv(n: int = 100) -> pd.DataFrame:
+    """
+    Gera linhas no formato do CSV do NetLogger, uma janela a cada 5 s.
+    """
+    horarios = pd.date_range("2025-01-01 00:00:00", periods=n, freq="5s")
+    return pd.DataFrame(
+        {
+            "data_hora": horarios.strftime("%Y-%m-%d %H:%M:%S"),
+            "ip": ["10.0.0.1", "10.0.0.2"] * (n // 2),
+            "protocolo": "HTTP",
+            "bytes_enviados": 10,
+            "bytes_recebidos": 20,
+            "tipo": "remetente",
+        }
+    )
+
+
+def test_agrega_series_preserva_totais() -> None:
+    """Cada resolução mantém o total de bytes do CSV."""
+
+    df = df_csv()
+    series = agrega_series(df)
+
+    for tabela in series.values():
+        assert tabela["bytes_enviados"].sum() == df["bytes_enviados"].sum()
+        assert tabela["bytes_recebidos"].sum() == df["bytes_recebidos"].sum()
+
+    # 100 janelas de 5 s = 500 s -> 9 minutos distintos por IP
+    assert len(series["1min"]) == 9 * 2
+    assert len(series["1h"]) == 2
+
+
+def test_escolhe_resolucao() -> None:
+    """A resolução cresce conforme o intervalo exibido."""
+
+    inicio = pd.Timestamp("2025-01-01")
+    assert escolhe_resolucao(inicio, inicio + pd.Timedelta(minutes=10)) == "5s"
+    assert escolhe_resolucao(inicio, inicio + pd.Timedelta(days=1)) == "1min"
+    assert escolhe_resolucao(inicio, inicio + pd.Timedelta(days=365)) == "1h"
+    assert (
+        escolhe_resolucao(inicio, inicio + pd.Timedelta(seconds=5 * MAX_JANELAS))
+        == "5s"
+    )
+
+
+def test_lttb_limita_pontos_e_preserva_picos() -> None:
+    """LTTB mantém extremos e o pico da série."""
+
+    x = np.arange(10_000)
+    y = np.zeros(10_000)
+    y[5_432] = 1_000
+
+    indices = lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert 5_432 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_serie_curta() -> None:
+    """Séries menores que o limite não são alteradas."""
+
+    assert list(lttb(np.arange(5), np.arange(5), 100)) == [0, 1, 2, 3, 4]
+
+
+def test_serie_para_grafico_limita_pontos() -> None:
+    """O gráfico nunca recebe mais que `max_pontos` por série."""
+
+    series = agrega_series(df_csv(1_000))
+    tabela = series["5s"]
+    inicio, fim = tabela["data_hora"].min(), tabela["data_hora"].max()
+
+    resolucao, dados = serie_para_grafico(series, inicio, fim, max_pontos=50)
+
+    assert resolucao == "5s"
+    assert set(dados["Tipo"]) == {"Bytes Enviados", "Bytes Recebidos"}
+    assert (dados.groupby("Tipo").size() <= 50).all()
+
+
+def test_serie_para_grafico_filtra_ip() -> None:
+    """Filtro por IP considera apenas as linhas daquele IP."""
+
+    series = agrega_series(df_csv())
+    tabela = series["5s"]
+    inicio, fim = tabela["data_hora"].min(), tabela["data_hora"].max()
+
+    _, dados = serie_para_grafico(series, inicio, fim, ip="10.0.0.1")
+    enviados = dados[dados["Tipo"] == "Bytes Enviados"]
+
+    assert enviados["Bytes"].sum() == 10 * 50
+
+    _, vazio = serie_para_grafico(series, inicio, fim, ip="1.1.1.1")
+    assert vazio.empty
+
+
+def test_le_cauda(tmp_path: Path) -> None:
+    """Só as linhas completas do fim do arquivo, com o cabeçalho."""
+
+    caminho = tmp_path / "netlog.csv"
+    df_csv(100).to_csv(caminho, index=False)
+    parcial = "2025-01-01 00:08:20,10.0.0.1,HT"  # linha ainda sendo gravada
+    with open(caminho, "a") as f:
+        f.write(parcial)
+    linha = len(caminho.read_text().splitlines()[-2]) + 1
+
+    cauda = le_cauda(str(caminho), tamanho=3 * linha + len(parcial))
+
+    pd.testing.assert_frame_equal(cauda, df_csv(100).tail(3).reset_index(drop=True))
+    # Começando no meio de uma linha, ela é descartada
+    assert len(le_cauda(str(caminho), tamanho=3 * linha + len(parcial) - 1)) == 2
+    assert le_cauda(str(tmp_path / "nada.csv")).empty
@@ -1,3 +1,8 @@
+import ftplib
+import io
+import socket
+import urllib.error
+import urllib.request
 from unittest.mock import patch
 
 import pytest
@@ -77,3 +82,96 @@ def test_start_ftp_server_calls_serve_forever():
         mock_ftp.assert_called_with(("0.0.0.0", 2121), servers.LoggingFTPHandler)
         instance.serve_forever.assert_called_once()
         mock_log.info.as_
+
+
+@pytest.fixture(autouse=True)
+def arquivo_servido(tmp_path):
+    """Arquivo de teste no diretório servido por `servidor_async`."""
+
+    (tmp_path / "arquivo.txt").write_bytes(b"conteudo" * 1000)
+
+
+def test_async_http_get(servidor_async):
+    """O modo asyncio serve arquivos via HTTP e registra o IP."""
+
+    url = f"http://127.0.0.1:{servidor_async.http_port}/arquivo.txt"
+    with urllib.request.urlopen(url, timeout=5) as resposta:
+        assert resposta.read() == b"conteudo" * 1000
+
+    with pytest.raises(urllib.error.HTTPError) as erro:
+        urllib.request.urlopen(f"{url}.nao", timeout=5)
+    assert erro.value.code == 404
+
+    assert "127.0.0.1" in servers.get_ips()
+
+
+def test_async_http_nao_sai_da_raiz(servidor_async):
+    """Caminhos com ``..`` não escapam do diretório servido."""
+
+    with socket.create_connection(("127.0.0.1", servidor_async.http_port)) as s:
+        s.sendall(b"GET /../../etc/passwd HTTP/1.0\r\n\r\n")
+        assert s.recv(100).startswith(b"HTTP/1.1 404")
+
+
+def test_async_ftp_retr_stor_list(servidor_async, tmp_path):
+    """O modo asyncio aceita FTP anônimo, com RETR, STOR e LIST."""
+
+    ftp = ftplib.FTP()
+    ftp.connect("127.0.0.1", servidor_async.ftp_port, timeout=5)
+    assert "127.0.0.1" in servers.get_ips()
+
+    ftp.login()
+
+    partes: list[bytes] = []
+    ftp.retrbinary("RETR arquivo.txt", partes.append)
+    assert b"".join(partes) == b"conteudo" * 1000
+
+    ftp.storbinary("STOR enviado.bin", io.BytesIO(b"x" * 5000))
+    assert (tmp_path / "enviado.bin").read_bytes() == b"x" * 5000
+
+    assert set(ftp.nlst()) == {"arquivo.txt", "enviado.bin"}
+    assert ftp.size("arquivo.txt") == 8000
+
+    with pytest.raises(ftplib.error_perm):
+        ftp.cwd("nao_existe")
+
+    ftp.quit()
+
+
+def test_async_ftp_linha_longa(servidor_async):
+    """Um comando maior que o limite recebe ``500`` e encerra a sessão."""
+
+    with socket.create_connection(("127.0.0.1", servidor_async.ftp_port)) as s:
+        arquivo = s.makefile("rb")
+        assert arquivo.readline().startswith(b"220")
+        s.sendall(b"USER " + b"a" * (servers.FTPAssincrono.LIMITE_LINHA * 2) + b"\r\n")
+        assert arquivo.readline().startswith(b"500")
+        assert arquivo.readline() == b""
+
+
+def test_async_ftp_sessao_ociosa(servidor_async, monkeypatch):
+    """A conexão de controle ociosa é encerrada com ``421``."""
+
+    monkeypatch.setattr(servers.FTPAssincrono, "ESPERA_COMANDO", 0.2)
+    with socket.create_connection(("127.0.0.1", servidor_async.ftp_port)) as s:
+        arquivo = s.makefile("rb")
+        assert arquivo.readline().startswith(b"220")
+        assert arquivo.readline().startswith(b"421")
+        assert arquivo.readline() == b""
+
+
+def test_async_conexoes_ociosas(servidor_async):
+    """Conexões ociosas não impedem o atendimento de novas requisições."""
+
+    ociosas = [
+        socket.create_connection(("127.0.0.1", porta))
+        for porta in (servidor_async.http_port, servidor_async.ftp_port)
+        for _ in range(50)
+    ]
+
+    url = f"http://127.0.0.1:{servidor_async.http_port}/arquivo.txt"
+    with urllib.request.urlopen(url, timeout=5) as resposta:
+        assert resposta.status == 200
+
+    for s in ociosas:
+        s.close()
@@ -0,0 +1,129 @@
+import inspect
+import queue
+import sys
+import time
+from multiprocessing import Process, Queue
+
+import pytest
+
+import servers
+from supervisor import Supervisor, _processo_captura
+
+
+@pytest.fixture(autouse=True)
+def limpa_servers():
+    """Limpa ip_set e o canal antes e depois de cada teste."""
+
+    servers.ip_set.clear()
+    servers.define_canal(None)
+    yield
+    servers.ip_set.clear()
+    servers.define_canal(None)
+
+
+@pytest.fixture
+def supervisor(tmp_path) -> Supervisor:
+    """Supervisor com esperas curtas e sem interface."""
+
+    sup = Supervisor(
+        str(tmp_path / "test.csv"),
+        dashboard=False,
+        espera_inicial=0.01,
+        prazo_encerramento=2,
+    )
+    yield sup
+    sup.encerra()
+
+
+def test_registra_ip_envia_canal() -> None:
+    """Cada IP novo vai para o canal uma única vez."""
+
+    fila: Queue = Queue()
+    servers.define_canal(fila)
+
+    servers.registra_ip("1.2.3.4")
+    servers.registra_ip("1.2.3.4")
+
+    assert fila.get(timeout=1) == "1.2.3.4"
+    with pytest.raises(queue.Empty):
+        fila.get(timeout=0.1)
+    assert servers.get_ips() == {"1.2.3.4"}
+
+
+def test_cria_captura_reenvia_ips(supervisor: Supervisor) -> None:
+    """Uma captura reiniciada recebe todos os IPs já conhecidos."""
+
+    supervisor.ips = {"10.0.0.1", "10.0.0.2"}
+    supervisor._cria_captura()
+
+    recebidos = {supervisor._fila_captura.get(timeout=1) for _ in range(2)}
+    assert recebidos == {"10.0.0.1", "10.0.0.2"}
+
+
+def test_reinicia_processo_que_falhou(supervisor: Supervisor) -> None:
+    """Processos que terminam são reiniciados pelo supervisor."""
+
+    supervisor._alvos = lambda: {"falha": lambda: Process(target=sys.exit, args=(1,))}
+    supervisor._inicia("falha")
+
+    limite = time.monotonic() + 5
+    while supervisor.reinicios.get("falha", 0) < 2 and time.monotonic() < limite:
+        supervisor._verifica()
+        time.sleep(0.01)
+
+    assert supervisor.reinicios["falha"] >= 2
+    assert supervisor._falhas_seguidas["falha"] >= 2
+
+
+def test_encerra_termina_processos(supervisor: Supervisor) -> None:
+    """encerra() finaliza todos os processos em execução."""
+
+    supervisor._alvos = lambda: {
+        "lento": lambda: Process(target=time.sleep, args=(60,))
+    }
+    supervisor._inicia("lento")
+    assert supervisor.estado()["lento"]["vivo"]
+
+    supervisor.encerra()
+
+    assert not supervisor.estado()["lento"]["vivo"]
+    assert "janelas" not in supervisor.estado()["lento"]
+    assert supervisor.parando
+
+
+def test_cria_captura_argumentos_compativeis(supervisor: Supervisor) -> None:
+    """Os argumentos do processo de captura batem com a função alvo."""
+
+    processo = supervisor._cria_captura()
+
+    inspect.signature(_processo_captura).bind(*processo._args)
+    assert processo._args[1] == {
+        "motor": "scapy",
+        "permitidos_path": None,
+        "duravel": False,
+        "amostragem": None,
+        "coletor": None,
+        "ipfix": None,
+        "anel_path": None,
+        "anel_mb": 64,
+        "metricas_tcp": False,
+        "taxas": False,
+        "alertas": None,
+        "continua": False,
+    }
+
+    # Reinícios continuam os arquivos da captura anterior
+    supervisor.reinicios["captura"] = 1
+    assert supervisor._cria_captura()._args[1]["continua"]
+
+
+def test_estado_informa_janelas_da_captura(supervisor: Supervisor) -> None:
+    """O estado da captura traz as janelas concluídas."""
+
+    supervisor._alvos = lambda: {
+        "captura": lambda: Process(target=time.sleep, args=(60,))
+    }
+    supervisor._inicia("captura")
+    supervisor.iteracoes.value = 7
+
+    assert supervisor.estado()["captura"]["janelas"] == 7
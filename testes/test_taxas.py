@@ -0,0 +1,150 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ip import ip_para_int
+from taxas import Alerta, Taxas
+
+A, B = ip_para_int("10.0.0.1"), ip_para_int("10.0.0.2")
+
+
+def linha(src: int, dst: int, protocolo: str, tamanho: int, pacotes: int) -> list:
+    """Linhas de uma janela com `tamanho` bytes enviados de `src` a `dst`."""
+
+    return [
+        (src, protocolo, tamanho, 0, "remetente", pacotes, 0, 1),
+        (dst, protocolo, 0, tamanho, "destino", 0, pacotes, 1),
+    ]
+
+
+def test_ewma_converge_e_decai() -> None:
+    """Com tráfego constante a média converge; sem tráfego, decai à metade."""
+
+    taxas = Taxas(meia_vida=10.0)
+    for _ in range(40):
+        taxas.atualiza("t", linha(A, B, "HTTP", 5000, 10), 5.0)
+
+    assert taxas.por_ip[A][0] == pytest.approx(1000.0, rel=1e-3)
+    assert taxas.por_ip[A][1] == pytest.approx(2.0, rel=1e-3)
+    # Por protocolo, cada pacote conta uma vez (só o remetente)
+    assert taxas.por_protocolo["HTTP"][0] == pytest.approx(1000.0, rel=1e-3)
+
+    antes: float = taxas.por_ip[B][0]
+    taxas.atualiza("t", [], 10.0)
+    assert taxas.por_ip[B][0] == pytest.approx(antes / 2)
+
+
+def test_peso_depende_da_duracao() -> None:
+    """Uma janela com a duração da meia-vida leva a média à metade da taxa."""
+
+    taxas = Taxas(meia_vida=5.0)
+    taxas.atualiza("t", linha(A, B, "FTP", 5000, 1), 5.0)
+
+    assert taxas.por_ip[A][0] == pytest.approx(500.0)
+
+
+def test_chaves_inativas_removidas() -> None:
+    """Chaves cuja taxa ficou desprezível deixam de ocupar memória."""
+
+    taxas = Taxas(meia_vida=1.0)
+    taxas.atualiza("t", linha(A, B, "HTTP", 100, 1), 1.0)
+    taxas.atualiza("t", [], 60.0)
+
+    assert not taxas.por_ip and not taxas.por_protocolo
+
+
+def test_alertas_com_histerese(tmp_path: Path) -> None:
+    """Dispara ao passar do limite, uma vez, e normaliza abaixo de 80% dele."""
+
+    recebidos: list[Alerta] = []
+    alertas_csv = tmp_path / "alertas.csv"
+    taxas = Taxas(
+        alertas_path=str(alertas_csv), limites={"bytes_ip": 800}, meia_vida=0.001
+    )
+    taxas.adiciona_alerta(recebidos.append)
+
+    taxas.atualiza("t1", linha(A, B, "HTTP", 1000, 1), 1.0)
+    taxas.atualiza("t2", linha(A, B, "HTTP", 1000, 1), 1.0)
+    taxas.atualiza("t3", linha(A, B, "HTTP", 700, 1), 1.0)  # entre 80% e 100%
+    taxas.atualiza("t4", linha(A, B, "HTTP", 100, 1), 1.0)
+
+    assert [(a.data_hora, a.chave, a.estado) for a in recebidos] == [
+        ("t1", "10.0.0.1", "ativo"),
+        ("t1", "10.0.0.2", "ativo"),
+        ("t4", "10.0.0.1", "normalizado"),
+        ("t4", "10.0.0.2", "normalizado"),
+    ]
+    assert len(alertas_csv.read_text().splitlines()) == 5
+
+
+def test_falha_no_callback_nao_interrompe() -> None:
+    """Exceções das funções de alerta são registradas e ignoradas."""
+
+    taxas = Taxas(limites={"pacotes_protocolo": 1}, meia_vida=0.001)
+    taxas.adiciona_alerta(lambda alerta: 1 / 0)
+
+    (alerta,) = taxas.atualiza("t", linha(A, B, "FTP", 10, 5), 1.0)
+    assert alerta.metrica == "pacotes_protocolo" and alerta.chave == "FTP"
+
+
+def test_metrica_desconhecida() -> None:
+    """Limites com métricas desconhecidas são rejeitados."""
+
+    with pytest.raises(ValueError):
+        Taxas(limites={"bytes_host": 1})
+
+
+def test_resumo_json(tmp_path: Path) -> None:
+    """O resumo traz as N maiores taxas, em ordem, e os alertas ativos."""
+
+    resumo = tmp_path / "taxas.json"
+    taxas = Taxas(str(resumo), limites={"bytes_ip": 150}, meia_vida=0.001, top=2)
+    c = ip_para_int("10.0.0.3")
+    taxas.atualiza(
+        "t",
+        linha(A, B, "HTTP", 100, 1) + linha(c, B, "FTP", 300, 1),
+        1.0,
+    )
+
+    conteudo = json.loads(resumo.read_text())
+    assert [item["ip"] for item in conteudo["ips"]] == ["10.0.0.2", "10.0.0.3"]
+    assert conteudo["ips"][0]["alertas"] == ["bytes_ip"]
+    assert [item["protocolo"] for item in conteudo["protocolos"]] == ["FTP", "HTTP"]
+    assert not (tmp_path / "taxas.json.tmp").exists()
+
+
+def test_resumo_traz_alertas_fora_do_top(tmp_path: Path) -> None:
+    """Alertas ativos de chaves fora das N maiores taxas também vão ao resumo."""
+
+    resumo = tmp_path / "taxas.json"
+    taxas = Taxas(str(resumo), limites={"pacotes_ip": 5}, meia_vida=0.001, top=1)
+    taxas.atualiza(
+        "t",
+        linha(A, B, "HTTP", 10000, 1) + linha(ip_para_int("10.0.0.3"), B, "FTP", 1, 8),
+        1.0,
+    )
+
+    conteudo = json.loads(resumo.read_text())
+    assert [item["ip"] for item in conteudo["ips"]] == ["10.0.0.2"]
+    assert conteudo["alertas"] == [
+        {"metrica": "pacotes_ip", "chave": "10.0.0.2", "valor": 9.0, "limite": 5},
+        {"metrica": "pacotes_ip", "chave": "10.0.0.3", "valor": 8.0, "limite": 5},
+    ]
+
+
+@pytest.mark.parametrize("continua, linhas", [(False, 3), (True, 5)])
+def test_csv_de_alertas_continuado(tmp_path: Path, continua: bool, linhas: int) -> None:
+    """Sem `continua`, o CSV de alertas de uma execução anterior é recriado."""
+
+    alertas_csv = str(tmp_path / "alertas.csv")
+    for _ in range(2):
+        taxas = Taxas(
+            alertas_path=alertas_csv,
+            limites={"bytes_ip": 800},
+            meia_vida=0.001,
+            continua=continua,
+        )
+        taxas.atualiza("t", linha(A, B, "HTTP", 1000, 1), 1.0)
+
+    assert len(Path(alertas_csv).read_text().splitlines()) == linhas
@@ -0,0 +1,176 @@
+import pandas as pd
+from scapy.layers.inet import IP, TCP
+from scapy.layers.inet6 import IPv6
+from scapy.layers.l2 import Ether
+
+from ip import TABELA, ip_para_int
+from series import latencias_por_ip
+from tcp_metricas import ACK, FIN, SYN, MetricasTCP, campos_tcp
+
+CLIENTE, SERVIDOR = ip_para_int("10.0.0.1"), ip_para_int("10.0.0.2")
+
+
+def do_cliente(metricas, t, seq, ack=0, flags=ACK, janela=1000, carga=0):
+    metricas.processa(t, CLIENTE, SERVIDOR, 40000, 8000, seq, ack, flags, janela, carga)
+
+
+def do_servidor(metricas, t, seq, ack=0, flags=ACK, janela=1000, carga=0):
+    metricas.processa(t, SERVIDOR, CLIENTE, 8000, 40000, seq, ack, flags, janela, carga)
+
+
+def conexao_aberta(metricas: MetricasTCP) -> None:
+    """Handshake às 0,000/0,010/0,030 s: cliente seq 100, servidor seq 500."""
+
+    do_cliente(metricas, 0.000, 99, flags=SYN)
+    do_servidor(metricas, 0.010, 499, 100, flags=SYN | ACK)
+    do_cliente(metricas, 0.030, 100, 500)
+
+
+def test_campos_tcp_ipv4_e_ipv6() -> None:
+    """Extrai seq, ack, flags, janela e bytes de dados dos cabeçalhos."""
+
+    quadro = bytes(
+        Ether()
+        / IP(src="10.0.0.1", dst="10.0.0.2")
+        / TCP(sport=1234, dport=8000, seq=7, ack=9, flags="PA", window=0)
+        / (b"x" * 30)
+    )
+    assert campos_tcp(memoryview(quadro), 14) == (
+        CLIENTE,
+        SERVIDOR,
+        1234,
+        8000,
+        7,
+        9,
+        0x18,
+        0,
+        30,
+    )
+
+    quadro6 = bytes(Ether() / IPv6(src="::1", dst="::2") / TCP(flags="S") / b"ab")
+    campos = campos_tcp(quadro6, 14)
+    assert TABELA.texto(campos[0]) == "::1" and campos[6:] == (SYN, 8192, 2)
+
+
+def test_handshake_e_rtt_de_dados() -> None:
+    """Mede o RTT do handshake e o RTT de cada segmento confirmado."""
+
+    metricas = MetricasTCP()
+    conexao_aberta(metricas)
+    do_cliente(metricas, 1.000, 100, 500, carga=100)
+    do_servidor(metricas, 1.020, 500, 200)
+    do_cliente(metricas, 1.100, 200, 500, carga=100)
+    do_servidor(metricas, 1.140, 500, 300)
+
+    (linha,) = metricas.fecha_janela()
+    cliente, porta_cliente, servidor, porta_servidor, handshake, *resto = linha
+    assert (cliente, porta_cliente, servidor, porta_servidor) == (
+        CLIENTE,
+        40000,
+        SERVIDOR,
+        8000,
+    )
+    assert round(handshake, 6) == 30.0
+    assert [round(v, 6) for v in resto[:3]] == [20.0, 40.0, 40.0]
+    assert resto[3:] == [2, 0, 0, 0]
+
+    # Na janela seguinte, sem tráfego, a conexão não gera linha
+    assert metricas.fecha_janela() == []
+
+
+def test_retransmissao_sem_amostra_de_rtt() -> None:
+    """Retransmissões são contadas e não geram amostras de RTT (Karn)."""
+
+    metricas = MetricasTCP()
+    conexao_aberta(metricas)
+    do_cliente(metricas, 1.0, 100, 500, carga=100)
+    do_cliente(metricas, 1.5, 100, 500, carga=100)  # retransmissão
+    do_servidor(metricas, 1.52, 500, 200)
+
+    linha = metricas.fecha_janela()[0]
+    assert linha[8:] == (0, 1, 0, 0)
+
+
+def test_fora_de_ordem_e_volta_do_contador() -> None:
+    """
+    Um segmento atrasado que chega logo depois do seguinte é fora de ordem,
+    mesmo com os números de sequência dando a volta em 2**32.
+    """
+
+    metricas = MetricasTCP()
+    inicio = 2**32 - 150
+    do_cliente(metricas, 0.0, inicio - 1, flags=SYN)
+    do_servidor(metricas, 0.01, 0, inicio, flags=SYN | ACK)
+    do_cliente(metricas, 0.02, inicio, 1)
+    do_cliente(metricas, 1.0, inicio, 1, carga=100)
+    do_cliente(metricas, 1.0005, 50, 1, carga=100)  # passou de 2**32
+    do_cliente(metricas, 1.0010, inicio + 100, 1, carga=100)
+
+    # O terceiro segmento cobre 2**32 - 50 .. 50 e chega atrasado
+    linha = metricas.fecha_janela()[0]
+    assert linha[9:] == (0, 1, 0)
+
+
+def test_janela_zero_conta_transicoes() -> None:
+    """Anúncios seguidos de janela zero contam como um único evento."""
+
+    metricas = MetricasTCP()
+    conexao_aberta(metricas)
+    for t in (1.0, 1.1, 1.2):
+        do_servidor(metricas, t, 500, 100, janela=0)
+    do_servidor(metricas, 1.3, 500, 100, janela=4096)
+    do_servidor(metricas, 1.4, 500, 100, janela=0)
+
+    assert metricas.fecha_janela()[0][11] == 2
+
+
+def test_estado_limitado_e_conexoes_encerradas() -> None:
+    """Respeita o máximo de conexões e descarta as encerradas por FIN."""
+
+    metricas = MetricasTCP(max_conexoes=3)
+    for porta in range(40000, 40005):
+        metricas.processa(0.0, CLIENTE, SERVIDOR, porta, 8000, 0, 0, SYN, 1000, 0)
+
+    assert len(metricas.conexoes) == 3 and metricas.descartadas == 2
+    # As descartadas ainda aparecem na janela em que estavam ativas
+    assert len(metricas.fecha_janela()) == 5
+
+    conexao_aberta(metricas)
+    do_cliente(metricas, 1.0, 100, 500, flags=FIN | ACK)
+    do_servidor(metricas, 1.1, 500, 101, flags=FIN | ACK)
+    metricas.fecha_janela()
+    assert (CLIENTE, 40000, SERVIDOR, 8000) not in metricas.conexoes
+
+
+def test_filtro_aceita() -> None:
+    """Pacotes recusados pelo filtro não criam conexões."""
+
+    metricas = MetricasTCP()
+    metricas.aceita = lambda src, dst, sport, dport: 8000 not in (sport, dport)
+    conexao_aberta(metricas)
+
+    assert not metricas.conexoes and metricas.fecha_janela() == []
+
+
+def test_latencias_por_ip() -> None:
+    """Calcula percentis por IP, contando conexões locais uma vez."""
+
+    df = pd.DataFrame(
+        {
+            "ip_cliente": ["10.0.0.1"] * 4 + ["127.0.0.1"],
+            "ip_servidor": ["10.0.0.2"] * 4 + ["127.0.0.1"],
+            "rtt_handshake_ms": [1.0, None, None, None, 0.1],
+            "rtt_mediano_ms": [10.0, 20.0, 30.0, 40.0, 0.2],
+            "retransmissoes": [1, 0, 2, 0, 3],
+            "fora_de_ordem": 0,
+            "janelas_zero": [0, 1, 0, 0, 0],
+        }
+    )
+
+    resultado = latencias_por_ip(df).set_index("ip")
+
+    assert list(resultado.index) == ["10.0.0.1", "10.0.0.2", "127.0.0.1"]
+    assert resultado.loc["10.0.0.1", "rtt_p50_ms"] == 25.0
+    assert resultado.loc["10.0.0.2", "handshake_p99_ms"] == 1.0
+    assert resultado.loc["10.0.0.2", "retransmissoes"] == 3
+    assert resultado.loc["127.0.0.1", "retransmissoes"] == 3